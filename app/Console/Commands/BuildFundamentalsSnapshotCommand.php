@@ -0,0 +1,42 @@
+<?php
+
+namespace App\Console\Commands;
+
+use Illuminate\Console\Command;
+use Illuminate\Support\Facades\Process;
+
+class BuildFundamentalsSnapshotCommand extends Command
+{
+    protected $signature = 'stocks:snapshot-fundamentals {--full : Rebuild from scratch instead of merging changed tickers}';
+
+    protected $description = 'Build the memory-mapped columnar fundamentals snapshot used for screening';
+
+    public function handle(): int
+    {
+        $pythonScript = base_path('scripts/fundamentals_snapshot.py');
+        $command = "python \"{$pythonScript}\" build";
+
+        if ($this->option('full')) {
+            $command .= ' --full';
+        }
+
+        $result = Process::timeout(300)->run($command);
+        $data = json_decode($result->output(), true);
+
+        if (! $result->successful() || ! $data || ! ($data['success'] ?? false)) {
+            $this->error('Snapshot build failed: '.($data['error'] ?? $result->errorOutput()));
+
+            return self::FAILURE;
+        }
+
+        $this->info($data['rebuilt']
+            ? "Fundamentals snapshot rebuilt ({$data['changed']} changed, {$data['rows']} rows)."
+            : 'Fundamentals snapshot is up to date.');
+
+        if ($data['rebuilt']) {
+            $this->call('stocks:build-peer-index', ['--full' => $this->option('full')]);
+        }
+
+        return self::SUCCESS;
+    }
+}
@@ -0,0 +1,38 @@
+<?php
+
+namespace App\Console\Commands;
+
+use Illuminate\Console\Command;
+use Illuminate\Support\Facades\Process;
+
+class BuildPeerIndexCommand extends Command
+{
+    protected $signature = 'stocks:build-peer-index
+                            {--full : Rebuild every neighbor list instead of only changed tickers}
+                            {--k=10 : Number of neighbors to keep per stock}';
+
+    protected $description = 'Build the fundamentals-vector nearest-neighbor peer index used for relative valuation';
+
+    public function handle(): int
+    {
+        $pythonScript = base_path('scripts/peer_index.py');
+        $command = "python \"{$pythonScript}\" build --k=".(int) $this->option('k');
+
+        if ($this->option('full')) {
+            $command .= ' --full';
+        }
+
+        $result = Process::timeout(300)->run($command);
+        $data = json_decode($result->output(), true);
+
+        if (! $result->successful() || ! $data || ! ($data['success'] ?? false)) {
+            $this->error('Peer index build failed: '.($data['error'] ?? $result->errorOutput()));
+
+            return self::FAILURE;
+        }
+
+        $this->info("Peer index {$data['mode']} build ({$data['changed']} changed, {$data['rows']} rows, {$data['elapsed']}s).");
+
+        return self::SUCCESS;
+    }
+}
@@ -0,0 +1,76 @@
+<?php
+
+namespace App\Console\Commands;
+
+use Illuminate\Console\Command;
+use Illuminate\Support\Facades\Process;
+
+class ComputeBetasCommand extends Command
+{
+    protected $signature = 'stocks:compute-betas
+                            {--interval=1d : Price store interval (1d, 1wk, 1mo)}
+                            {--window= : Rolling window in bars}
+                            {--full : Rebuild the return matrix instead of appending new days}
+                            {--skip-benchmarks : Do not refresh sector ETF prices first}
+                            {--skip-backfill : Do not backfill stocks whose stored history is shorter than the window}';
+
+    protected $description = 'Compute betas, correlations and idiosyncratic volatility against sector ETFs and peers';
+
+    public function handle(): int
+    {
+        $pythonScript = base_path('scripts/beta_engine.py');
+        $interval = escapeshellarg($this->option('interval'));
+
+        if (! $this->option('skip-benchmarks')) {
+            $this->info('Refreshing benchmark ETF prices...');
+            $result = Process::timeout(300)->run("python \"{$pythonScript}\" fetch-benchmarks --interval {$interval}");
+            $data = json_decode($result->output(), true);
+
+            if (! $result->successful() || ! $data || ! ($data['success'] ?? false)) {
+                $this->error('Benchmark fetch failed: '.($data['error'] ?? $result->errorOutput()));
+
+                return self::FAILURE;
+            }
+        }
+
+        $windowArg = ($window = $this->option('window')) ? ' --window '.(int) $window : '';
+
+        // fetch_financials.py only stores monthly bars and the daily bulk_prices run only the last few days
+        if (! $this->option('skip-backfill')) {
+            $this->info('Backfilling short price histories...');
+            $result = Process::timeout(1800)->run("python \"{$pythonScript}\" backfill --interval {$interval}{$windowArg}");
+            $data = json_decode($result->output(), true);
+
+            if (! $result->successful() || ! $data || ! ($data['success'] ?? false)) {
+                $this->error('Price backfill failed: '.($data['error'] ?? $result->errorOutput()));
+
+                return self::FAILURE;
+            }
+
+            if ($data['short'] > 0) {
+                $this->info("Backfilled {$data['short']} stocks ({$data['appended']} bars).");
+            }
+        }
+
+        $this->info('Computing betas and correlations...');
+
+        $command = "python \"{$pythonScript}\" ".($this->option('full') ? 'build' : 'update')." --interval {$interval}{$windowArg}";
+
+        $result = Process::timeout(600)->run($command);
+        $data = json_decode($result->output(), true);
+
+        if (! $result->successful() || ! $data || ! ($data['success'] ?? false)) {
+            $this->error('Beta computation failed: '.($data['error'] ?? $result->errorOutput()));
+
+            return self::FAILURE;
+        }
+
+        $this->info("Updated betas for {$data['stocks']} stocks as of {$data['as_of']} ({$data['appended']} new bars).");
+
+        if ($data['short_history'] > 0) {
+            $this->warn("{$data['short_history']} stocks do not have enough history yet; their betas are null.");
+        }
+
+        return self::SUCCESS;
+    }
+}
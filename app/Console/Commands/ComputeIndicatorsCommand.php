@@ -0,0 +1,49 @@
+<?php
+
+namespace App\Console\Commands;
+
+use Illuminate\Console\Command;
+use Illuminate\Support\Facades\Process;
+
+class ComputeIndicatorsCommand extends Command
+{
+    protected $signature = 'stocks:compute-indicators
+                            {--ticker= : Compute specific ticker only}
+                            {--full : Recompute every ticker, not just those with new bars}';
+
+    protected $description = 'Precompute daily technical indicators (SMA/EMA, RSI, ATR, volatility, drawdown) from the daily price store';
+
+    public function handle(): int
+    {
+        $this->info('Computing technical indicators...');
+
+        $pythonScript = base_path('scripts/compute_indicators.py');
+        $command = "python \"{$pythonScript}\"";
+
+        if ($ticker = $this->option('ticker')) {
+            $command .= ' --ticker '.escapeshellarg(strtoupper($ticker));
+        }
+
+        if ($this->option('full')) {
+            $command .= ' --full';
+        }
+
+        $result = Process::timeout(600)->run($command);
+        $data = json_decode($result->output(), true);
+
+        if (! $result->successful() || ! $data || ! ($data['success'] ?? false)) {
+            $this->error('Indicator computation failed: '.($data['error'] ?? $result->errorOutput()));
+
+            return self::FAILURE;
+        }
+
+        $this->info("Updated indicators for {$data['updated']} stocks.");
+
+        if (! empty($data['missing'])) {
+            $this->warn(count($data['missing']).' stocks have no daily bars yet (stocks:compute-betas backfills them): '
+                .implode(', ', array_slice($data['missing'], 0, 20)));
+        }
+
+        return self::SUCCESS;
+    }
+}
@@ -0,0 +1,50 @@
+<?php
+
+namespace App\Console\Commands;
+
+use Illuminate\Console\Command;
+use Illuminate\Support\Facades\Process;
+
+class QueueSyncCommand extends Command
+{
+    protected $signature = 'stocks:queue-sync
+                            {--kind=yahoo : Task kind (yahoo, stockstory, sector_benchmarks)}
+                            {--tickers= : Comma separated tickers (default: all active stocks)}
+                            {--sections= : yahoo only: comma separated sections}
+                            {--due : yahoo only: fetch only sections that are due}
+                            {--batch= : Batch label for status reporting}';
+
+    protected $description = 'Enqueue per-ticker sync tasks for scripts/sync_worker.py workers to drain in parallel';
+
+    public function handle(): int
+    {
+        $pythonScript = base_path('scripts/sync_worker.py');
+        $command = "python \"{$pythonScript}\" enqueue --kind ".escapeshellarg($this->option('kind'));
+
+        foreach (['tickers', 'sections', 'batch'] as $option) {
+            if ($value = $this->option($option)) {
+                $command .= " --{$option} ".escapeshellarg($value);
+            }
+        }
+        if ($this->option('due')) {
+            $command .= ' --due';
+        }
+
+        $result = Process::timeout(120)->run($command);
+        $data = json_decode($result->output(), true);
+
+        if (! $result->successful() || ! $data || ! ($data['success'] ?? false)) {
+            $this->error('Enqueue failed: '.($data['error'] ?? $result->errorOutput()));
+
+            return self::FAILURE;
+        }
+
+        $this->info("Enqueued {$data['enqueued']} {$data['kind']} tasks in batch {$data['batch']} ({$data['skipped']} already queued).");
+        if (! empty($data['no_exchange'])) {
+            $this->warn('Skipped (no exchange): '.implode(', ', array_slice($data['no_exchange'], 0, 20)));
+        }
+        $this->line('Drain with: python scripts/sync_worker.py work --processes N');
+
+        return self::SUCCESS;
+    }
+}
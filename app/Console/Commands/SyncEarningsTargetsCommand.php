@@ -0,0 +1,89 @@
+<?php
+
+namespace App\Console\Commands;
+
+use App\Models\Stock;
+use App\Services\StockStoryService;
+use App\Services\YahooFinanceService;
+use Illuminate\Console\Command;
+use Illuminate\Support\Facades\Process;
+
+class SyncEarningsTargetsCommand extends Command
+{
+    protected $signature = 'stocks:sync-earnings-targets
+                            {--reported-days=3 : Refresh tickers that reported within this many days}
+                            {--upcoming-days=2 : Refresh estimates for tickers reporting within this many days}
+                            {--force-scan : Rescan every ticker calendar regardless of interval}
+                            {--scan-deadline=900 : Seconds to spend scanning; unscanned tickers carry over to the next run}';
+
+    protected $description = 'Scan the earnings calendar and refresh only tickers that just reported or are about to';
+
+    public function handle(YahooFinanceService $yahooService, StockStoryService $storyService): int
+    {
+        $pythonScript = base_path('scripts/earnings_calendar.py');
+
+        $this->info('Scanning earnings calendar...');
+        $scanDeadline = (int) $this->option('scan-deadline');
+        $scan = Process::timeout($scanDeadline + 300)->run(
+            "python \"{$pythonScript}\" scan --deadline {$scanDeadline}".($this->option('force-scan') ? ' --force' : '')
+        );
+        $scanData = json_decode($scan->output(), true);
+
+        if (! $scan->successful() || ! ($scanData['success'] ?? false)) {
+            $this->error('Calendar scan failed: '.($scanData['error'] ?? $scan->errorOutput()));
+
+            return self::FAILURE;
+        }
+
+        $this->info("Scanned {$scanData['scanned']} tickers ({$scanData['indexed']} indexed).");
+
+        if ($scanData['remaining'] ?? 0) {
+            $this->warn("Scan deadline reached: {$scanData['remaining']} tickers left for the next run.");
+        }
+
+        $plan = Process::timeout(60)->run(sprintf(
+            'python "%s" plan --reported-days %d --upcoming-days %d',
+            $pythonScript,
+            (int) $this->option('reported-days'),
+            (int) $this->option('upcoming-days')
+        ));
+        $planData = json_decode($plan->output(), true);
+
+        if (! $plan->successful() || ! ($planData['success'] ?? false)) {
+            $this->error('Refresh planning failed: '.($planData['error'] ?? $plan->errorOutput()));
+
+            return self::FAILURE;
+        }
+
+        $targets = $planData['targets'] ?? [];
+        $this->info(count($targets)." tickers to refresh, {$planData['slow_cadence']} left on slow cadence.");
+
+        $tableData = [];
+        foreach ($targets as $target) {
+            $stock = Stock::query()->where('ticker', $target['ticker'])->first();
+            if (! $stock) {
+                continue;
+            }
+
+            $result = $yahooService->syncStock($stock, $target['sections']);
+            $storyResult = $target['stockstory'] ? $storyService->syncStock($stock) : null;
+
+            $tableData[] = [
+                $target['ticker'],
+                $target['priority'],
+                $target['reason'],
+                $result['success'] ? '✓' : '✗ '.$result['message'],
+                $storyResult === null ? '-' : ($storyResult['success'] ? '✓' : '✗ '.$storyResult['message']),
+            ];
+
+            // Rate limiting: Yahoo Finance can be rate-limited
+            sleep(2);
+        }
+
+        if (! empty($tableData)) {
+            $this->table(['Ticker', 'Priority', 'Reason', 'Yahoo', 'StockStory'], $tableData);
+        }
+
+        return self::SUCCESS;
+    }
+}
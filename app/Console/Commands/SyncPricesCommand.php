@@ -0,0 +1,49 @@
+<?php
+
+namespace App\Console\Commands;
+
+use Illuminate\Console\Command;
+use Illuminate\Support\Facades\Process;
+
+class SyncPricesCommand extends Command
+{
+    protected $signature = 'stocks:sync-prices
+                            {--tickers= : Comma separated tickers (default: all active stocks)}
+                            {--period=5d : How much recent history to download}
+                            {--interval=1d : Bar interval (1d, 1wk, 1mo)}
+                            {--chunk-size=200 : Symbols per download request}';
+
+    protected $description = 'Bulk-download recent prices for the whole universe in a few multi-symbol requests';
+
+    public function handle(): int
+    {
+        $this->info('Downloading recent prices...');
+
+        $pythonScript = base_path('scripts/bulk_prices.py');
+        $command = "python \"{$pythonScript}\" --sink db --price-store"
+            .' --period '.escapeshellarg($this->option('period'))
+            .' --interval '.escapeshellarg($this->option('interval'))
+            .' --chunk-size '.(int) $this->option('chunk-size');
+
+        if ($tickers = $this->option('tickers')) {
+            $command .= ' --tickers '.escapeshellarg(strtoupper($tickers));
+        }
+
+        $result = Process::timeout(900)->run($command);
+        $data = json_decode($result->output(), true);
+
+        if (! $result->successful() || ! $data || ! ($data['success'] ?? false)) {
+            $this->error('Price download failed: '.($data['error'] ?? $result->errorOutput()));
+
+            return self::FAILURE;
+        }
+
+        $this->info("Received prices for {$data['received']}/{$data['requested']} tickers in {$data['requests']} requests ({$data['elapsed']}s).");
+
+        if (! empty($data['missing'])) {
+            $this->warn('Missing: '.implode(', ', array_slice($data['missing'], 0, 20)));
+        }
+
+        return self::SUCCESS;
+    }
+}
@@ -8,13 +8,18 @@
 
 class SyncYahooFinanceCommand extends Command
 {
-    protected $signature = 'stocks:sync-yahoo {--ticker= : Sync specific ticker only}';
+    protected $signature = 'stocks:sync-yahoo
+                            {--ticker= : Sync specific ticker only}
+                            {--sections= : Comma separated sections (info,statements,history,options,holdings,earnings)}
+                            {--due : Only fetch sections that are due per cadence policy}';
 
     protected $description = 'Sync stock data from Yahoo Finance (financials, fundamentals, prices)';
 
     public function handle(YahooFinanceService $yahooService): int
     {
         $ticker = $this->option('ticker');
+        $sections = array_filter(array_map('trim', explode(',', (string) $this->option('sections'))));
+        $dueOnly = (bool) $this->option('due');
 
         if ($ticker) {
             $stock = Stock::query()
@@ -28,10 +33,11 @@ public function handle(YahooFinanceService $yahooService): int
             }
 
             $this->info("Syncing Yahoo Finance data for {$ticker}...");
-            $result = $yahooService->syncStock($stock);
+            $result = $yahooService->syncStock($stock, $sections, $dueOnly);
 
             if ($result['success']) {
                 $this->info("✓ {$result['message']}");
+                $this->call('stocks:snapshot-fundamentals');
             } else {
                 $this->error("✗ {$result['message']}");
             }
@@ -47,7 +53,7 @@ public function handle(YahooFinanceService $yahooService): int
 
         $results = [];
         foreach ($stocks as $stock) {
-            $result = $yahooService->syncStock($stock);
+            $result = $yahooService->syncStock($stock, $sections, $dueOnly);
             $results[$stock->ticker] = $result;
             $progressBar->advance();
 
@@ -72,6 +78,8 @@ public function handle(YahooFinanceService $yahooService): int
         $successCount = count(array_filter($results, fn ($r) => $r['success']));
         $this->info("Sync completed! {$successCount}/{$stocks->count()} successful.");
 
+        $this->call('stocks:snapshot-fundamentals');
+
         return self::SUCCESS;
     }
 }
@@ -9,6 +9,7 @@
 use Illuminate\Http\JsonResponse;
 use Illuminate\Http\Request;
 use Illuminate\Support\Facades\DB;
+use Illuminate\Support\Facades\Storage;
 
 class ValuationController extends Controller
 {
@@ -126,4 +127,40 @@ public function sectorAnalysis(): JsonResponse
             'data' => $sectors,
         ]);
     }
+
+    public function revisions(Request $request): JsonResponse
+    {
+        $validated = $request->validate([
+            'sector' => 'nullable|string|max:50',
+            'limit' => 'nullable|integer|min:1|max:500',
+        ]);
+
+        $sector = $validated['sector'] ?? null;
+        $limit = (int) ($validated['limit'] ?? 50);
+
+        // Ranked table written by scripts/revision_momentum.py
+        $disk = Storage::disk('local');
+        if (! $disk->exists('revisions/rankings.json')) {
+            return response()->json([
+                'data' => [],
+                'generated_at' => null,
+            ]);
+        }
+
+        $table = json_decode($disk->get('revisions/rankings.json'), true);
+        $rows = collect($table['rows'] ?? [])
+            ->whereNotNull('rank')
+            ->when($sector, fn ($rows) => $rows->where('sector', $sector))
+            ->take($limit)
+            ->values();
+
+        return response()->json([
+            'data' => $rows,
+            'generated_at' => $table['generated_at'] ?? null,
+            'filters' => [
+                'sector' => $sector,
+                'limit' => $limit,
+            ],
+        ]);
+    }
 }
@@ -91,6 +91,9 @@ public function show(string $ticker): Response
             ->limit(12)
             ->get();
 
+        // 사전 계산된 기술적 지표
+        $indicators = $stock->indicator;
+
         // 옵션 데이터 (만기일별 요약)
         $options = $stock->options()
             ->selectRaw('option_type, expiration_date, COUNT(*) as count, SUM(volume) as total_volume, SUM(open_interest) as total_open_interest')
@@ -142,6 +145,7 @@ public function show(string $ticker): Response
             'cashflows' => $cashflows,
             'balanceSheets' => $balanceSheets,
             'prices' => $prices,
+            'indicators' => $indicators,
             'options' => $options,
             'institutionalHolders' => $institutionalHolders,
             'insiderTransactions' => $insiderTransactions,
@@ -119,6 +119,14 @@ public function analystRating(): HasOne
         return $this->hasOne(AnalystRating::class);
     }
 
+    /**
+     * @return HasOne<StockIndicator, $this>
+     */
+    public function indicator(): HasOne
+    {
+        return $this->hasOne(StockIndicator::class);
+    }
+
     /**
      * @return HasOne<StockStoryAnalysis, $this>
      */
@@ -0,0 +1,56 @@
+<?php
+
+namespace App\Models;
+
+use Illuminate\Database\Eloquent\Model;
+use Illuminate\Database\Eloquent\Relations\BelongsTo;
+
+class StockIndicator extends Model
+{
+    protected $fillable = [
+        'stock_id',
+        'as_of_date',
+        'bar_count',
+        'close',
+        'sma',
+        'ema',
+        'rsi_14',
+        'atr_14',
+        'volatility',
+        'drawdown',
+        'max_drawdown',
+        'week_52_high',
+        'week_52_low',
+        'week_52_percentile',
+    ];
+
+    /**
+     * @return array<string, string>
+     */
+    protected function casts(): array
+    {
+        return [
+            'as_of_date' => 'date',
+            'bar_count' => 'integer',
+            'close' => 'decimal:4',
+            'sma' => 'array',
+            'ema' => 'array',
+            'rsi_14' => 'decimal:4',
+            'atr_14' => 'decimal:4',
+            'volatility' => 'decimal:6',
+            'drawdown' => 'decimal:6',
+            'max_drawdown' => 'decimal:6',
+            'week_52_high' => 'decimal:4',
+            'week_52_low' => 'decimal:4',
+            'week_52_percentile' => 'decimal:4',
+        ];
+    }
+
+    /**
+     * @return BelongsTo<Stock, $this>
+     */
+    public function stock(): BelongsTo
+    {
+        return $this->belongsTo(Stock::class);
+    }
+}
@@ -30,8 +30,9 @@ public function syncStock(Stock $stock): array
             $exchange = strtolower($stock->exchange);
             $ticker = strtolower($stock->ticker);
 
+            // Script deadline stays below the process timeout so partial results come back instead of a kill
             $result = Process::timeout(60)->run(
-                "python \"{$this->pythonScript}\" {$ticker} {$exchange}"
+                "python \"{$this->pythonScript}\" {$ticker} {$exchange} --stream --deadline=50"
             );
 
             $responseTime = (int) ((microtime(true) - $startTime) * 1000);
@@ -53,9 +54,19 @@ public function syncStock(Stock $stock): array
 
             $this->logRequest($stock->ticker, 'fetch_stockstory', 200, $responseTime);
 
-            $this->saveAnalysis($stock, $data['data'] ?? []);
-
-            return ['success' => true, 'message' => 'StockStory sync completed successfully'];
+            $timedOut = (bool) ($data['timed_out'] ?? false);
+            // The stream only stops before EOF once every field is found or the byte budget runs out; keep unread fields
+            $stoppedEarly = (bool) ($data['stopped_early'] ?? false);
+            $this->saveAnalysis($stock, $data['data'] ?? [], $timedOut || $stoppedEarly);
+
+            return [
+                'success' => true,
+                'message' => match (true) {
+                    $timedOut => 'StockStory sync completed with partial data (deadline reached)',
+                    $stoppedEarly => 'StockStory sync completed (stream stopped early, only found fields updated)',
+                    default => 'StockStory sync completed successfully',
+                },
+            ];
         } catch (\Exception $e) {
             $responseTime = (int) ((microtime(true) - $startTime) * 1000);
             $this->logRequest($stock->ticker, 'fetch_stockstory', null, $responseTime, $e->getMessage());
@@ -67,48 +78,52 @@ public function syncStock(Stock $stock): array
 
     /**
      * @param  array<string, mixed>  $data
+     * @param  bool  $partial  Page was not read to the end: only overwrite fields that were found
      */
-    private function saveAnalysis(Stock $stock, array $data): void
+    private function saveAnalysis(Stock $stock, array $data, bool $partial = false): void
     {
         if (empty($data)) {
             return;
         }
 
-        StockStoryAnalysis::query()->updateOrCreate(
-            ['stock_id' => $stock->id],
-            [
-                'investment_rating' => $data['investment_rating'] ?? null,
-                'analysis_summary' => $data['analysis_summary'] ?? null,
-                'latest_quarter_label' => $data['latest_quarter_label'] ?? null,
-                'quarterly_revenue' => $data['quarterly_revenue'] ?? null,
-                'quarterly_eps' => $data['quarterly_eps'] ?? null,
-                'quarterly_gross_margin' => $data['quarterly_gross_margin'] ?? null,
-                'quarterly_operating_margin' => $data['quarterly_operating_margin'] ?? null,
-                'revenue_beat_percent' => $data['revenue_beat_percent'] ?? null,
-                'eps_beat_percent' => $data['eps_beat_percent'] ?? null,
-                'guidance_revenue' => $data['guidance_revenue'] ?? null,
-                'guidance_eps' => $data['guidance_eps'] ?? null,
-                'guidance_revenue_vs_estimate' => $data['guidance_revenue_vs_estimate'] ?? null,
-                'guidance_eps_vs_estimate' => $data['guidance_eps_vs_estimate'] ?? null,
-                'revenue_cagr_5y' => $data['revenue_cagr_5y'] ?? null,
-                'revenue_cagr_2y' => $data['revenue_cagr_2y'] ?? null,
-                'eps_cagr_5y' => $data['eps_cagr_5y'] ?? null,
-                'wall_street_revenue_estimate' => $data['wall_street_revenue_estimate'] ?? null,
-                'wall_street_eps_estimate' => $data['wall_street_eps_estimate'] ?? null,
-                'gross_margin' => $data['gross_margin'] ?? null,
-                'operating_margin' => $data['operating_margin'] ?? null,
-                'gross_margin_trend' => $data['gross_margin_trend'] ?? null,
-                'operating_margin_trend' => $data['operating_margin_trend'] ?? null,
-                'roic' => $data['roic'] ?? null,
-                'cash' => $data['cash'] ?? null,
-                'debt' => $data['debt'] ?? null,
-                'net_debt_to_ebitda' => $data['net_debt_to_ebitda'] ?? null,
-                'quality_score' => $data['quality_score'] ?? null,
-                'value_score' => $data['value_score'] ?? null,
-                'key_highlights' => $data['key_highlights'] ?? null,
-                'chart_urls' => $data['chart_urls'] ?? null,
-            ]
-        );
+        $attributes = [
+            'investment_rating' => $data['investment_rating'] ?? null,
+            'analysis_summary' => $data['analysis_summary'] ?? null,
+            'latest_quarter_label' => $data['latest_quarter_label'] ?? null,
+            'quarterly_revenue' => $data['quarterly_revenue'] ?? null,
+            'quarterly_eps' => $data['quarterly_eps'] ?? null,
+            'quarterly_gross_margin' => $data['quarterly_gross_margin'] ?? null,
+            'quarterly_operating_margin' => $data['quarterly_operating_margin'] ?? null,
+            'revenue_beat_percent' => $data['revenue_beat_percent'] ?? null,
+            'eps_beat_percent' => $data['eps_beat_percent'] ?? null,
+            'guidance_revenue' => $data['guidance_revenue'] ?? null,
+            'guidance_eps' => $data['guidance_eps'] ?? null,
+            'guidance_revenue_vs_estimate' => $data['guidance_revenue_vs_estimate'] ?? null,
+            'guidance_eps_vs_estimate' => $data['guidance_eps_vs_estimate'] ?? null,
+            'revenue_cagr_5y' => $data['revenue_cagr_5y'] ?? null,
+            'revenue_cagr_2y' => $data['revenue_cagr_2y'] ?? null,
+            'eps_cagr_5y' => $data['eps_cagr_5y'] ?? null,
+            'wall_street_revenue_estimate' => $data['wall_street_revenue_estimate'] ?? null,
+            'wall_street_eps_estimate' => $data['wall_street_eps_estimate'] ?? null,
+            'gross_margin' => $data['gross_margin'] ?? null,
+            'operating_margin' => $data['operating_margin'] ?? null,
+            'gross_margin_trend' => $data['gross_margin_trend'] ?? null,
+            'operating_margin_trend' => $data['operating_margin_trend'] ?? null,
+            'roic' => $data['roic'] ?? null,
+            'cash' => $data['cash'] ?? null,
+            'debt' => $data['debt'] ?? null,
+            'net_debt_to_ebitda' => $data['net_debt_to_ebitda'] ?? null,
+            'quality_score' => $data['quality_score'] ?? null,
+            'value_score' => $data['value_score'] ?? null,
+            'key_highlights' => $data['key_highlights'] ?? null,
+            'chart_urls' => $data['chart_urls'] ?? null,
+        ];
+
+        if ($partial) {
+            $attributes = array_filter($attributes, fn ($value) => $value !== null && $value !== []);
+        }
+
+        StockStoryAnalysis::query()->updateOrCreate(['stock_id' => $stock->id], $attributes);
     }
 
     private function logRequest(
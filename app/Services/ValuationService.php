@@ -5,9 +5,18 @@
 use App\Models\SectorBenchmark;
 use App\Models\Stock;
 use App\Models\StockFundamental;
+use Illuminate\Support\Facades\Storage;
 
 class ValuationService
 {
+    /**
+     * 밸류에이션 지표를 뺀 유사 종목 인덱스 (scripts/peer_index.py가 생성한 peers/fundamental_peers.json)
+     * PER이 비슷한 종목으로 PER 적정가치를 내면 순환 논리가 되므로 peers.json 대신 사용
+     *
+     * @var array<string, array<int, array{ticker: string, distance: float}>>|null
+     */
+    private ?array $peerIndex = null;
+
     /**
      * Calculate comprehensive valuation for a stock.
      *
@@ -44,6 +53,14 @@ public function calculateValuation(Stock $stock): array
             $valuations['per_based'] = $this->calculatePerBasedValue($eps, $currentPrice, $sectorBenchmark);
         }
 
+        // 1-1. 유사 종목 PER 기반 적정가치 (펀더멘털 벡터 최근접 종목의 PER 중앙값)
+        if ($eps && $eps > 0) {
+            $peerPers = $this->getPeerPers($stock);
+            if (count($peerPers) >= 3) {
+                $valuations['peer_per_based'] = $this->calculatePeerPerBasedValue($eps, $currentPrice, $peerPers);
+            }
+        }
+
         // 2. PBR 기반 적정가치
         if ($bookValue && $bookValue > 0) {
             $valuations['pbr_based'] = $this->calculatePbrBasedValue($bookValue, $currentPrice, $sectorBenchmark);
@@ -138,6 +155,73 @@ private function calculatePerBasedValue(float $eps, ?float $currentPrice, ?Secto
         ];
     }
 
+    /**
+     * 유사 종목 PER 조회 (가까운 순, 양수 PER만)
+     *
+     * @return array<string, float>
+     */
+    private function getPeerPers(Stock $stock): array
+    {
+        if ($this->peerIndex === null) {
+            $json = Storage::disk('local')->exists('peers/fundamental_peers.json')
+                ? Storage::disk('local')->get('peers/fundamental_peers.json')
+                : null;
+            $this->peerIndex = $json ? (json_decode($json, true) ?? []) : [];
+        }
+
+        $peers = array_column($this->peerIndex[$stock->ticker] ?? [], 'ticker');
+        if (empty($peers)) {
+            return [];
+        }
+
+        $pers = [];
+        $stocks = Stock::query()
+            ->whereIn('ticker', $peers)
+            ->with(['fundamentals' => fn ($query) => $query->latest('date')->limit(1)])
+            ->get()
+            ->keyBy('ticker');
+
+        foreach ($peers as $ticker) {
+            $pe = $stocks->get($ticker)?->fundamentals->first()?->pe_ratio;
+            if ($pe && $pe > 0) {
+                $pers[$ticker] = (float) $pe;
+            }
+        }
+
+        return $pers;
+    }
+
+    /**
+     * 유사 종목 PER 기반 적정가치 계산
+     *
+     * @param  array<string, float>  $peerPers
+     */
+    private function calculatePeerPerBasedValue(float $eps, ?float $currentPrice, array $peerPers): array
+    {
+        $sorted = array_values($peerPers);
+        sort($sorted);
+        $count = count($sorted);
+        $middle = intdiv($count, 2);
+
+        // 유사 종목 PER 중앙값 / 하위·상위 사분위수
+        $medianPer = $count % 2 ? $sorted[$middle] : ($sorted[$middle - 1] + $sorted[$middle]) / 2;
+        $lowerPer = $sorted[intdiv($count, 4)];
+        $upperPer = $sorted[intdiv($count * 3, 4)];
+
+        $fairValue = $eps * $medianPer;
+
+        return [
+            'method' => 'PER 기반 (유사 종목 '.$count.'개)',
+            'conservative' => round($eps * $lowerPer, 2),
+            'fair_value' => round($fairValue, 2),
+            'optimistic' => round($eps * $upperPer, 2),
+            'peer_per' => round($medianPer, 2),
+            'peers' => array_keys($peerPers),
+            'current_per' => $currentPrice && $eps > 0 ? round($currentPrice / $eps, 2) : null,
+            'assessment' => $this->assessValue($currentPrice, $fairValue),
+        ];
+    }
+
     /**
      * PBR 기반 적정가치 계산
      */
@@ -284,6 +368,7 @@ private function calculateWeightedFairValue(array $valuations): ?float
         $weights = [
             'dcf_based' => 0.30,   // DCF: 현금흐름 기반, 가장 신뢰도 높음
             'per_based' => 0.25,   // PER: 수익 기반, 널리 사용됨
+            'peer_per_based' => 0.20, // 유사 종목 PER: 섹터보다 촘촘한 비교 집단
             'pbr_based' => 0.15,   // PBR: 자산 기반
             'peg_based' => 0.15,   // PEG: 성장률 반영
             'graham' => 0.15,      // Graham: 보수적 가치투자 관점
@@ -11,6 +11,7 @@
 use App\Models\InstitutionalHolder;
 use App\Models\Stock;
 use App\Models\StockFundamental;
+use App\Models\StockIndicator;
 use App\Models\StockOption;
 use App\Models\StockPrice;
 use Carbon\Carbon;
@@ -27,16 +28,43 @@ public function __construct()
     }
 
     /**
-     * Fetch and sync all data for a stock.
+     * Fetch and sync data for a stock.
      *
+     * @param  array<int, string>  $sections  Sections to fetch (info, statements, history, options, holdings, earnings); empty for all
+     * @param  bool  $dueOnly  Only fetch sections that are due per the script's cadence policy
      * @return array{success: bool, message: string}
      */
-    public function syncStock(Stock $stock): array
+    public function syncStock(Stock $stock, array $sections = [], bool $dueOnly = false): array
     {
         $startTime = microtime(true);
 
         try {
-            $result = Process::timeout(120)->run("python \"{$this->pythonScript}\" {$stock->ticker}");
+            $command = "python \"{$this->pythonScript}\" {$stock->ticker}";
+            if (! empty($sections)) {
+                $command .= ' --sections '.escapeshellarg(implode(',', $sections));
+            }
+            if ($dueOnly) {
+                $command .= ' --due';
+            }
+            if (config('services.yahoo_finance.direct_write')) {
+                $command .= ' --sink db';
+            }
+            if (config('services.yahoo_finance.price_store')) {
+                $command .= ' --price-store';
+            }
+            if (config('services.yahoo_finance.options_store')) {
+                $command .= ' --options-store';
+            }
+            if (config('services.yahoo_finance.holdings_index')) {
+                $command .= ' --holdings-index';
+            }
+            if (config('services.yahoo_finance.revision_engine')) {
+                $command .= ' --revision-engine';
+            }
+            // Keep the script deadline below the process timeout so slow sections are dropped instead of the whole run
+            $command .= ' --deadline '.(int) config('services.yahoo_finance.deadline', 110);
+
+            $result = Process::timeout(120)->run($command);
 
             $responseTime = (int) ((microtime(true) - $startTime) * 1000);
 
@@ -57,6 +85,11 @@ public function syncStock(Stock $stock): array
 
             $this->logRequest($stock->ticker, 'fetch_financials', 200, $responseTime);
 
+            // Rows were already bulk-upserted by the script
+            if ($data['sink']['written'] ?? false) {
+                return ['success' => true, 'message' => $this->completionMessage($data)];
+            }
+
             // Save fundamentals
             $this->saveFundamentals($stock, $data['info'] ?? []);
 
@@ -68,6 +101,9 @@ public function syncStock(Stock $stock): array
             // Save price history
             $this->savePriceHistory($stock, $data['history'] ?? []);
 
+            // Save precomputed technical indicators
+            $this->saveIndicators($stock, $data['indicators'] ?? []);
+
             // Save options data
             $this->saveOptions($stock, $data['options'] ?? []);
 
@@ -77,7 +113,7 @@ public function syncStock(Stock $stock): array
             // Save earnings data (estimates, history, analyst ratings)
             $this->saveEarnings($stock, $data['earnings'] ?? []);
 
-            return ['success' => true, 'message' => 'Sync completed successfully'];
+            return ['success' => true, 'message' => $this->completionMessage($data)];
         } catch (\Exception $e) {
             $responseTime = (int) ((microtime(true) - $startTime) * 1000);
             $this->logRequest($stock->ticker, 'fetch_financials', null, $responseTime, $e->getMessage());
@@ -87,6 +123,29 @@ public function syncStock(Stock $stock): array
         }
     }
 
+    /**
+     * @param  array<string, mixed>  $data
+     */
+    private function completionMessage(array $data): string
+    {
+        $skipped = array_keys(array_filter(
+            $data['sections']['skipped'] ?? [],
+            fn ($reason) => $reason !== 'not requested'
+        ));
+
+        $notes = [];
+        if (! empty($skipped)) {
+            $notes[] = 'skipped: '.implode(', ', $skipped);
+        }
+        if (! empty($data['sections']['timed_out'])) {
+            $notes[] = 'timed out: '.implode(', ', array_keys($data['sections']['timed_out']));
+        }
+
+        return empty($notes)
+            ? 'Sync completed successfully'
+            : 'Sync completed successfully ('.implode('; ', $notes).')';
+    }
+
     /**
      * @param  array<string, mixed>  $info
      */
@@ -253,6 +312,35 @@ private function savePriceHistory(Stock $stock, array $history): void
         }
     }
 
+    /**
+     * @param  array<string, mixed>  $indicators
+     */
+    private function saveIndicators(Stock $stock, array $indicators): void
+    {
+        if (empty($indicators['as_of_date']) || isset($indicators['error'])) {
+            return;
+        }
+
+        StockIndicator::query()->updateOrCreate(
+            ['stock_id' => $stock->id],
+            [
+                'as_of_date' => Carbon::parse($indicators['as_of_date'])->toDateString(),
+                'bar_count' => $indicators['bar_count'] ?? 0,
+                'close' => $indicators['close'] ?? null,
+                'sma' => $indicators['sma'] ?? null,
+                'ema' => $indicators['ema'] ?? null,
+                'rsi_14' => $indicators['rsi_14'] ?? null,
+                'atr_14' => $indicators['atr_14'] ?? null,
+                'volatility' => $indicators['volatility'] ?? null,
+                'drawdown' => $indicators['drawdown'] ?? null,
+                'max_drawdown' => $indicators['max_drawdown'] ?? null,
+                'week_52_high' => $indicators['week_52_high'] ?? null,
+                'week_52_low' => $indicators['week_52_low'] ?? null,
+                'week_52_percentile' => $indicators['week_52_percentile'] ?? null,
+            ]
+        );
+    }
+
     /**
      * @param  array{expiration_dates?: array<string>, chains?: array<array<string, mixed>>, error?: string}  $optionsData
      */
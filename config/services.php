@@ -43,4 +43,19 @@
         'key' => env('FINNHUB_API_KEY'),
     ],
 
+    'yahoo_finance' => [
+        // Let scripts/fetch_financials.py bulk-upsert results directly instead of saving row by row here
+        'direct_write' => env('YAHOO_FINANCE_DIRECT_WRITE', false),
+        // Also append history bars to the local memory-mapped store (scripts/price_store.py)
+        'price_store' => env('YAHOO_FINANCE_PRICE_STORE', false),
+        // Also keep daily option chain snapshots as per-expiry deltas (scripts/options_store.py)
+        'options_store' => env('YAHOO_FINANCE_OPTIONS_STORE', false),
+        // Also keep the holder -> positions inverted index current (scripts/holdings_index.py)
+        'holdings_index' => env('YAHOO_FINANCE_HOLDINGS_INDEX', false),
+        // Also feed estimate revisions into the universe momentum rankings (scripts/revision_momentum.py)
+        'revision_engine' => env('YAHOO_FINANCE_REVISION_ENGINE', false),
+        // Seconds fetch_financials.py may spend before returning partial results (process timeout is 120s)
+        'deadline' => env('YAHOO_FINANCE_DEADLINE', 110),
+    ],
+
 ];
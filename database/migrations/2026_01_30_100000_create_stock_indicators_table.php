@@ -0,0 +1,50 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Database\Schema\Blueprint;
+use Illuminate\Support\Facades\Schema;
+
+return new class extends Migration
+{
+    /**
+     * Run the migrations.
+     */
+    public function up(): void
+    {
+        Schema::create('stock_indicators', function (Blueprint $table) {
+            $table->id();
+            $table->foreignId('stock_id')->unique()->constrained()->cascadeOnDelete();
+            $table->date('as_of_date');
+            $table->unsignedInteger('bar_count')->default(0);
+            $table->decimal('close', 12, 4)->nullable();
+
+            // 이동평균 사다리 (기간 => 값)
+            $table->json('sma')->nullable();
+            $table->json('ema')->nullable();
+
+            // 모멘텀 / 변동성
+            $table->decimal('rsi_14', 8, 4)->nullable();
+            $table->decimal('atr_14', 12, 4)->nullable();
+            $table->decimal('volatility', 12, 6)->nullable();
+
+            // 낙폭
+            $table->decimal('drawdown', 12, 6)->nullable();
+            $table->decimal('max_drawdown', 12, 6)->nullable();
+
+            // 52주 위치
+            $table->decimal('week_52_high', 12, 4)->nullable();
+            $table->decimal('week_52_low', 12, 4)->nullable();
+            $table->decimal('week_52_percentile', 8, 4)->nullable();
+
+            $table->timestamps();
+        });
+    }
+
+    /**
+     * Reverse the migrations.
+     */
+    public function down(): void
+    {
+        Schema::dropIfExists('stock_indicators');
+    }
+};
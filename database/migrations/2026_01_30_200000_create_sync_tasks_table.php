@@ -0,0 +1,50 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Database\Schema\Blueprint;
+use Illuminate\Support\Facades\Schema;
+
+return new class extends Migration
+{
+    /**
+     * Run the migrations.
+     */
+    public function up(): void
+    {
+        // 종목 단위 수집 작업 큐 (scripts/sync_worker.py가 여러 프로세스/노드에서 임대 후 처리)
+        Schema::create('sync_tasks', function (Blueprint $table) {
+            $table->id();
+            $table->string('kind', 32);
+            $table->string('ticker', 20)->nullable();
+            $table->text('payload')->nullable();
+            $table->string('batch', 64)->nullable();
+
+            // pending → leased → done / failed
+            $table->string('status', 16)->default('pending');
+            $table->unsignedTinyInteger('attempts')->default(0);
+            $table->unsignedTinyInteger('max_attempts')->default(3);
+            $table->unsignedInteger('available_at');
+
+            // 임대: 만료 시각이 지나면 다른 워커가 다시 가져감, 완료는 토큰이 일치할 때만 기록
+            $table->unsignedInteger('leased_until')->nullable();
+            $table->string('leased_by')->nullable();
+            $table->string('lease_token', 36)->nullable();
+
+            $table->longText('result')->nullable();
+            $table->text('last_error')->nullable();
+            $table->unsignedInteger('finished_at')->nullable();
+            $table->timestamps();
+
+            $table->index(['status', 'kind', 'available_at']);
+            $table->index('batch');
+        });
+    }
+
+    /**
+     * Reverse the migrations.
+     */
+    public function down(): void
+    {
+        Schema::dropIfExists('sync_tasks');
+    }
+};
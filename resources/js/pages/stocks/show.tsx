@@ -55,6 +55,20 @@ interface Price {
     volume: number | null;
 }
 
+interface Indicators {
+    as_of_date: string;
+    sma: Record<string, number | null> | null;
+    ema: Record<string, number | null> | null;
+    rsi_14: number | null;
+    atr_14: number | null;
+    volatility: number | null;
+    drawdown: number | null;
+    max_drawdown: number | null;
+    week_52_high: number | null;
+    week_52_low: number | null;
+    week_52_percentile: number | null;
+}
+
 interface OptionSummary {
     option_type: 'call' | 'put';
     expiration_date: string;
@@ -166,6 +180,7 @@ interface Props {
     financials: Financial[];
     cashflows: Cashflow[];
     prices: Price[];
+    indicators: Indicators | null;
     options: OptionSummary[];
     institutionalHolders: InstitutionalHolder[];
     insiderTransactions: InsiderTransaction[];
@@ -252,6 +267,10 @@ function getMethodDescription(key: string): MethodDescription {
             formula: '적정가치 = EPS × 적정 PER',
             description: '주당순이익(EPS)에 업종 평균 PER(15~25)을 곱하여 산출. 보수적 15배, 적정 20배, 낙관적 25배 적용.',
         },
+        peer_per_based: {
+            formula: '적정가치 = EPS × 유사 종목 PER 중앙값',
+            description: '마진·성장률·레버리지·규모가 가장 비슷한 종목(밸류에이션 지표는 제외하고 선정)의 PER 중앙값을 적용. 보수적은 하위 사분위수, 낙관적은 상위 사분위수 PER 적용.',
+        },
         pbr_based: {
             formula: '적정가치 = 주당순자산 × 적정 PBR',
             description: '주당순자산(BPS)에 적정 PBR을 곱하여 산출. 기술주 기준 보수적 2배, 적정 3배, 낙관적 5배 적용.',
@@ -272,7 +291,7 @@ function getMethodDescription(key: string): MethodDescription {
     return descriptions[key] || { formula: '-', description: '-' };
 }
 
-export default function StockShow({ stock, fundamental, financials, cashflows, prices, options, institutionalHolders, insiderTransactions, earningsEstimates, earningsHistories, analystRating, sectorBenchmark, valuation }: Props) {
+export default function StockShow({ stock, fundamental, financials, cashflows, prices, indicators, options, institutionalHolders, insiderTransactions, earningsEstimates, earningsHistories, analystRating, sectorBenchmark, valuation }: Props) {
     const hasData = !!fundamental && !valuation.error;
 
     return (
@@ -772,13 +791,13 @@ export default function StockShow({ stock, fundamental, financials, cashflows, p
                                             <div>
                                                 <p className="text-sm text-gray-500 dark:text-gray-400">52주 최고</p>
                                                 <p className="text-lg font-semibold text-gray-900 dark:text-white">
-                                                    ${formatNumber(Math.max(...prices.slice(0, 12).map(p => p.close ?? 0)))}
+                                                    ${formatNumber(indicators?.week_52_high ?? Math.max(...prices.slice(0, 12).map(p => p.close ?? 0)))}
                                                 </p>
                                             </div>
                                             <div>
                                                 <p className="text-sm text-gray-500 dark:text-gray-400">52주 최저</p>
                                                 <p className="text-lg font-semibold text-gray-900 dark:text-white">
-                                                    ${formatNumber(Math.min(...prices.slice(0, 12).filter(p => p.close).map(p => p.close as number)))}
+                                                    ${formatNumber(indicators?.week_52_low ?? Math.min(...prices.slice(0, 12).filter(p => p.close).map(p => p.close as number)))}
                                                 </p>
                                             </div>
                                             <div>
@@ -788,6 +807,37 @@ export default function StockShow({ stock, fundamental, financials, cashflows, p
                                                 </p>
                                             </div>
                                         </div>
+                                        {/* Precomputed Indicators */}
+                                        {indicators && (
+                                            <div className="mt-4 grid grid-cols-2 gap-4 border-t pt-4 dark:border-gray-700 md:grid-cols-5">
+                                                <div>
+                                                    <p className="text-sm text-gray-500 dark:text-gray-400">RSI (14일)</p>
+                                                    <p className="text-lg font-semibold text-gray-900 dark:text-white">{formatNumber(indicators.rsi_14, 1)}</p>
+                                                </div>
+                                                <div>
+                                                    <p className="text-sm text-gray-500 dark:text-gray-400">SMA 20일 / 50일</p>
+                                                    <p className="text-lg font-semibold text-gray-900 dark:text-white">
+                                                        ${formatNumber(indicators.sma?.['20'] ?? null)} / ${formatNumber(indicators.sma?.['50'] ?? null)}
+                                                    </p>
+                                                </div>
+                                                <div>
+                                                    <p className="text-sm text-gray-500 dark:text-gray-400">변동성 (연율)</p>
+                                                    <p className="text-lg font-semibold text-gray-900 dark:text-white">
+                                                        {indicators.volatility !== null ? formatPercent(indicators.volatility * 100) : '-'}
+                                                    </p>
+                                                </div>
+                                                <div>
+                                                    <p className="text-sm text-gray-500 dark:text-gray-400">최대 낙폭</p>
+                                                    <p className="text-lg font-semibold text-red-600">
+                                                        {indicators.max_drawdown !== null ? formatPercent(indicators.max_drawdown * 100) : '-'}
+                                                    </p>
+                                                </div>
+                                                <div>
+                                                    <p className="text-sm text-gray-500 dark:text-gray-400">52주 위치</p>
+                                                    <p className="text-lg font-semibold text-gray-900 dark:text-white">{formatPercent(indicators.week_52_percentile)}</p>
+                                                </div>
+                                            </div>
+                                        )}
                                     </div>
                                 </div>
                             )}
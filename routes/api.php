@@ -23,6 +23,7 @@
     Route::get('valuation/undervalued', [ValuationController::class, 'undervalued'])->name('api.v1.valuation.undervalued');
     Route::get('valuation/compare', [ValuationController::class, 'compare'])->name('api.v1.valuation.compare');
     Route::get('valuation/sector-analysis', [ValuationController::class, 'sectorAnalysis'])->name('api.v1.valuation.sector-analysis');
+    Route::get('valuation/revisions', [ValuationController::class, 'revisions'])->name('api.v1.valuation.revisions');
 
     // Admin (sync)
     Route::post('admin/sync/{ticker?}', [AdminController::class, 'sync'])->name('api.v1.admin.sync');
@@ -13,10 +13,39 @@
 Schedule::command('stocks:sync-all')
     ->weekdays()
     ->at('21:30')
-    ->timezone('UTC');
+    ->timezone('UTC')
+    ->withoutOverlapping();
 
 // Saturday full sync at 10:00 KST (01:00 UTC)
 Schedule::command('stocks:sync-all')
     ->saturdays()
     ->at('01:00')
+    ->timezone('UTC')
+    ->withoutOverlapping();
+
+// Daily close for the whole universe in a few bulk requests (after US close)
+Schedule::command('stocks:sync-prices')
+    ->weekdays()
+    ->at('21:15')
+    ->timezone('UTC')
+    ->withoutOverlapping();
+
+// Technical indicators after the weekday sync (incremental: only tickers with new bars)
+Schedule::command('stocks:compute-indicators')
+    ->weekdays()
+    ->at('23:00')
+    ->timezone('UTC');
+
+// Earnings-driven refresh: only tickers that just reported or are about to (05:30 KST)
+// Runs 45 minutes ahead of sync-prices with a 15 minute calendar scan budget so the Yahoo-heavy jobs do not run together
+Schedule::command('stocks:sync-earnings-targets')
+    ->weekdays()
+    ->at('20:30')
+    ->timezone('UTC')
+    ->withoutOverlapping();
+
+// Betas / correlations against sector ETFs after indicators (incremental: appends new days only)
+Schedule::command('stocks:compute-betas')
+    ->weekdays()
+    ->at('23:15')
     ->timezone('UTC');
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+유니버스 베타 / 상관관계 엔진
+전 종목 + 섹터 벤치마크 ETF(SECTOR_ETFS) + 시장(SPY) 수익률을 하나의 정렬된 행렬로 만들고,
+최근 window 구간의 쌍별 합계(개수/합/교차곱/제곱합) 행렬을 유지하여
+섹터 ETF 대비 베타·상관, 고유 변동성, 동종 종목 상관을 행렬 연산으로 계산.
+새 거래일 수익률이 추가되면 합계 행렬을 rank-k 갱신 (전체 재계산 불필요)
+
+사용법:
+  python beta_engine.py fetch-benchmarks [--interval 1d] [--period 5y]
+  python beta_engine.py backfill [--interval 1d]   # window에 못 미치는 종목 가격을 bulk_prices로 일괄 백필
+  python beta_engine.py build [--window 252] [--interval 1d]
+  python beta_engine.py update [--interval 1d]
+"""
+
+import os
+import sys
+import json
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+import db
+from price_store import PriceStore, from_day
+from fetch_sector_benchmarks import SECTOR_ETFS
+
+MARKET_ETF = "SPY"
+PERIODS_PER_YEAR = {"1d": 252, "1wk": 52, "1mo": 12}
+DEFAULT_WINDOW = {"1d": 252, "1wk": 104, "1mo": 60}
+# 백필 기간: window보다 넉넉하게 (fetch_financials.py는 월봉만, bulk_prices 기본은 최근 5일만 저장)
+BACKFILL_PERIOD = {"1d": "2y", "1wk": "5y", "1mo": "10y"}
+# 베타를 계산할 수 없는(min_periods 미만) 종목이 이 비율을 넘으면 null 결과 대신 오류
+MAX_SHORT_RATIO = 0.5
+TOP_PEERS = 5
+
+
+def engine_dir(interval: str) -> str:
+    return db.storage_path("betas", interval)
+
+
+def benchmark_tickers() -> list:
+    return [MARKET_ETF] + [etf for etf, _, _ in SECTOR_ETFS]
+
+
+def load_universe(database) -> list:
+    """활성 종목과 섹터 벤치마크 ETF"""
+    return database.fetch_all(
+        "SELECT s.ticker, sec.code AS sector_code, sec.benchmark_etf "
+        "FROM stocks s LEFT JOIN sectors sec ON sec.id = s.sector_id "
+        "WHERE s.is_active = 1 ORDER BY s.ticker"
+    )
+
+
+def fetch_benchmarks(interval="1d", period="5y") -> dict:
+    """벤치마크 ETF 가격을 price store에 추가 (종목 가격은 fetch_financials.py --price-store로 적재)"""
+    import yahoo_session
+
+    store = PriceStore(interval)
+    appended, errors = {}, {}
+    for etf in benchmark_tickers():
+        try:
+            history = yahoo_session.ticker(etf).history(period=period, interval=interval)
+            bars = [
+                {
+                    "date": idx.strftime("%Y-%m-%d"),
+                    "open": float(row["Open"]),
+                    "high": float(row["High"]),
+                    "low": float(row["Low"]),
+                    "close": float(row["Close"]),
+                    "volume": float(row["Volume"]),
+                }
+                for idx, row in history.iterrows()
+            ]
+            appended[etf] = store.append(etf, bars)["appended"]
+        except Exception as e:
+            errors[etf] = str(e)
+    return {"success": True, "appended": appended, "errors": errors}
+
+
+def backfill(universe: list, interval="1d", window=None) -> dict:
+    """가격 저장소에 window만큼의 봉이 없는 종목을 bulk_prices 다중 종목 요청으로 한 번에 백필"""
+    from bulk_prices import download
+
+    store = PriceStore(interval)
+    window = window or DEFAULT_WINDOW.get(interval, 252)
+    short = [u["ticker"] for u in universe if store.length(u["ticker"]) < window + 1]
+    if not short:
+        return {"success": True, "interval": interval, "short": 0, "appended": 0}
+
+    bars, failed = download(short, period=BACKFILL_PERIOD.get(interval, "5y"), interval=interval)
+    # 이미 최근 봉만 있는 종목은 앞쪽에 과거 봉을 끼워 넣어야 하므로 append 대신 merge
+    appended = sum(store.merge(ticker, series)["appended"] for ticker, series in bars.items())
+    return {
+        "success": True,
+        "interval": interval,
+        "short": len(short),
+        "appended": appended,
+        "missing": sorted(set(short) - set(bars)),
+        "failed_chunks": failed,
+    }
+
+
+def to_returns(closes: np.ndarray, previous: np.ndarray = None):
+    """단순 수익률 + 열별 마지막 유효 종가 (결측 종가는 직전 유효 종가 기준으로 다음 수익률 계산)"""
+    if previous is None:
+        previous = np.full(closes.shape[1], np.nan)
+    filled = np.vstack([previous, closes])
+    # forward-fill: 각 열의 마지막 유효 행 인덱스
+    idx = np.where(~np.isnan(filled), np.arange(len(filled))[:, None], 0)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    last_valid = np.take_along_axis(filled, idx, axis=0)
+    returns = closes / last_valid[:-1] - 1
+    return returns, last_valid[-1]
+
+
+def window_sums(rows: np.ndarray) -> dict:
+    """
+    쌍별 완전 관측(pairwise-complete) 합계 행렬 (M x M)
+      n[j,k] = 두 열 모두 유효한 행 수
+      s[j,k] = 그 행들에서 j의 합,  q[j,k] = j 제곱합,  p[j,k] = j*k 교차곱 합
+    """
+    valid = ~np.isnan(rows)
+    y = np.where(valid, rows, 0.0)
+    v = valid.astype("float64")
+    return {"n": v.T @ v, "s": y.T @ v, "q": (y * y).T @ v, "p": y.T @ y}
+
+
+def pair_stats(sums: dict, min_periods: int) -> dict:
+    """합계 행렬 → 공분산, 분산, 상관, 베타(beta[j,k] = j의 k에 대한 베타)"""
+    n, s, q, p = sums["n"], sums["s"], sums["q"], sums["p"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        enough = n >= min_periods
+        cov = np.where(enough, (p - s * s.T / n) / (n - 1), np.nan)
+        var = np.where(enough, (q - s * s / n) / (n - 1), np.nan)
+        corr = cov / np.sqrt(var * var.T)
+        beta = cov / var.T
+    return {"cov": cov, "var": var, "corr": corr, "beta": beta}
+
+
+def rolling_beta(y: np.ndarray, x: np.ndarray, window: int, min_periods: int) -> np.ndarray:
+    """열별 y[:, j]의 x[:, j]에 대한 rolling 베타 (누적합 차분, T x N)"""
+    valid = ~(np.isnan(y) | np.isnan(x))
+    y0, x0 = np.where(valid, y, 0.0), np.where(valid, x, 0.0)
+
+    def rolled(a):
+        c = np.vstack([np.zeros((1, a.shape[1])), np.cumsum(a, axis=0)])
+        out = np.full(a.shape, np.nan)
+        out[window - 1:] = c[window:] - c[:-window]
+        return out
+
+    n = rolled(valid.astype("float64"))
+    sx, sy, sxy, sxx = rolled(x0), rolled(y0), rolled(x0 * y0), rolled(x0 * x0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        beta = (sxy - sx * sy / n) / (sxx - sx * sx / n)
+    beta[~(n >= min_periods)] = np.nan
+    return beta
+
+
+class BetaEngine:
+    """정렬된 수익률 window + 합계 행렬 상태 (npz) 관리"""
+
+    def __init__(self, interval="1d", window=None):
+        self.interval = interval
+        self.window = window or DEFAULT_WINDOW.get(interval, 252)
+        self.store = PriceStore(interval)
+        self.state_path = os.path.join(engine_dir(interval), "state.npz")
+        self.results_path = os.path.join(engine_dir(interval), "results.json")
+
+    @property
+    def min_periods(self) -> int:
+        return max(self.window // 2, 10)
+
+    def columns(self, universe: list) -> list:
+        available = set(self.store.tickers())
+        stocks = [u["ticker"] for u in universe if u["ticker"] in available]
+        etfs = [t for t in benchmark_tickers() if t in available]
+        return stocks + etfs
+
+    def check_history(self, universe: list) -> list:
+        """
+        min_periods만큼의 봉이 없는 종목 목록, 대부분이 부족하면 null 베타를 쓰는 대신 오류
+        (일봉은 fetch_financials.py가 저장하지 않으므로 backfill 명령으로 먼저 채워야 함)
+        """
+        short = [u["ticker"] for u in universe if self.store.length(u["ticker"]) <= self.min_periods]
+        if universe and len(short) > len(universe) * MAX_SHORT_RATIO:
+            raise RuntimeError(
+                f"{len(short)} of {len(universe)} stocks have fewer than {self.min_periods + 1} {self.interval} bars "
+                f"in the price store; run 'beta_engine.py backfill --interval {self.interval}' first"
+            )
+        return short
+
+    def build(self, universe: list) -> dict:
+        """전체 재계산: price store → 수익률 행렬 → window 합계"""
+        self.check_history(universe)
+        columns = self.columns(universe)
+        if not columns:
+            raise RuntimeError(f"Price store ({self.interval}) is empty")
+
+        days, closes = self.store.panel(columns)
+        returns, last_close = to_returns(closes)
+        rows = returns[-self.window:]
+        beta_tickers, stock_idx, bench_idx = self._pairs(universe, columns)
+
+        beta_history = rolling_beta(returns[:, stock_idx], returns[:, bench_idx], self.window, self.min_periods)
+        state = {
+            "window": np.array(self.window),
+            "columns": np.array(columns),
+            "beta_tickers": np.array(beta_tickers),
+            "days": days,
+            "last_close": last_close,
+            "rows": rows,
+            "row_days": days[-len(rows):],
+            "beta_history": beta_history[-self.window:],
+            **window_sums(rows),
+        }
+        self._save(state)
+        return self._publish(universe, state, appended=len(days))
+
+    def update(self, universe: list) -> dict:
+        """증분 갱신: 마지막 날짜 이후 수익률만 추가하고 window에서 빠지는 행은 차감"""
+        state = self._load()
+        if state is None or list(state["columns"]) != self.columns(universe):
+            return self.build(universe)
+        self.check_history(universe)
+
+        columns = list(state["columns"])
+        last_day = int(state["days"][-1])
+        slices = self.store.read_many(columns, start=from_day(last_day + 1))
+        new_days = np.unique(np.concatenate([s["date"] for s in slices.values()]))
+        if len(new_days) == 0:
+            return self._publish(universe, state, appended=0)
+
+        closes = np.full((len(new_days), len(columns)), np.nan)
+        for j, ticker in enumerate(columns):
+            s = slices[ticker]
+            closes[np.searchsorted(new_days, s["date"]), j] = s["close"]
+        added, last_close = to_returns(closes, state["last_close"])
+
+        rows = np.vstack([state["rows"], added])
+        dropped = rows[:-self.window] if len(rows) > self.window else rows[:0]
+        rows = rows[-self.window:]
+
+        # rank-k 갱신: 추가 행 합계 - 제외 행 합계
+        plus, minus = window_sums(added), window_sums(dropped)
+        sums = {k: state[k] + plus[k] - minus[k] for k in ("n", "s", "q", "p")}
+
+        # 추가된 행의 rolling 베타: 이전 window + 추가 행에 대해서만 누적합 계산
+        beta_tickers, stock_idx, bench_idx = self._pairs(universe, columns)
+        span = np.vstack([state["rows"], added])
+        added_beta = rolling_beta(span[:, stock_idx], span[:, bench_idx], self.window, self.min_periods)[-len(added):]
+        if list(state["beta_tickers"]) == beta_tickers:
+            beta_history = np.vstack([state["beta_history"], added_beta])[-self.window:]
+        else:
+            beta_history = added_beta
+
+        state = {
+            "window": state["window"],
+            "columns": state["columns"],
+            "beta_tickers": np.array(beta_tickers),
+            "days": np.concatenate([state["days"], new_days]),
+            "last_close": last_close,
+            "rows": rows,
+            "row_days": np.concatenate([state["row_days"], new_days])[-len(rows):],
+            "beta_history": beta_history,
+            **sums,
+        }
+        self._save(state)
+        return self._publish(universe, state, appended=len(new_days))
+
+    def _pairs(self, universe: list, columns: list):
+        """(종목, 종목 열, 벤치마크 열) — 섹터 ETF가 없으면 시장 ETF, 둘 다 없으면 제외"""
+        position = {t: i for i, t in enumerate(columns)}
+        market = position.get(MARKET_ETF)
+        tickers, stock_idx, bench_idx = [], [], []
+        for u in universe:
+            bench = position.get(u.get("benchmark_etf"), market)
+            if u["ticker"] not in position or bench is None:
+                continue
+            tickers.append(u["ticker"])
+            stock_idx.append(position[u["ticker"]])
+            bench_idx.append(bench)
+        return tickers, np.array(stock_idx, dtype=int), np.array(bench_idx, dtype=int)
+
+    def _publish(self, universe: list, state: dict, appended: int) -> dict:
+        columns = list(state["columns"])
+        position = {t: i for i, t in enumerate(columns)}
+        stats = pair_stats({k: state[k] for k in ("n", "s", "q", "p")}, self.min_periods)
+        corr, beta, var = stats["corr"], stats["beta"], stats["var"]
+        annualize = np.sqrt(PERIODS_PER_YEAR.get(self.interval, 252))
+
+        stocks = [u for u in universe if u["ticker"] in position]
+        stock_idx = np.array([position[u["ticker"]] for u in stocks], dtype=int)
+        sectors = np.array([u.get("sector_code") or "" for u in stocks], dtype=object)
+        market = position.get(MARKET_ETF)
+
+        # 동종 종목 상관 (종목 x 종목 블록)
+        peer_corr = corr[np.ix_(stock_idx, stock_idx)].copy()
+        np.fill_diagonal(peer_corr, np.nan)
+        same_sector = (sectors[:, None] == sectors[None, :]) & (sectors[:, None] != "")
+        ranked = np.where(np.isnan(peer_corr), -np.inf, peer_corr)
+        top = np.argsort(-ranked, axis=1)[:, :TOP_PEERS]
+
+        def clean(value, digits=4):
+            return None if value is None or not np.isfinite(value) else round(float(value), digits)
+
+        results = []
+        for i, u in enumerate(stocks):
+            j = stock_idx[i]
+            b = position.get(u.get("benchmark_etf"), market)
+            idio = var[j, b] * (1 - corr[j, b] ** 2) if b is not None else np.nan
+            sector_peers = peer_corr[i][same_sector[i]]
+            results.append({
+                "ticker": u["ticker"],
+                "benchmark": columns[b] if b is not None else None,
+                "beta_sector": clean(beta[j, b]) if b is not None else None,
+                "corr_sector": clean(corr[j, b]) if b is not None else None,
+                "beta_market": clean(beta[j, market]) if market is not None else None,
+                "corr_market": clean(corr[j, market]) if market is not None else None,
+                "idio_vol": clean(np.sqrt(idio) * annualize) if b is not None else None,
+                "avg_sector_peer_corr": clean(np.nanmean(sector_peers)) if np.isfinite(sector_peers).any() else None,
+                "top_peers": [
+                    {"ticker": stocks[k]["ticker"], "corr": clean(peer_corr[i, k])}
+                    for k in top[i] if np.isfinite(peer_corr[i, k])
+                ],
+            })
+
+        output = {
+            "success": True,
+            "interval": self.interval,
+            "window": self.window,
+            "as_of": from_day(state["days"][-1]) if len(state["days"]) else None,
+            "generated_at": datetime.now().isoformat(),
+            "appended": appended,
+            "short_history": self.check_history(universe),
+            "stocks": results,
+        }
+        tmp = self.results_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(output, f, ensure_ascii=False)
+        os.replace(tmp, self.results_path)
+
+        return {k: output[k] for k in ("success", "interval", "window", "as_of", "appended")} | {
+            "stocks": len(results),
+            "short_history": len(output["short_history"]),
+        }
+
+    def _load(self):
+        if not os.path.exists(self.state_path):
+            return None
+        with np.load(self.state_path, allow_pickle=False) as data:
+            state = {k: data[k] for k in data.files}
+        return state if int(state["window"]) == self.window else None
+
+    def _save(self, state: dict) -> None:
+        tmp = self.state_path + ".tmp.npz"
+        np.savez(tmp, **state)
+        os.replace(tmp, self.state_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Universe beta / correlation engine")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    fetch_parser = sub.add_parser("fetch-benchmarks")
+    fetch_parser.add_argument("--interval", default="1d")
+    fetch_parser.add_argument("--period", default="5y")
+
+    backfill_parser = sub.add_parser("backfill")
+    backfill_parser.add_argument("--interval", default="1d")
+    backfill_parser.add_argument("--window", type=int, help="Bars each stock needs (default depends on interval)")
+
+    for name in ("build", "update"):
+        p = sub.add_parser(name)
+        p.add_argument("--interval", default="1d")
+        p.add_argument("--window", type=int, help="Rolling window in bars (default depends on interval)")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "fetch-benchmarks":
+            output = fetch_benchmarks(args.interval, args.period)
+        else:
+            database = db.connect()
+            try:
+                universe = load_universe(database)
+            finally:
+                database.close()
+            if args.command == "backfill":
+                output = backfill(universe, args.interval, args.window)
+            else:
+                engine = BetaEngine(args.interval, args.window)
+                output = engine.build(universe) if args.command == "build" else engine.update(universe)
+    except Exception as e:
+        output = {"success": False, "error": str(e)}
+
+    print(json.dumps(output, ensure_ascii=False))
+    sys.exit(0 if output["success"] else 1)
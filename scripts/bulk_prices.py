@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+전 종목 가격 일괄 수집 (yf.download 다중 종목 요청)
+종목당 ticker.history() / info 호출 대신 청크 단위 다중 종목 요청 몇 번으로 최근 OHLCV를 받아 종목별로 분리
+
+사용법:
+  python bulk_prices.py [--tickers AAPL,MSFT] [--period 5d] [--interval 1d] [--chunk-size 200] [--sink db] [--price-store]
+  --sink db      최신 종가로 최근 stock_fundamentals.current_price 갱신
+                 (interval이 fetch_financials.py 히스토리 주기와 같으면 stock_prices도 upsert)
+  --price-store  로컬 컬럼형 저장소(price_store.py)에 추가
+"""
+
+import sys
+import json
+import math
+import time
+import argparse
+from datetime import datetime
+
+import pandas as pd
+import yfinance as yf
+
+import db
+import yahoo_session
+from db_writer import price_rows
+from fetch_financials import HISTORY_INTERVAL, safe_value
+from metrics import Metrics
+
+CHUNK_SIZE = 200
+CHUNK_DELAY = 1.0
+
+METRICS = Metrics("bulk_prices")
+
+
+def active_tickers() -> list:
+    database = db.connect()
+    try:
+        rows = database.fetch_all("SELECT ticker FROM stocks WHERE is_active = 1 ORDER BY ticker")
+        return [r["ticker"] for r in rows]
+    finally:
+        database.close()
+
+
+def split_frame(frame: pd.DataFrame, tickers: list) -> dict:
+    """group_by='ticker' 다중 컬럼 프레임 → {ticker: [bar, ...]} (fetch_history와 같은 형식)"""
+    bars = {}
+    if frame is None or frame.empty:
+        return bars
+
+    for ticker in tickers:
+        if isinstance(frame.columns, pd.MultiIndex):
+            if ticker not in frame.columns.get_level_values(0):
+                continue
+            sub = frame[ticker]
+        else:
+            sub = frame
+        sub = sub.dropna(how="all")
+        if sub.empty:
+            continue
+
+        bars[ticker] = [
+            {
+                "date": idx.strftime("%Y-%m-%d"),
+                "open": safe_value(row.get("Open")),
+                "high": safe_value(row.get("High")),
+                "low": safe_value(row.get("Low")),
+                "close": safe_value(row.get("Close")),
+                "volume": safe_value(row.get("Volume")),
+            }
+            for idx, row in sub.iterrows()
+            if safe_value(row.get("Close")) is not None
+        ]
+    return bars
+
+
+def download(tickers: list, period="5d", interval="1d", chunk_size=CHUNK_SIZE, delay=CHUNK_DELAY):
+    """청크별 yf.download 1회 → 종목별 바 목록, 실패 청크"""
+    session = yahoo_session.get_session()
+    bars, failed = {}, {}
+
+    for start in range(0, len(tickers), chunk_size):
+        chunk = tickers[start:start + chunk_size]
+        try:
+            frame = METRICS.call(
+                "download", yf.download, chunk,
+                period=period, interval=interval, group_by="ticker",
+                threads=True, progress=False, session=session, multi_level_index=True,
+            )
+            bars.update(split_frame(frame, chunk))
+        except Exception as e:
+            failed[f"{chunk[0]}..{chunk[-1]}"] = str(e)
+
+        if delay and start + chunk_size < len(tickers):
+            time.sleep(delay)
+
+    return bars, failed
+
+
+def write_to_database(bars: dict, interval: str) -> dict:
+    """최신 종가 → 최근 펀더멘털 행의 current_price, 히스토리 주기가 같으면 stock_prices upsert"""
+    database = db.connect()
+    try:
+        ids = {r["ticker"]: r["id"] for r in database.fetch_all("SELECT id, ticker FROM stocks")}
+        # updated_at도 갱신해야 펀더멘털 스냅샷(fundamentals_snapshot.py)의 증분 빌드가 새 가격을 반영
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        latest = [
+            (series[-1]["close"], now, ids[ticker], ids[ticker])
+            for ticker, series in bars.items() if ticker in ids and series
+        ]
+        database.executemany(
+            "UPDATE stock_fundamentals SET current_price = ?, updated_at = ? WHERE stock_id = ? AND date = "
+            "(SELECT latest FROM (SELECT MAX(date) AS latest FROM stock_fundamentals WHERE stock_id = ?) t)",
+            latest,
+        )
+
+        prices = 0
+        if interval == HISTORY_INTERVAL:
+            rows = [row for ticker, series in bars.items() if ticker in ids for row in price_rows(ids[ticker], series)]
+            prices = database.upsert("stock_prices", rows, ["stock_id", "date"])
+
+        database.commit()
+        return {"current_price": len(latest), "stock_prices": prices}
+    except Exception:
+        database.rollback()
+        raise
+    finally:
+        database.close()
+
+
+def run(tickers=None, period="5d", interval="1d", chunk_size=CHUNK_SIZE, sink="stdout", price_store=False) -> dict:
+    tickers = tickers or active_tickers()
+    started = time.perf_counter()
+    bars, failed = download(tickers, period, interval, chunk_size)
+
+    output = {
+        "success": True,
+        "timestamp": datetime.now().isoformat(),
+        "requested": len(tickers),
+        "received": len(bars),
+        "missing": sorted(set(tickers) - set(bars)),
+        "failed_chunks": failed,
+        "requests": math.ceil(len(tickers) / chunk_size),
+        "elapsed": round(time.perf_counter() - started, 3),
+    }
+
+    if price_store:
+        from price_store import PriceStore
+        store = PriceStore(interval)
+        output["price_store"] = {"appended": sum(store.append(t, series)["appended"] for t, series in bars.items())}
+
+    if sink == "db":
+        output["sink"] = {"written": True, "rows": write_to_database(bars, interval)}
+    else:
+        output["prices"] = bars
+
+    return output
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk multi-symbol price download")
+    parser.add_argument("--tickers", help="Comma separated tickers (default: all active stocks)")
+    parser.add_argument("--period", default="5d", help="yfinance period (e.g. 5d, 1mo)")
+    parser.add_argument("--interval", default="1d", help="Bar interval (1d, 1wk, 1mo)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Symbols per request")
+    parser.add_argument("--sink", choices=["stdout", "db"], default="stdout", help="Write results straight into the database")
+    parser.add_argument("--price-store", action="store_true", help="Append bars to the local columnar price store")
+    args = parser.parse_args()
+
+    tickers = [t.strip().upper() for t in args.tickers.split(",") if t.strip()] if args.tickers else None
+
+    try:
+        output = run(tickers, args.period, args.interval, args.chunk_size, args.sink, args.price_store)
+    except Exception as e:
+        output = {"success": False, "error": str(e)}
+
+    print(json.dumps(output, ensure_ascii=False))
+
+    try:
+        METRICS.write()
+    except Exception:
+        pass
+
+    sys.exit(0 if output["success"] else 1)
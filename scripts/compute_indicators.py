@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+기술적 지표 사전 계산 스크립트
+일봉 가격 저장소(price_store.py, 1d)의 전체 종목을 한 번에 벡터 연산으로 처리하여 stock_indicators 테이블에 저장
+(stock_prices 테이블은 fetch_financials.py의 월봉이라 RSI(14)/SMA 200 등 일봉 기준 지표에 쓸 수 없음)
+
+사용법: python compute_indicators.py [--full] [--ticker AAPL]
+  --full    모든 종목 재계산 (기본: 새 가격 봉이 들어온 종목만)
+일봉이 없는 종목은 missing으로 보고 (bulk_prices.py --price-store 또는 beta_engine.py backfill로 채움)
+"""
+
+import sys
+import json
+import argparse
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# 모든 기간은 일봉 개수 기준
+INDICATOR_INTERVAL = "1d"
+SMA_WINDOWS = (5, 20, 50, 200)
+EMA_WINDOWS = (12, 26, 50)
+RSI_PERIOD = 14
+ATR_PERIOD = 14
+VOLATILITY_WINDOW = 20
+
+
+def safe_value(val):
+    """NaN, Inf 등을 None으로 변환"""
+    if val is None:
+        return None
+    try:
+        val = float(val)
+    except (TypeError, ValueError):
+        return None
+    if np.isnan(val) or np.isinf(val):
+        return None
+    return val
+
+
+def compute_indicator_frame(prices: pd.DataFrame) -> pd.DataFrame:
+    """
+    여러 종목의 가격 봉(stock_id, date, high, low, close)을 받아
+    종목별 지표 컬럼을 추가한 DataFrame 반환 (groupby 단위 벡터 연산)
+    """
+    df = prices.sort_values(["stock_id", "date"]).reset_index(drop=True)
+    df["date"] = pd.to_datetime(df["date"])
+    for col in ("open", "high", "low", "close", "volume"):
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    g = df.groupby("stock_id", sort=False)
+    close = df["close"]
+
+    def per_group(series: pd.Series) -> pd.Series:
+        return series.reset_index(level=0, drop=True)
+
+    # 이동평균 (SMA / EMA 사다리)
+    for n in SMA_WINDOWS:
+        df[f"sma_{n}"] = per_group(g["close"].rolling(n, min_periods=n).mean())
+    for n in EMA_WINDOWS:
+        df[f"ema_{n}"] = per_group(g["close"].ewm(span=n, adjust=False, min_periods=n).mean())
+
+    # RSI (Wilder smoothing)
+    delta = g["close"].diff()
+    df["_gain"] = delta.clip(lower=0)
+    df["_loss"] = -delta.clip(upper=0)
+    g = df.groupby("stock_id", sort=False)
+    avg_gain = per_group(g["_gain"].ewm(alpha=1 / RSI_PERIOD, adjust=False, min_periods=RSI_PERIOD).mean())
+    avg_loss = per_group(g["_loss"].ewm(alpha=1 / RSI_PERIOD, adjust=False, min_periods=RSI_PERIOD).mean())
+    rs = avg_gain / avg_loss.replace(0, np.nan)
+    df["rsi_14"] = np.where(avg_loss == 0, np.where(avg_gain > 0, 100.0, np.nan), 100 - 100 / (1 + rs))
+
+    # ATR (True Range의 Wilder 평균)
+    prev_close = g["close"].shift(1)
+    true_range = pd.concat([
+        df["high"] - df["low"],
+        (df["high"] - prev_close).abs(),
+        (df["low"] - prev_close).abs(),
+    ], axis=1).max(axis=1, skipna=True)
+    df["_tr"] = true_range.where(df["high"].notna() & df["low"].notna())
+    g = df.groupby("stock_id", sort=False)
+    df["atr_14"] = per_group(g["_tr"].ewm(alpha=1 / ATR_PERIOD, adjust=False, min_periods=ATR_PERIOD).mean())
+
+    # 변동성 (로그수익률 표준편차, 봉 간격으로 연율화)
+    df["_log_ret"] = np.log(close / g["close"].shift(1))
+    gap_days = g["date"].diff().dt.days
+    periods_per_year = 365.25 / gap_days.groupby(df["stock_id"]).transform("median")
+    g = df.groupby("stock_id", sort=False)
+    rolling_std = per_group(g["_log_ret"].rolling(VOLATILITY_WINDOW, min_periods=VOLATILITY_WINDOW).std())
+    df["volatility"] = rolling_std * np.sqrt(periods_per_year)
+
+    # 낙폭 (현재 / 전체 기간 최대)
+    running_peak = g["close"].cummax()
+    df["drawdown"] = close / running_peak - 1
+    df["max_drawdown"] = df.groupby("stock_id", sort=False)["drawdown"].cummin()
+
+    # 52주 고가/저가 및 현재 위치 (날짜 기반 윈도우)
+    high_src = df["high"].fillna(close)
+    low_src = df["low"].fillna(close)
+    df["_high_src"] = high_src
+    df["_low_src"] = low_src
+    rolled = df.groupby("stock_id", sort=False).rolling("365D", on="date")
+    df["week_52_high"] = rolled["_high_src"].max().reset_index(level=0, drop=True).values
+    df["week_52_low"] = rolled["_low_src"].min().reset_index(level=0, drop=True).values
+    span = df["week_52_high"] - df["week_52_low"]
+    df["week_52_percentile"] = ((close - df["week_52_low"]) / span.replace(0, np.nan)) * 100
+
+    return df.drop(columns=[c for c in df.columns if c.startswith("_")])
+
+
+def latest_snapshots(frame: pd.DataFrame) -> dict:
+    """종목별 마지막 봉의 지표를 stock_id → dict로 반환"""
+    last = frame.groupby("stock_id", sort=False).tail(1)
+    counts = frame.groupby("stock_id", sort=False).size()
+    snapshots = {}
+
+    for _, row in last.iterrows():
+        stock_id = row["stock_id"]
+        snapshots[stock_id] = {
+            "as_of_date": row["date"].strftime("%Y-%m-%d"),
+            "bar_count": int(counts[stock_id]),
+            "close": safe_value(row["close"]),
+            "sma": {str(n): safe_value(row[f"sma_{n}"]) for n in SMA_WINDOWS},
+            "ema": {str(n): safe_value(row[f"ema_{n}"]) for n in EMA_WINDOWS},
+            "rsi_14": safe_value(row["rsi_14"]),
+            "atr_14": safe_value(row["atr_14"]),
+            "volatility": safe_value(row["volatility"]),
+            "drawdown": safe_value(row["drawdown"]),
+            "max_drawdown": safe_value(row["max_drawdown"]),
+            "week_52_high": safe_value(row["week_52_high"]),
+            "week_52_low": safe_value(row["week_52_low"]),
+            "week_52_percentile": safe_value(row["week_52_percentile"]),
+        }
+
+    return snapshots
+
+
+def compute_from_history(history: list) -> dict:
+    """fetch_financials.py의 history 목록에서 단일 종목 지표 계산"""
+    rows = [h for h in history if h.get("date") and h.get("close") is not None]
+    if not rows:
+        return {}
+
+    prices = pd.DataFrame(rows)
+    prices["stock_id"] = 0
+    snapshots = latest_snapshots(compute_indicator_frame(prices))
+    return snapshots.get(0, {})
+
+
+def store_prices(store, tickers_by_id: dict) -> pd.DataFrame:
+    """가격 저장소의 종목별 봉 → compute_indicator_frame 입력 형식 (stock_id, date, OHLCV)"""
+    frames = []
+    for stock_id, ticker in tickers_by_id.items():
+        bars = store.read(ticker)
+        if not len(bars["date"]):
+            continue
+        frame = pd.DataFrame({column: np.asarray(values) for column, values in bars.items()})
+        frame["date"] = pd.to_datetime(frame["date"].astype("int64"), unit="D")
+        frame["stock_id"] = stock_id
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def compute_for_ticker(ticker: str) -> dict:
+    """단일 종목 일봉 지표 (fetch_financials.py 동기화 직후용), 일봉이 없으면 빈 dict"""
+    from price_store import PriceStore
+
+    prices = store_prices(PriceStore(INDICATOR_INTERVAL), {0: ticker.upper()})
+    if prices.empty:
+        return {}
+    return latest_snapshots(compute_indicator_frame(prices)).get(0, {})
+
+
+def stale_stocks(database, store, ticker=None, full=False):
+    """새 일봉이 들어온 (또는 지표가 없는) 종목 {stock_id: ticker}, 일봉이 없는 종목 목록"""
+    from price_store import from_day
+
+    sql = """
+        SELECT s.id AS stock_id, s.ticker, i.as_of_date
+        FROM stocks s
+        LEFT JOIN stock_indicators i ON i.stock_id = s.id
+        WHERE s.is_active = 1
+    """
+    params = []
+    if ticker:
+        sql += " AND s.ticker = ?"
+        params.append(ticker.upper())
+
+    stale, missing = {}, []
+    for r in database.fetch_all(sql, params):
+        dates = store.read(r["ticker"])["date"]
+        if not len(dates):
+            missing.append(r["ticker"])
+        elif full or r["as_of_date"] is None or from_day(dates[-1]) > str(r["as_of_date"])[:10]:
+            stale[r["stock_id"]] = r["ticker"]
+    return stale, missing
+
+
+def run(ticker=None, full=False) -> dict:
+    """일봉 저장소의 가격으로 지표를 일괄 계산하여 stock_indicators에 upsert"""
+    import db
+    from price_store import PriceStore
+
+    store = PriceStore(INDICATOR_INTERVAL)
+    database = db.connect()
+    try:
+        stale, missing = stale_stocks(database, store, ticker, full)
+        if not stale:
+            return {"success": True, "updated": 0, "skipped_up_to_date": True, "missing": missing}
+
+        prices = store_prices(store, stale)
+        if prices.empty:
+            return {"success": True, "updated": 0, "missing": missing}
+
+        snapshots = latest_snapshots(compute_indicator_frame(prices))
+
+        rows = []
+        for stock_id, snap in snapshots.items():
+            row = {"stock_id": int(stock_id)}
+            row.update(snap)
+            row["sma"] = json.dumps(snap["sma"])
+            row["ema"] = json.dumps(snap["ema"])
+            rows.append(row)
+
+        database.upsert("stock_indicators", rows, unique_by=["stock_id"])
+        database.commit()
+
+        return {"success": True, "updated": len(rows), "missing": missing, "timestamp": datetime.now().isoformat()}
+    except Exception as e:
+        database.rollback()
+        return {"success": False, "error": str(e), "timestamp": datetime.now().isoformat()}
+    finally:
+        database.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute technical indicators from the daily price store")
+    parser.add_argument("--full", action="store_true", help="Recompute every ticker")
+    parser.add_argument("--ticker", help="Only compute a single ticker")
+    args = parser.parse_args()
+
+    result = run(args.ticker, args.full)
+    print(json.dumps(result, ensure_ascii=False))
+    sys.exit(0 if result["success"] else 1)
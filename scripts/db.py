@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Laravel 데이터베이스 연결 헬퍼
+.env의 DB_* 설정을 읽어 SQLite / MySQL 연결을 생성
+"""
+
+import os
+import sqlite3
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def storage_path(*parts) -> str:
+    """Laravel storage_path()과 동일: storage/app/private 하위 경로 (디렉터리 자동 생성)"""
+    path = os.path.join(ROOT_DIR, "storage", "app", "private", *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def load_env() -> dict:
+    """.env 파일 + 프로세스 환경변수 (환경변수가 우선)"""
+    env = {}
+    env_path = os.path.join(ROOT_DIR, ".env")
+    if os.path.exists(env_path):
+        with open(env_path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#") or "=" not in line:
+                    continue
+                key, value = line.split("=", 1)
+                env[key.strip()] = value.strip().strip('"').strip("'")
+    env.update(os.environ)
+    return env
+
+
+class Database:
+    """sqlite3 / pymysql 연결을 감싸는 얇은 래퍼 (쿼리는 '?' 플레이스홀더로 작성)"""
+
+    def __init__(self, driver: str, conn):
+        self.driver = driver
+        self.conn = conn
+
+    def _sql(self, sql: str) -> str:
+        if self.driver == "mysql":
+            return sql.replace("?", "%s")
+        return sql
+
+    def quote(self, identifier: str) -> str:
+        """컬럼/테이블명 인용 (MySQL의 `change` 같은 예약어 대비)"""
+        return f"`{identifier}`" if self.driver == "mysql" else f'"{identifier}"'
+
+    def execute(self, sql: str, params=()):
+        cur = self.conn.cursor()
+        cur.execute(self._sql(sql), params)
+        return cur
+
+    def executemany(self, sql: str, rows):
+        cur = self.conn.cursor()
+        cur.executemany(self._sql(sql), rows)
+        return cur
+
+    def fetch_all(self, sql: str, params=()) -> list:
+        cur = self.execute(sql, params)
+        columns = [c[0] for c in cur.description]
+        return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+    def upsert(self, table: str, rows: list, unique_by: list, batch_size: int = 500) -> int:
+        """INSERT ... ON CONFLICT / ON DUPLICATE KEY UPDATE 배치 upsert"""
+        if not rows:
+            return 0
+
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        columns = list(rows[0].keys())
+        for col in ("created_at", "updated_at"):
+            if col not in columns:
+                columns.append(col)
+        update_cols = [c for c in columns if c not in unique_by and c != "created_at"]
+
+        q = self.quote
+        col_list = ", ".join(q(c) for c in columns)
+        values = ", ".join(["?"] * len(columns))
+        if self.driver == "mysql":
+            updates = ", ".join(f"{q(c)} = VALUES({q(c)})" for c in update_cols)
+            sql = f"INSERT INTO {q(table)} ({col_list}) VALUES ({values}) ON DUPLICATE KEY UPDATE {updates}"
+        else:
+            updates = ", ".join(f"{q(c)} = excluded.{q(c)}" for c in update_cols)
+            conflict = ", ".join(q(c) for c in unique_by)
+            sql = f"INSERT INTO {q(table)} ({col_list}) VALUES ({values}) ON CONFLICT ({conflict}) DO UPDATE SET {updates}"
+
+        params = [
+            tuple(row.get(c, now) if c in ("created_at", "updated_at") else row.get(c) for c in columns)
+            for row in rows
+        ]
+        for i in range(0, len(params), batch_size):
+            self.executemany(sql, params[i:i + batch_size])
+        return len(params)
+
+    def commit(self):
+        self.conn.commit()
+
+    def rollback(self):
+        self.conn.rollback()
+
+    def close(self):
+        self.conn.close()
+
+
+def connect() -> Database:
+    """DB_CONNECTION 설정에 따라 연결 생성"""
+    env = load_env()
+    driver = env.get("DB_CONNECTION", "sqlite")
+
+    if driver == "sqlite":
+        path = env.get("DB_DATABASE") or os.path.join(ROOT_DIR, "database", "database.sqlite")
+        if path != ":memory:" and not os.path.isabs(path):
+            path = os.path.join(ROOT_DIR, path)
+        conn = sqlite3.connect(path, timeout=60)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return Database("sqlite", conn)
+
+    if driver in ("mysql", "mariadb"):
+        try:
+            import pymysql
+        except ImportError:
+            raise RuntimeError("pymysql is required for MySQL connections (pip install pymysql)")
+
+        conn = pymysql.connect(
+            host=env.get("DB_HOST", "127.0.0.1"),
+            port=int(env.get("DB_PORT", "3306")),
+            user=env.get("DB_USERNAME", "root"),
+            password=env.get("DB_PASSWORD", ""),
+            database=env.get("DB_DATABASE", "laravel"),
+            charset=env.get("DB_CHARSET", "utf8mb4"),
+            autocommit=False,
+        )
+        return Database("mysql", conn)
+
+    raise RuntimeError(f"Unsupported DB_CONNECTION: {driver}")
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+fetch_financials.py 결과를 DB에 직접 저장하는 bulk writer
+YahooFinanceService의 save* 메서드와 동일한 매핑을 종목당 1개 트랜잭션 + 배치 upsert로 처리
+(sync_worker.py용 StockStory / 섹터 벤치마크 저장도 각 서비스/커맨드와 같은 매핑)
+"""
+
+import json
+from datetime import date, datetime
+
+
+def to_date(value):
+    return str(value)[:10] if value else None
+
+
+def to_datetime(value):
+    return str(value)[:19] if value else None
+
+
+def fundamentals_rows(stock_id, info):
+    if not info:
+        return []
+    row = {"stock_id": stock_id, "date": date.today().isoformat()}
+    for key in (
+        "current_price", "market_cap", "enterprise_value",
+        "pe_ratio", "forward_pe", "peg_ratio", "pb_ratio", "ps_ratio", "ev_ebitda", "ev_revenue",
+        "profit_margin", "operating_margin", "gross_margin", "roe", "roa",
+        "eps", "forward_eps", "book_value", "revenue_per_share",
+        "dividend_rate", "dividend_yield", "payout_ratio",
+        "earnings_growth", "revenue_growth",
+        "total_cash", "total_debt", "debt_to_equity", "current_ratio", "quick_ratio",
+        "operating_cashflow", "free_cashflow", "beta",
+    ):
+        row[key] = info.get(key)
+    row["week_52_high"] = info.get("52_week_high")
+    row["week_52_low"] = info.get("52_week_low")
+    return [row]
+
+
+STATEMENT_COLUMNS = {
+    "income": ("income_stmt", ["total_revenue", "gross_profit", "operating_income", "net_income", "ebitda", "basic_eps", "diluted_eps"]),
+    "balance": ("balance_sheet", ["total_assets", "total_liabilities", "stockholders_equity", "total_debt", "cash_and_equivalents", "current_assets", "current_liabilities"]),
+    "cashflow": ("cashflow", ["operating_cashflow", "investing_cashflow", "financing_cashflow", "free_cashflow", "capex"]),
+}
+
+
+def statement_rows(stock_id, data):
+    """statement_type별로 컬럼 구성이 달라 타입별 목록으로 반환"""
+    grouped = {}
+    for statement_type, (key, columns) in STATEMENT_COLUMNS.items():
+        statements = data.get(key) or {}
+        if "error" in statements:
+            continue
+        rows = []
+        for fiscal_date, values in statements.items():
+            if not isinstance(values, dict) or "error" in values:
+                continue
+            row = {"stock_id": stock_id, "fiscal_date": to_date(fiscal_date), "statement_type": statement_type}
+            row.update({c: values.get(c) for c in columns})
+            rows.append(row)
+        grouped[statement_type] = rows
+    return grouped
+
+
+def price_rows(stock_id, history):
+    return [
+        {
+            "stock_id": stock_id,
+            "date": to_date(bar["date"]),
+            "open": bar.get("open"),
+            "high": bar.get("high"),
+            "low": bar.get("low"),
+            "close": bar.get("close"),
+            "volume": int(bar["volume"]) if bar.get("volume") is not None else None,
+        }
+        for bar in history or [] if bar.get("date")
+    ]
+
+
+def option_rows(stock_id, options):
+    rows = []
+    for chain in (options or {}).get("chains", []):
+        expiration_date = chain.get("expiration_date")
+        if not expiration_date:
+            continue
+        for option_type, contracts in (("call", chain.get("calls", [])), ("put", chain.get("puts", []))):
+            for option in contracts:
+                if option.get("strike") is None:
+                    continue
+                rows.append({
+                    "stock_id": stock_id,
+                    "option_type": option_type,
+                    "expiration_date": to_date(expiration_date),
+                    "strike": option["strike"],
+                    "contract_symbol": option.get("contract_symbol"),
+                    "last_price": option.get("last_price"),
+                    "bid": option.get("bid"),
+                    "ask": option.get("ask"),
+                    "change": option.get("change"),
+                    "percent_change": option.get("percent_change"),
+                    "volume": option.get("volume"),
+                    "open_interest": option.get("open_interest"),
+                    "implied_volatility": option.get("implied_volatility"),
+                    "in_the_money": option.get("in_the_money"),
+                })
+    return rows
+
+
+def holder_rows(stock_id, holdings):
+    return [
+        {
+            "stock_id": stock_id,
+            "holder_name": holder["holder"],
+            "date_reported": to_date(holder.get("date_reported")),
+            "shares": holder.get("shares"),
+            "percent_out": holder.get("percent_out"),
+            "value": holder.get("value"),
+        }
+        for holder in (holdings or {}).get("institutional_holders", []) if holder.get("holder")
+    ]
+
+
+def insider_rows(stock_id, holdings):
+    return [
+        {
+            "stock_id": stock_id,
+            "insider_name": tx["insider"],
+            "transaction_date": to_date(tx.get("start_date")),
+            "shares": tx.get("shares"),
+            "position": tx.get("position"),
+            "transaction_type": tx.get("transaction_type"),
+            "value": tx.get("value"),
+            "url": tx.get("url"),
+        }
+        for tx in (holdings or {}).get("insider_transactions", []) if tx.get("insider")
+    ]
+
+
+def estimate_rows(stock_id, earnings):
+    rows = []
+    for estimate_type, key, year_ago_key in (
+        ("eps", "earnings_estimate", "year_ago_eps"),
+        ("revenue", "revenue_estimate", "year_ago_revenue"),
+    ):
+        for estimate in (earnings or {}).get(key, []):
+            if not estimate.get("period"):
+                continue
+            rows.append({
+                "stock_id": stock_id,
+                "estimate_type": estimate_type,
+                "period": estimate["period"],
+                "estimate_avg": estimate.get("avg"),
+                "estimate_low": estimate.get("low"),
+                "estimate_high": estimate.get("high"),
+                "year_ago_value": estimate.get(year_ago_key),
+                "number_of_analysts": estimate.get("number_of_analysts"),
+                "growth": estimate.get("growth"),
+            })
+    return rows
+
+
+def earnings_history_rows(stock_id, earnings):
+    return [
+        {
+            "stock_id": stock_id,
+            "earnings_date": to_datetime(h["earnings_date"]),
+            "eps_estimate": h.get("eps_estimate"),
+            "reported_eps": h.get("reported_eps"),
+            "surprise_percent": h.get("surprise_percent"),
+        }
+        for h in (earnings or {}).get("earnings_dates", []) if h.get("earnings_date")
+    ]
+
+
+def analyst_rating_rows(stock_id, earnings):
+    earnings = earnings or {}
+    calendar = earnings.get("calendar") or {}
+    targets = earnings.get("analyst_price_targets") or {}
+    recommendations = (earnings.get("recommendations") or [{}])[0]
+    if not (calendar or targets or recommendations):
+        return []
+    return [{
+        "stock_id": stock_id,
+        "target_high": targets.get("high"),
+        "target_low": targets.get("low"),
+        "target_mean": targets.get("mean"),
+        "target_median": targets.get("median"),
+        "strong_buy": recommendations.get("strong_buy", 0),
+        "buy": recommendations.get("buy", 0),
+        "hold": recommendations.get("hold", 0),
+        "sell": recommendations.get("sell", 0),
+        "strong_sell": recommendations.get("strong_sell", 0),
+        "next_earnings_date": to_date(calendar.get("earnings_date")),
+        "next_eps_estimate": calendar.get("earnings_avg"),
+    }]
+
+
+def indicator_rows(stock_id, indicators):
+    if not indicators or not indicators.get("as_of_date") or "error" in indicators:
+        return []
+    row = {"stock_id": stock_id}
+    row.update(indicators)
+    row["sma"] = json.dumps(indicators.get("sma"))
+    row["ema"] = json.dumps(indicators.get("ema"))
+    return [row]
+
+
+def merge_by_key(database, table: str, stock_id, rows, keys: tuple) -> int:
+    """
+    unique 인덱스가 없거나 키에 NULL이 올 수 있는 테이블은 upsert가 중복 행을 만들므로
+    기존 키를 한 번에 읽어 UPDATE / INSERT 배치로 분리 (PHP updateOrCreate처럼 NULL끼리 같은 키로 취급)
+    """
+    if not rows:
+        return 0
+
+    def normalize(column, value):
+        return to_date(value) if "date" in column else value
+
+    q = database.quote
+    existing = {
+        tuple(normalize(c, r[c]) for c in keys): r["id"]
+        for r in database.fetch_all(
+            f"SELECT id, {', '.join(q(c) for c in keys)} FROM {q(table)} WHERE stock_id = ?", (stock_id,),
+        )
+    }
+
+    columns = [c for c in rows[0] if c != "stock_id" and c not in keys]
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    updates, inserts = [], []
+    for row in rows:
+        key = tuple(row[c] for c in keys)
+        values = tuple(row[c] for c in columns)
+        if key in existing:
+            if existing[key] is not None:
+                updates.append(values + (now, existing[key]))
+        else:
+            existing[key] = None
+            inserts.append((stock_id,) + key + values + (now, now))
+
+    if updates:
+        assignments = ", ".join(f"{q(c)} = ?" for c in columns + ["updated_at"])
+        database.executemany(f"UPDATE {q(table)} SET {assignments} WHERE id = ?", updates)
+    if inserts:
+        names = ["stock_id", *keys, *columns, "created_at", "updated_at"]
+        database.executemany(
+            f"INSERT INTO {q(table)} ({', '.join(q(c) for c in names)}) VALUES ({', '.join('?' * len(names))})",
+            inserts,
+        )
+    return len(updates) + len(inserts)
+
+
+def write_stock_result(database, stock_id: int, data: dict) -> dict:
+    """한 종목의 수집 결과를 단일 트랜잭션으로 저장, 테이블별 저장 행 수 반환"""
+    counts = {}
+    try:
+        counts["stock_fundamentals"] = database.upsert(
+            "stock_fundamentals", fundamentals_rows(stock_id, data.get("info")), ["stock_id", "date"])
+
+        statements = 0
+        for rows in statement_rows(stock_id, data).values():
+            statements += database.upsert("financial_statements", rows, ["stock_id", "fiscal_date", "statement_type"])
+        counts["financial_statements"] = statements
+
+        counts["stock_prices"] = database.upsert(
+            "stock_prices", price_rows(stock_id, data.get("history")), ["stock_id", "date"])
+        counts["stock_indicators"] = database.upsert(
+            "stock_indicators", indicator_rows(stock_id, data.get("indicators")), ["stock_id"])
+        counts["stock_options"] = database.upsert(
+            "stock_options", option_rows(stock_id, data.get("options")),
+            ["stock_id", "option_type", "expiration_date", "strike"])
+        # date_reported가 NULL인 보유자는 unique 인덱스로 충돌하지 않으므로 키 비교로 병합
+        counts["institutional_holders"] = merge_by_key(
+            database, "institutional_holders", stock_id, holder_rows(stock_id, data.get("holdings")),
+            ("holder_name", "date_reported"))
+        counts["insider_transactions"] = merge_by_key(
+            database, "insider_transactions", stock_id, insider_rows(stock_id, data.get("holdings")),
+            ("insider_name", "transaction_date", "shares"))
+        counts["earnings_estimates"] = database.upsert(
+            "earnings_estimates", estimate_rows(stock_id, data.get("earnings")),
+            ["stock_id", "estimate_type", "period"])
+        counts["earnings_histories"] = database.upsert(
+            "earnings_histories", earnings_history_rows(stock_id, data.get("earnings")),
+            ["stock_id", "earnings_date"])
+        counts["analyst_ratings"] = database.upsert(
+            "analyst_ratings", analyst_rating_rows(stock_id, data.get("earnings")), ["stock_id"])
+
+        database.commit()
+    except Exception:
+        database.rollback()
+        raise
+
+    return counts
+
+
+STOCKSTORY_FIELDS = (
+    "investment_rating", "analysis_summary", "latest_quarter_label",
+    "quarterly_revenue", "quarterly_eps", "quarterly_gross_margin", "quarterly_operating_margin",
+    "revenue_beat_percent", "eps_beat_percent",
+    "guidance_revenue", "guidance_eps", "guidance_revenue_vs_estimate", "guidance_eps_vs_estimate",
+    "revenue_cagr_5y", "revenue_cagr_2y", "eps_cagr_5y",
+    "wall_street_revenue_estimate", "wall_street_eps_estimate",
+    "gross_margin", "operating_margin", "gross_margin_trend", "operating_margin_trend", "roic",
+    "cash", "debt", "net_debt_to_ebitda", "quality_score", "value_score",
+    "key_highlights", "chart_urls",
+)
+
+
+def stockstory_rows(stock_id, data, partial=False):
+    """StockStoryService::saveAnalysis와 동일 (partial이면 찾은 필드만 덮어씀)"""
+    if not data:
+        return []
+    row = {"stock_id": stock_id}
+    for key in STOCKSTORY_FIELDS:
+        value = data.get(key)
+        if partial and value in (None, [], {}):
+            continue
+        row[key] = json.dumps(value) if key in ("key_highlights", "chart_urls") and value is not None else value
+    return [row]
+
+
+def benchmark_rows(benchmarks):
+    """SyncSectorBenchmarksCommand와 동일 (오류 항목 제외)"""
+    return [
+        {key: benchmark.get(key) for key in (
+            "etf_ticker", "sector_name", "sector_name_kr", "trailing_pe", "forward_pe",
+            "pb_ratio", "dividend_yield", "market_cap",
+        )}
+        for benchmark in benchmarks or [] if "error" not in benchmark
+    ]
+
+
+def write_rows(database, table: str, rows: list, unique_by: list) -> int:
+    try:
+        count = database.upsert(table, rows, unique_by)
+        database.commit()
+    except Exception:
+        database.rollback()
+        raise
+    return count
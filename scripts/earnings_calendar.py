@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+실적발표 캘린더 기반 갱신 대상 선정 스크립트
+전 종목의 다음/직전 실적발표일을 가벼운 호출(ticker.calendar, 필요 시 발표 이력)로 수집해 로컬 인덱스에 저장하고,
+방금 실적을 발표한 종목부터 우선 갱신 목록을 생성
+
+사용법:
+  python earnings_calendar.py scan [--tickers AAPL,MSFT] [--force] [--deadline 900]
+  python earnings_calendar.py plan [--reported-days 3] [--upcoming-days 2]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime, date, timedelta
+
+import db
+import yahoo_session
+from fetch_financials import load_state, modify_state
+from metrics import Metrics
+
+# 다음 실적발표가 먼 종목은 재스캔 주기를 늘림
+RESCAN_NEAR = timedelta(hours=20)
+RESCAN_FAR = timedelta(days=7)
+NEAR_WINDOW_DAYS = 14
+# 직전 발표일 조회 시 받을 발표 이력 수 (예정 발표 포함)
+EARNINGS_HISTORY_LIMIT = 8
+
+METRICS = Metrics("earnings_calendar")
+
+
+def index_path() -> str:
+    return os.path.join(db.storage_path(), "earnings_calendar.json")
+
+
+def load_index() -> dict:
+    try:
+        with open(index_path(), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_index(index: dict) -> None:
+    tmp = index_path() + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, sort_keys=True)
+    os.replace(tmp, index_path())
+
+
+def to_date(value):
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def active_tickers() -> list:
+    database = db.connect()
+    try:
+        rows = database.fetch_all("SELECT ticker FROM stocks WHERE is_active = 1 ORDER BY ticker")
+        return [r["ticker"] for r in rows]
+    finally:
+        database.close()
+
+
+def needs_scan(entry: dict, today: date, now: datetime) -> bool:
+    scanned_at = entry.get("scanned_at")
+    if not scanned_at:
+        return True
+
+    next_date = to_date(entry.get("next_earnings_date"))
+    near = next_date is None or (next_date - today).days <= NEAR_WINDOW_DAYS
+    return now - datetime.fromisoformat(scanned_at) >= (RESCAN_NEAR if near else RESCAN_FAR)
+
+
+def fetch_earnings_dates(ticker_symbol: str, today: date, with_history: bool = False):
+    """
+    ticker.calendar 1회 호출로 다음 실적발표일 조회
+    with_history면 ticker.get_earnings_dates()로 직전 발표일도 조회 (첫 스캔 / 기록된 발표일이 지난 경우)
+    반환: (다음 발표일, 직전 발표일)
+    """
+    ticker = METRICS.instrument(yahoo_session.ticker(ticker_symbol))
+    cal = ticker.calendar
+    dates = (cal or {}).get("Earnings Date") or []
+    next_date = to_date(dates[0]) if dates else None
+
+    last_reported = None
+    if with_history:
+        try:
+            history = ticker.get_earnings_dates(limit=EARNINGS_HISTORY_LIMIT)
+        except Exception:
+            history = None  # 이력 조회 실패는 캘린더 결과만으로 진행
+        if history is not None and not history.empty:
+            past = [d for d in (to_date(idx) for idx in history.index) if d and d <= today]
+            last_reported = max(past) if past else None
+    return next_date, last_reported
+
+
+def apply_entry(state: dict, entry: dict) -> dict:
+    if entry.get("next_earnings_date"):
+        state["earnings_date"] = entry["next_earnings_date"]
+    if entry.get("last_reported_date"):
+        state["last_reported_date"] = max(entry["last_reported_date"], state.get("last_reported_date") or "")
+    return state
+
+
+def scan(tickers=None, force=False, delay=0.5, deadline=None) -> dict:
+    """
+    인덱스 갱신: 이전에 기록된 다음 발표일이 지났다면 '직전 발표일'로 옮기고
+    fetch_financials.py의 주기 상태(fetch_state)에도 반영하여 --due 정책이 재무제표를 갱신하도록 함
+    deadline(초)이 지나면 그때까지의 결과만 저장하고 중단 (남은 종목은 재스캔 주기가 지난 상태라 다음 실행에서 이어서 스캔)
+    """
+    index = load_index()
+    started = time.monotonic()
+    now = datetime.now()
+    today = now.date()
+    tickers = tickers or active_tickers()
+    scanned, errors, remaining = 0, {}, 0
+
+    for ticker_symbol in tickers:
+        entry = index.get(ticker_symbol, {})
+        if not force and not needs_scan(entry, today, now):
+            continue
+        if deadline is not None and time.monotonic() - started >= deadline:
+            remaining += 1
+            continue
+
+        # 첫 스캔이거나 기록해둔 발표일이 지났으면 발표 이력으로 직전 발표일 확인
+        previous_next = to_date(entry.get("next_earnings_date"))
+        with_history = not entry.get("last_reported_date") or bool(previous_next and previous_next <= today)
+
+        try:
+            next_date, last_reported = fetch_earnings_dates(ticker_symbol, today, with_history)
+        except Exception as e:
+            errors[ticker_symbol] = str(e)
+            continue
+
+        # 캘린더가 아직 방금 지난 발표일을 보여주거나, 기록해둔 발표일이 지나간 경우
+        candidates = [d for d in (last_reported, to_date(entry.get("last_reported_date"))) if d]
+        if next_date and next_date <= today:
+            candidates.append(next_date)
+        elif previous_next and previous_next <= today and previous_next != next_date:
+            candidates.append(previous_next)
+        if candidates:
+            entry["last_reported_date"] = max(candidates).isoformat()
+
+        entry["next_earnings_date"] = next_date.isoformat() if next_date else None
+        entry["scanned_at"] = now.isoformat(timespec="seconds")
+        index[ticker_symbol] = entry
+        scanned += 1
+
+        modify_state(ticker_symbol, lambda state, entry=entry: apply_entry(state, entry))
+
+        if delay:
+            time.sleep(delay)
+
+    save_index(index)
+    return {"success": True, "scanned": scanned, "remaining": remaining, "indexed": len(index), "errors": errors}
+
+
+def plan(reported_days=3, upcoming_days=2, tickers=None) -> dict:
+    """
+    우선순위 갱신 목록
+      priority 1: 최근 reported_days일 내 실적발표 → statements/earnings + StockStory 즉시 갱신
+      priority 2: upcoming_days일 내 실적발표 예정 → earnings(추정치) 갱신
+      나머지: 느린 주기(--due)에 맡김
+    """
+    index = load_index()
+    today = datetime.now().date()
+    allowed = set(tickers) if tickers else None
+    targets = []
+
+    for ticker_symbol, entry in index.items():
+        if allowed is not None and ticker_symbol not in allowed:
+            continue
+
+        last_reported = to_date(entry.get("last_reported_date"))
+        next_date = to_date(entry.get("next_earnings_date"))
+        state = load_state(ticker_symbol)
+        statements_fetched = to_date(state.get("fetched_at", {}).get("statements"))
+
+        if last_reported and 0 <= (today - last_reported).days <= reported_days \
+                and (statements_fetched is None or statements_fetched < last_reported):
+            targets.append({
+                "ticker": ticker_symbol,
+                "priority": 1,
+                "reason": f"reported {last_reported.isoformat()}",
+                "sections": ["info", "statements", "earnings"],
+                "stockstory": True,
+            })
+        elif next_date and 0 <= (next_date - today).days <= upcoming_days:
+            targets.append({
+                "ticker": ticker_symbol,
+                "priority": 2,
+                "reason": f"reports {next_date.isoformat()}",
+                "sections": ["earnings"],
+                "stockstory": False,
+            })
+
+    targets.sort(key=lambda t: (t["priority"], t["ticker"]))
+    return {
+        "success": True,
+        "targets": targets,
+        "slow_cadence": max(len(index) - len(targets), 0),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Earnings-calendar-driven refresh targeting")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    scan_parser = sub.add_parser("scan")
+    scan_parser.add_argument("--tickers", help="Comma separated tickers (default: all active stocks)")
+    scan_parser.add_argument("--force", action="store_true", help="Ignore rescan intervals")
+    scan_parser.add_argument("--delay", type=float, default=0.5, help="Seconds between tickers")
+    scan_parser.add_argument("--deadline", type=float, help="Stop after this many seconds; the rest is scanned on the next run")
+
+    plan_parser = sub.add_parser("plan")
+    plan_parser.add_argument("--tickers", help="Comma separated tickers")
+    plan_parser.add_argument("--reported-days", type=int, default=3)
+    plan_parser.add_argument("--upcoming-days", type=int, default=2)
+
+    args = parser.parse_args()
+    tickers = [t.strip().upper() for t in args.tickers.split(",") if t.strip()] if args.tickers else None
+
+    try:
+        if args.command == "scan":
+            output = scan(tickers, args.force, args.delay, args.deadline)
+        else:
+            output = plan(args.reported_days, args.upcoming_days, tickers)
+    except Exception as e:
+        output = {"success": False, "error": str(e)}
+
+    print(json.dumps(output, ensure_ascii=False))
+
+    if args.command == "scan":
+        try:
+            METRICS.write()
+        except Exception:
+            pass
+
+    sys.exit(0 if output["success"] else 1)
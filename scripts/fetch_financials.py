@@ -2,12 +2,62 @@
 """
 Yahoo Finance 재무제표 데이터 수집 스크립트
 Laravel에서 호출하여 JSON 형태로 데이터 반환
+
+사용법: python fetch_financials.py <ticker> [--sections info,history] [--due] [--sink db] [--price-store] [--options-store] [--holdings-index] [--revision-engine]
+  --sections     수집할 섹션 (info, statements, history, options, holdings, earnings)
+  --due          섹션별 수집 주기 정책에 따라 만료된 섹션만 수집
+  --sink db      결과를 DB에 직접 배치 저장하고 요약만 출력
+  --price-store  가격 히스토리를 로컬 컬럼형 저장소(price_store.py)에도 추가
+  --options-store 옵션 체인을 일별 델타 스냅샷 저장소(options_store.py)에도 기록
+  --holdings-index 수급현황을 보유자 역색인(holdings_index.py)에 증분 반영
+  --revision-engine 실적 추정치를 리비전 모멘텀 엔진(revision_momentum.py)에 반영하고 순위 재계산
+  --metrics-file 실행 메트릭(OpenMetrics) 파일 경로 (기본 storage/app/private/metrics/fetch_financials.prom)
+  --deadline N   전체 제한시간(초). 섹션별 예산을 넘긴 섹션은 중단하고 수집된 부분 결과만 반환
 """
 
+import os
 import sys
 import json
-import yfinance as yf
-from datetime import datetime
+import time
+import argparse
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from compute_indicators import compute_for_ticker
+from db import storage_path
+from metrics import Metrics
+import yahoo_session
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+SECTIONS = ("info", "statements", "history", "options", "holdings", "earnings")
+HISTORY_INTERVAL = "1mo"
+
+# --deadline 지정 시 섹션별 최대 소요시간(초) — 남은 시간이 더 짧으면 남은 시간까지
+SECTION_BUDGETS = {
+    "info": 20,
+    "statements": 30,
+    "history": 20,
+    "options": 45,
+    "holdings": 25,
+    "earnings": 30,
+}
+
+# 엔드포인트(yf.Ticker 속성명)별 호출 수/지연시간
+METRICS = Metrics("fetch_financials")
+
+# 섹션별 기본 수집 주기
+CADENCE = {
+    "info": timedelta(hours=20),
+    "history": timedelta(hours=20),
+    "holdings": timedelta(days=7),
+    "earnings": timedelta(days=7),
+    "statements": timedelta(days=90),
+}
 
 
 def safe_value(val):
@@ -30,6 +80,7 @@ def fetch_earnings_data(ticker) -> dict:
         "earnings_estimate": [],
         "revenue_estimate": [],
         "eps_trend": [],
+        "eps_revisions": [],
         "calendar": {},
         "analyst_price_targets": {},
         "recommendations": []
@@ -101,6 +152,21 @@ def fetch_earnings_data(ticker) -> dict:
         except Exception:
             pass
 
+        # EPS 추정치 상향/하향 애널리스트 수
+        try:
+            er = ticker.eps_revisions
+            if er is not None and not er.empty:
+                for idx, row in er.iterrows():
+                    earnings_result["eps_revisions"].append({
+                        "period": str(idx),
+                        "up_7d": safe_value(row.get("upLast7days")),
+                        "up_30d": safe_value(row.get("upLast30days")),
+                        "down_7d": safe_value(row.get("downLast7Days", row.get("downLast7days"))),
+                        "down_30d": safe_value(row.get("downLast30days")),
+                    })
+        except Exception:
+            pass
+
         # 다음 실적발표 일정
         try:
             cal = ticker.calendar
@@ -331,155 +397,421 @@ def fetch_options_data(ticker) -> dict:
     return options_result
 
 
-def fetch_stock_data(ticker_symbol: str) -> dict:
-    """주식 데이터 전체 수집"""
+def fetch_info(ticker) -> dict:
+    """기본 정보 / 밸류에이션 지표 수집"""
+    info = ticker.info
+    return {
+        "name": info.get("longName") or info.get("shortName"),
+        "sector": info.get("sector"),
+        "industry": info.get("industry"),
+        "exchange": info.get("exchange"),
+        "currency": info.get("currency"),
+        "current_price": safe_value(info.get("currentPrice") or info.get("regularMarketPrice")),
+        "market_cap": safe_value(info.get("marketCap")),
+        "enterprise_value": safe_value(info.get("enterpriseValue")),
+        # 밸류에이션
+        "pe_ratio": safe_value(info.get("trailingPE")),
+        "forward_pe": safe_value(info.get("forwardPE")),
+        "peg_ratio": safe_value(info.get("pegRatio")),
+        "pb_ratio": safe_value(info.get("priceToBook")),
+        "ps_ratio": safe_value(info.get("priceToSalesTrailing12Months")),
+        "ev_ebitda": safe_value(info.get("enterpriseToEbitda")),
+        "ev_revenue": safe_value(info.get("enterpriseToRevenue")),
+        # 수익성
+        "profit_margin": safe_value(info.get("profitMargins")),
+        "operating_margin": safe_value(info.get("operatingMargins")),
+        "gross_margin": safe_value(info.get("grossMargins")),
+        "roe": safe_value(info.get("returnOnEquity")),
+        "roa": safe_value(info.get("returnOnAssets")),
+        # 주당 지표
+        "eps": safe_value(info.get("trailingEps")),
+        "forward_eps": safe_value(info.get("forwardEps")),
+        "book_value": safe_value(info.get("bookValue")),
+        "revenue_per_share": safe_value(info.get("revenuePerShare")),
+        # 배당
+        "dividend_rate": safe_value(info.get("dividendRate")),
+        "dividend_yield": safe_value(info.get("dividendYield")),
+        "payout_ratio": safe_value(info.get("payoutRatio")),
+        # 성장률
+        "earnings_growth": safe_value(info.get("earningsGrowth")),
+        "revenue_growth": safe_value(info.get("revenueGrowth")),
+        # 재무 건전성
+        "total_cash": safe_value(info.get("totalCash")),
+        "total_debt": safe_value(info.get("totalDebt")),
+        "debt_to_equity": safe_value(info.get("debtToEquity")),
+        "current_ratio": safe_value(info.get("currentRatio")),
+        "quick_ratio": safe_value(info.get("quickRatio")),
+        # 현금흐름
+        "operating_cashflow": safe_value(info.get("operatingCashflow")),
+        "free_cashflow": safe_value(info.get("freeCashflow")),
+        # 주식 정보
+        "shares_outstanding": safe_value(info.get("sharesOutstanding")),
+        "float_shares": safe_value(info.get("floatShares")),
+        "beta": safe_value(info.get("beta")),
+        "52_week_high": safe_value(info.get("fiftyTwoWeekHigh")),
+        "52_week_low": safe_value(info.get("fiftyTwoWeekLow")),
+        "50_day_avg": safe_value(info.get("fiftyDayAverage")),
+        "200_day_avg": safe_value(info.get("twoHundredDayAverage")),
+    }
+
+
+def fetch_statements(ticker) -> dict:
+    """재무제표 수집 (손익계산서, 재무상태표, 현금흐름표)"""
+    result = {
+        "income_stmt": {},
+        "balance_sheet": {},
+        "cashflow": {}
+    }
+
+    # 손익계산서 (연간)
+    try:
+        income_stmt = ticker.income_stmt
+        if income_stmt is not None and not income_stmt.empty:
+            for col in income_stmt.columns:
+                date_str = col.strftime("%Y-%m-%d") if hasattr(col, 'strftime') else str(col)
+                result["income_stmt"][date_str] = {
+                    "total_revenue": safe_value(income_stmt.loc["Total Revenue", col] if "Total Revenue" in income_stmt.index else None),
+                    "gross_profit": safe_value(income_stmt.loc["Gross Profit", col] if "Gross Profit" in income_stmt.index else None),
+                    "operating_income": safe_value(income_stmt.loc["Operating Income", col] if "Operating Income" in income_stmt.index else None),
+                    "net_income": safe_value(income_stmt.loc["Net Income", col] if "Net Income" in income_stmt.index else None),
+                    "ebitda": safe_value(income_stmt.loc["EBITDA", col] if "EBITDA" in income_stmt.index else None),
+                    "basic_eps": safe_value(income_stmt.loc["Basic EPS", col] if "Basic EPS" in income_stmt.index else None),
+                    "diluted_eps": safe_value(income_stmt.loc["Diluted EPS", col] if "Diluted EPS" in income_stmt.index else None),
+                }
+    except Exception as e:
+        result["income_stmt"] = {"error": str(e)}
+
+    # 재무상태표 (연간)
+    try:
+        balance = ticker.balance_sheet
+        if balance is not None and not balance.empty:
+            for col in balance.columns:
+                date_str = col.strftime("%Y-%m-%d") if hasattr(col, 'strftime') else str(col)
+                result["balance_sheet"][date_str] = {
+                    "total_assets": safe_value(balance.loc["Total Assets", col] if "Total Assets" in balance.index else None),
+                    "total_liabilities": safe_value(balance.loc["Total Liabilities Net Minority Interest", col] if "Total Liabilities Net Minority Interest" in balance.index else None),
+                    "stockholders_equity": safe_value(balance.loc["Stockholders Equity", col] if "Stockholders Equity" in balance.index else None),
+                    "total_debt": safe_value(balance.loc["Total Debt", col] if "Total Debt" in balance.index else None),
+                    "cash_and_equivalents": safe_value(balance.loc["Cash And Cash Equivalents", col] if "Cash And Cash Equivalents" in balance.index else None),
+                    "current_assets": safe_value(balance.loc["Current Assets", col] if "Current Assets" in balance.index else None),
+                    "current_liabilities": safe_value(balance.loc["Current Liabilities", col] if "Current Liabilities" in balance.index else None),
+                }
+    except Exception as e:
+        result["balance_sheet"] = {"error": str(e)}
+
+    # 현금흐름표 (연간)
+    try:
+        cashflow = ticker.cashflow
+        if cashflow is not None and not cashflow.empty:
+            for col in cashflow.columns:
+                date_str = col.strftime("%Y-%m-%d") if hasattr(col, 'strftime') else str(col)
+                result["cashflow"][date_str] = {
+                    "operating_cashflow": safe_value(cashflow.loc["Operating Cash Flow", col] if "Operating Cash Flow" in cashflow.index else None),
+                    "investing_cashflow": safe_value(cashflow.loc["Investing Cash Flow", col] if "Investing Cash Flow" in cashflow.index else None),
+                    "financing_cashflow": safe_value(cashflow.loc["Financing Cash Flow", col] if "Financing Cash Flow" in cashflow.index else None),
+                    "free_cashflow": safe_value(cashflow.loc["Free Cash Flow", col] if "Free Cash Flow" in cashflow.index else None),
+                    "capex": safe_value(cashflow.loc["Capital Expenditure", col] if "Capital Expenditure" in cashflow.index else None),
+                }
+    except Exception as e:
+        result["cashflow"] = {"error": str(e)}
+
+    return result
+
+
+def fetch_history(ticker) -> list:
+    """가격 히스토리 수집 (최근 5년, 월봉)"""
+    bars = []
+
+    try:
+        history = ticker.history(period="5y", interval=HISTORY_INTERVAL)
+        if history is not None and not history.empty:
+            for idx, row in history.iterrows():
+                date_str = idx.strftime("%Y-%m-%d") if hasattr(idx, 'strftime') else str(idx)
+                bars.append({
+                    "date": date_str,
+                    "open": safe_value(row.get("Open")),
+                    "high": safe_value(row.get("High")),
+                    "low": safe_value(row.get("Low")),
+                    "close": safe_value(row.get("Close")),
+                    "volume": safe_value(row.get("Volume")),
+                })
+    except Exception:
+        return []
+
+    return bars
+
+
+def state_path(ticker_symbol: str) -> str:
+    return os.path.join(storage_path("fetch_state"), f"{ticker_symbol}.json")
+
+
+def load_state(ticker_symbol: str) -> dict:
+    """섹션별 마지막 수집 시각 및 실적발표일"""
+    try:
+        with open(state_path(ticker_symbol), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(ticker_symbol: str, state: dict) -> None:
+    tmp = state_path(ticker_symbol) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, state_path(ticker_symbol))
+
+
+@contextmanager
+def state_lock(ticker_symbol: str):
+    with open(state_path(ticker_symbol) + ".lock", "w") as handle:
+        if fcntl:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def modify_state(ticker_symbol: str, apply) -> dict:
+    """
+    잠금을 잡고 최신 상태를 다시 읽어 apply(state) 결과를 저장
+    수집 중(수 분) 다른 프로세스(earnings_calendar.py scan 등)가 기록한 값을 덮어쓰지 않도록 저장 직전에 다시 읽음
+    """
+    with state_lock(ticker_symbol):
+        state = apply(load_state(ticker_symbol))
+        save_state(ticker_symbol, state)
+    return state
+
+
+def parse_datetime(value):
+    if not value:
+        return None
     try:
-        ticker = yf.Ticker(ticker_symbol)
+        return datetime.fromisoformat(str(value)[:19].replace(" ", "T"))
+    except ValueError:
+        return None
+
+
+def is_trading_day(moment: datetime) -> bool:
+    return moment.weekday() < 5
+
+
+def section_due(section: str, state: dict, now: datetime):
+    """
+    섹션 수집 주기 정책 → (due 여부, 사유)
+      info/history: 매일, options: 거래일마다, holdings: 매주,
+      earnings: 매주 (실적발표 ±7일 구간은 매일), statements: 실적발표 이후 또는 90일 경과
+    """
+    last = parse_datetime(state.get("fetched_at", {}).get(section))
+    if last is None:
+        return True, "never fetched"
+
+    age = now - last
+    earnings_date = parse_datetime(state.get("earnings_date"))
+    last_reported = parse_datetime(state.get("last_reported_date"))
+
+    if section in ("info", "history"):
+        due = age >= CADENCE[section]
+    elif section == "options":
+        due = is_trading_day(now) and last.date() < now.date()
+    elif section == "earnings":
+        near_report = earnings_date is not None and abs((earnings_date - now).days) <= 7
+        due = age >= (timedelta(days=1) if near_report else CADENCE[section])
+    elif section == "statements":
+        reported_since = last_reported is not None and last_reported > last
+        passed_since = earnings_date is not None and last < earnings_date <= now
+        if reported_since or passed_since:
+            return True, "earnings reported since last fetch"
+        due = age >= CADENCE[section]
+    else:
+        due = age >= CADENCE.get(section, timedelta(days=1))
+
+    if due:
+        return True, f"last fetched {last.isoformat()}"
+    return False, f"not due (last fetched {last.isoformat()})"
+
+
+def update_state(state: dict, fetched: list, result: dict, now: datetime) -> dict:
+    fetched_at = state.setdefault("fetched_at", {})
+    for section in fetched:
+        fetched_at[section] = now.isoformat(timespec="seconds")
+
+    earnings = result.get("earnings") or {}
+    calendar = earnings.get("calendar") or {}
+    if calendar.get("earnings_date"):
+        state["earnings_date"] = calendar["earnings_date"]
+
+    reported = [e["earnings_date"] for e in earnings.get("earnings_dates", []) if e.get("reported_eps") is not None]
+    if reported:
+        state["last_reported_date"] = max(reported + [state.get("last_reported_date") or ""])
+
+    return state
+
+
+def resolve_sections(ticker_symbol: str, requested, due_only: bool, now: datetime):
+    """요청 섹션 + 주기 정책 → (수집할 섹션, 건너뛴 섹션 {section: reason}, state)"""
+    requested = list(requested or SECTIONS)
+    unknown = [s for s in requested if s not in SECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown sections: {', '.join(unknown)} (available: {', '.join(SECTIONS)})")
+
+    state = load_state(ticker_symbol)
+    skipped = {s: "not requested" for s in SECTIONS if s not in requested}
+    selected = []
+
+    for section in requested:
+        if due_only:
+            due, reason = section_due(section, state, now)
+            if not due:
+                skipped[section] = reason
+                continue
+        selected.append(section)
 
+    return selected, skipped, state
+
+
+def write_to_database(result: dict) -> dict:
+    """--sink db: 결과를 테이블에 직접 저장하고 대용량 섹션을 제거한 요약 반환"""
+    import db
+    from db_writer import write_stock_result
+
+    database = db.connect()
+    try:
+        rows = database.fetch_all("SELECT id FROM stocks WHERE ticker = ?", (result["ticker"],))
+        if not rows:
+            raise RuntimeError(f"Stock {result['ticker']} not found in database")
+        counts = write_stock_result(database, rows[0]["id"], result)
+    finally:
+        database.close()
+
+    summary = {k: result[k] for k in ("success", "ticker", "timestamp", "sections", "timed_out", "price_store", "options_store", "holdings_index", "revision_engine") if k in result}
+    summary["sink"] = {"written": True, "rows": counts}
+    return summary
+
+
+def run_with_budget(fn, budget):
+    """
+    budget(초) 안에 끝나지 않으면 (None, True) 반환
+    yfinance 호출은 중단할 수 없어 daemon 스레드에서 실행하고 버려진 스레드가 나중에 내는 결과/예외는 무시
+    버려진 스레드는 계속 실행되므로 호출 측은 이후 섹션에 같은 Ticker 객체를 쓰지 않아야 함
+    (HTTP 세션 / yfinance 쿠키·crumb 싱글턴은 프로세스 공유라 분리할 수 없음, yf.download(threads=True)와 같은 조건)
+    """
+    if budget is None:
+        return fn(), False
+
+    box = {}
+
+    def target():
+        try:
+            box["value"] = fn()
+        except Exception as e:
+            box["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(max(budget, 0))
+    if thread.is_alive():
+        return None, True
+    if "error" in box:
+        raise box["error"]
+    return box["value"], False
+
+
+# 섹션 → 결과 키 매핑 (statements는 income_stmt/balance_sheet/cashflow)
+SECTION_FETCHERS = {
+    "info": lambda ticker: {"info": fetch_info(ticker)},  # 기본 정보
+    "statements": fetch_statements,  # 재무제표 (연간)
+    "history": lambda ticker: {"history": fetch_history(ticker)},  # 가격 히스토리
+    "options": lambda ticker: {"options": fetch_options_data(ticker)},  # 옵션 데이터
+    "holdings": lambda ticker: {"holdings": fetch_holdings_data(ticker)},  # 수급현황 데이터
+    "earnings": lambda ticker: {"earnings": fetch_earnings_data(ticker)},  # 실적/가이던스 데이터
+}
+
+
+def fetch_stock_data(ticker_symbol: str, sections=None, due_only: bool = False, price_store: bool = False,
+                     deadline: float = None, options_store: bool = False, holdings_index: bool = False,
+                     revision_engine: bool = False) -> dict:
+    """
+    주식 데이터 수집 (sections 미지정 시 전체, due_only 시 주기 정책 적용)
+    deadline(초) 지정 시 섹션별 예산을 넘긴 섹션과 시간이 소진되어 시작하지 못한 섹션은
+    sections.timed_out에 사유와 함께 기록하고 나머지 결과만 반환
+    """
+    try:
+        started = time.monotonic()
+        now = datetime.now()
+        selected, skipped, _ = resolve_sections(ticker_symbol, sections, due_only, now)
+        ticker = METRICS.instrument(yahoo_session.ticker(ticker_symbol))
+
+        fetched, timed_out = [], {}
         result = {
             "success": True,
             "ticker": ticker_symbol,
-            "timestamp": datetime.now().isoformat(),
-            "info": {},
-            "income_stmt": {},
-            "balance_sheet": {},
-            "cashflow": {},
-            "history": []
+            "timestamp": now.isoformat(),
+            "sections": {
+                "fetched": fetched,
+                "skipped": skipped,
+                "timed_out": timed_out,
+            },
         }
 
-        # 기본 정보
-        info = ticker.info
-        result["info"] = {
-            "name": info.get("longName") or info.get("shortName"),
-            "sector": info.get("sector"),
-            "industry": info.get("industry"),
-            "exchange": info.get("exchange"),
-            "currency": info.get("currency"),
-            "current_price": safe_value(info.get("currentPrice") or info.get("regularMarketPrice")),
-            "market_cap": safe_value(info.get("marketCap")),
-            "enterprise_value": safe_value(info.get("enterpriseValue")),
-            # 밸류에이션
-            "pe_ratio": safe_value(info.get("trailingPE")),
-            "forward_pe": safe_value(info.get("forwardPE")),
-            "peg_ratio": safe_value(info.get("pegRatio")),
-            "pb_ratio": safe_value(info.get("priceToBook")),
-            "ps_ratio": safe_value(info.get("priceToSalesTrailing12Months")),
-            "ev_ebitda": safe_value(info.get("enterpriseToEbitda")),
-            "ev_revenue": safe_value(info.get("enterpriseToRevenue")),
-            # 수익성
-            "profit_margin": safe_value(info.get("profitMargins")),
-            "operating_margin": safe_value(info.get("operatingMargins")),
-            "gross_margin": safe_value(info.get("grossMargins")),
-            "roe": safe_value(info.get("returnOnEquity")),
-            "roa": safe_value(info.get("returnOnAssets")),
-            # 주당 지표
-            "eps": safe_value(info.get("trailingEps")),
-            "forward_eps": safe_value(info.get("forwardEps")),
-            "book_value": safe_value(info.get("bookValue")),
-            "revenue_per_share": safe_value(info.get("revenuePerShare")),
-            # 배당
-            "dividend_rate": safe_value(info.get("dividendRate")),
-            "dividend_yield": safe_value(info.get("dividendYield")),
-            "payout_ratio": safe_value(info.get("payoutRatio")),
-            # 성장률
-            "earnings_growth": safe_value(info.get("earningsGrowth")),
-            "revenue_growth": safe_value(info.get("revenueGrowth")),
-            # 재무 건전성
-            "total_cash": safe_value(info.get("totalCash")),
-            "total_debt": safe_value(info.get("totalDebt")),
-            "debt_to_equity": safe_value(info.get("debtToEquity")),
-            "current_ratio": safe_value(info.get("currentRatio")),
-            "quick_ratio": safe_value(info.get("quickRatio")),
-            # 현금흐름
-            "operating_cashflow": safe_value(info.get("operatingCashflow")),
-            "free_cashflow": safe_value(info.get("freeCashflow")),
-            # 주식 정보
-            "shares_outstanding": safe_value(info.get("sharesOutstanding")),
-            "float_shares": safe_value(info.get("floatShares")),
-            "beta": safe_value(info.get("beta")),
-            "52_week_high": safe_value(info.get("fiftyTwoWeekHigh")),
-            "52_week_low": safe_value(info.get("fiftyTwoWeekLow")),
-            "50_day_avg": safe_value(info.get("fiftyDayAverage")),
-            "200_day_avg": safe_value(info.get("twoHundredDayAverage")),
-        }
+        for section in selected:
+            budget = None
+            if deadline is not None:
+                remaining = deadline - (time.monotonic() - started)
+                if remaining <= 0:
+                    timed_out[section] = "deadline reached before start"
+                    continue
+                budget = min(SECTION_BUDGETS[section], remaining)
+
+            data, expired = run_with_budget(lambda section=section, ticker=ticker: SECTION_FETCHERS[section](ticker), budget)
+            if expired:
+                timed_out[section] = f"exceeded {budget:.1f}s budget"
+                # 버려진 스레드가 아직 쓰는 Ticker(내부 캐시)를 이후 섹션과 공유하지 않도록 새로 생성
+                ticker = METRICS.instrument(yahoo_session.ticker(ticker_symbol))
+                continue
 
-        # 손익계산서 (연간)
-        try:
-            income_stmt = ticker.income_stmt
-            if income_stmt is not None and not income_stmt.empty:
-                for col in income_stmt.columns:
-                    date_str = col.strftime("%Y-%m-%d") if hasattr(col, 'strftime') else str(col)
-                    result["income_stmt"][date_str] = {
-                        "total_revenue": safe_value(income_stmt.loc["Total Revenue", col] if "Total Revenue" in income_stmt.index else None),
-                        "gross_profit": safe_value(income_stmt.loc["Gross Profit", col] if "Gross Profit" in income_stmt.index else None),
-                        "operating_income": safe_value(income_stmt.loc["Operating Income", col] if "Operating Income" in income_stmt.index else None),
-                        "net_income": safe_value(income_stmt.loc["Net Income", col] if "Net Income" in income_stmt.index else None),
-                        "ebitda": safe_value(income_stmt.loc["EBITDA", col] if "EBITDA" in income_stmt.index else None),
-                        "basic_eps": safe_value(income_stmt.loc["Basic EPS", col] if "Basic EPS" in income_stmt.index else None),
-                        "diluted_eps": safe_value(income_stmt.loc["Diluted EPS", col] if "Diluted EPS" in income_stmt.index else None),
-                    }
-        except Exception as e:
-            result["income_stmt"] = {"error": str(e)}
+            result.update(data)
+            fetched.append(section)
 
-        # 재무상태표 (연간)
-        try:
-            balance = ticker.balance_sheet
-            if balance is not None and not balance.empty:
-                for col in balance.columns:
-                    date_str = col.strftime("%Y-%m-%d") if hasattr(col, 'strftime') else str(col)
-                    result["balance_sheet"][date_str] = {
-                        "total_assets": safe_value(balance.loc["Total Assets", col] if "Total Assets" in balance.index else None),
-                        "total_liabilities": safe_value(balance.loc["Total Liabilities Net Minority Interest", col] if "Total Liabilities Net Minority Interest" in balance.index else None),
-                        "stockholders_equity": safe_value(balance.loc["Stockholders Equity", col] if "Stockholders Equity" in balance.index else None),
-                        "total_debt": safe_value(balance.loc["Total Debt", col] if "Total Debt" in balance.index else None),
-                        "cash_and_equivalents": safe_value(balance.loc["Cash And Cash Equivalents", col] if "Cash And Cash Equivalents" in balance.index else None),
-                        "current_assets": safe_value(balance.loc["Current Assets", col] if "Current Assets" in balance.index else None),
-                        "current_liabilities": safe_value(balance.loc["Current Liabilities", col] if "Current Liabilities" in balance.index else None),
-                    }
-        except Exception as e:
-            result["balance_sheet"] = {"error": str(e)}
+        # 기술적 지표: 히스토리는 월봉(HISTORY_INTERVAL)이므로 일봉 가격 저장소 기준으로 계산 (일봉이 없으면 생략)
+        if "history" in fetched:
+            try:
+                result["indicators"] = compute_for_ticker(ticker_symbol)
+            except Exception as e:
+                result["indicators"] = {"error": str(e)}
 
-        # 현금흐름표 (연간)
-        try:
-            cashflow = ticker.cashflow
-            if cashflow is not None and not cashflow.empty:
-                for col in cashflow.columns:
-                    date_str = col.strftime("%Y-%m-%d") if hasattr(col, 'strftime') else str(col)
-                    result["cashflow"][date_str] = {
-                        "operating_cashflow": safe_value(cashflow.loc["Operating Cash Flow", col] if "Operating Cash Flow" in cashflow.index else None),
-                        "investing_cashflow": safe_value(cashflow.loc["Investing Cash Flow", col] if "Investing Cash Flow" in cashflow.index else None),
-                        "financing_cashflow": safe_value(cashflow.loc["Financing Cash Flow", col] if "Financing Cash Flow" in cashflow.index else None),
-                        "free_cashflow": safe_value(cashflow.loc["Free Cash Flow", col] if "Free Cash Flow" in cashflow.index else None),
-                        "capex": safe_value(cashflow.loc["Capital Expenditure", col] if "Capital Expenditure" in cashflow.index else None),
-                    }
-        except Exception as e:
-            result["cashflow"] = {"error": str(e)}
+            if price_store:
+                from price_store import PriceStore
+                try:
+                    result["price_store"] = PriceStore(HISTORY_INTERVAL).append(ticker_symbol, result["history"])
+                except Exception as e:
+                    result["price_store"] = {"error": str(e)}
 
-        # 가격 히스토리 (최근 5년, 월봉)
-        try:
-            history = ticker.history(period="5y", interval="1mo")
-            if history is not None and not history.empty:
-                for idx, row in history.iterrows():
-                    date_str = idx.strftime("%Y-%m-%d") if hasattr(idx, 'strftime') else str(idx)
-                    result["history"].append({
-                        "date": date_str,
-                        "open": safe_value(row.get("Open")),
-                        "high": safe_value(row.get("High")),
-                        "low": safe_value(row.get("Low")),
-                        "close": safe_value(row.get("Close")),
-                        "volume": safe_value(row.get("Volume")),
-                    })
-        except Exception as e:
-            result["history"] = []
+        if options_store and "options" in fetched:
+            from options_store import OptionsStore
+            try:
+                result["options_store"] = OptionsStore().append(ticker_symbol, result["options"], now.date().isoformat())
+            except Exception as e:
+                result["options_store"] = {"error": str(e)}
 
-        # 옵션 데이터
-        result["options"] = fetch_options_data(ticker)
+        if holdings_index and "holdings" in fetched:
+            import holdings_index as holder_index
+            try:
+                result["holdings_index"] = holder_index.update(ticker_symbol, result["holdings"])
+            except Exception as e:
+                result["holdings_index"] = {"error": str(e)}
 
-        # 수급현황 데이터
-        result["holdings"] = fetch_holdings_data(ticker)
+        if revision_engine and "earnings" in fetched:
+            import revision_momentum
+            try:
+                result["revision_engine"] = revision_momentum.update(ticker_symbol, result["earnings"])
+            except Exception as e:
+                result["revision_engine"] = {"error": str(e)}
 
-        # 실적/가이던스 데이터
-        result["earnings"] = fetch_earnings_data(ticker)
+        result["timed_out"] = bool(timed_out)
+        if fetched:
+            modify_state(ticker_symbol, lambda latest: update_state(latest, fetched, result, now))
 
         return result
 
@@ -493,10 +825,37 @@ def fetch_stock_data(ticker_symbol: str) -> dict:
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
+    parser = argparse.ArgumentParser(description="Fetch Yahoo Finance data for a ticker")
+    parser.add_argument("ticker", nargs="?")
+    parser.add_argument("--sections", help=f"Comma separated sections ({','.join(SECTIONS)})")
+    parser.add_argument("--due", action="store_true", help="Only fetch sections that are due per cadence policy")
+    parser.add_argument("--sink", choices=["stdout", "db"], default="stdout", help="Write results straight into the database")
+    parser.add_argument("--price-store", action="store_true", help="Also append history bars to the local columnar price store")
+    parser.add_argument("--options-store", action="store_true", help="Also record option chains in the delta-compressed snapshot store")
+    parser.add_argument("--holdings-index", action="store_true", help="Also update the holder to positions inverted index")
+    parser.add_argument("--revision-engine", action="store_true", help="Also feed estimates into the revision momentum rankings")
+    parser.add_argument("--deadline", type=float, help="Overall time limit in seconds; slow sections are dropped and marked timed_out")
+    parser.add_argument("--metrics-file", help="OpenMetrics output path (default: storage/app/private/metrics/fetch_financials.prom)")
+    args = parser.parse_args()
+
+    if not args.ticker:
         print(json.dumps({"success": False, "error": "Ticker symbol required"}))
         sys.exit(1)
 
-    ticker_symbol = sys.argv[1].upper()
-    result = fetch_stock_data(ticker_symbol)
+    ticker_symbol = args.ticker.upper()
+    sections = [s.strip() for s in args.sections.split(",") if s.strip()] if args.sections else None
+    result = fetch_stock_data(ticker_symbol, sections, args.due, args.price_store, args.deadline, args.options_store, args.holdings_index,
+                            args.revision_engine)
+
+    if args.sink == "db" and result.get("success"):
+        try:
+            result = write_to_database(result)
+        except Exception as e:
+            result = {"success": False, "ticker": ticker_symbol, "error": f"DB sink failed: {e}", "timestamp": datetime.now().isoformat()}
+
     print(json.dumps(result, ensure_ascii=False))
+
+    try:
+        METRICS.write(args.metrics_file)
+    except Exception:
+        pass
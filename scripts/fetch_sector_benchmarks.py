@@ -5,7 +5,9 @@ Fetch sector benchmark data from ETFs using yfinance.
 
 import json
 import sys
-import yfinance as yf
+
+import yahoo_session
+from metrics import Metrics
 
 SECTOR_ETFS = [
     ('SMH', 'Semiconductors', '반도체'),
@@ -27,11 +29,13 @@ SECTOR_ETFS = [
     ('ROBO', 'Robotics & AI', '로봇/AI'),
 ]
 
+METRICS = Metrics('fetch_sector_benchmarks')
+
 
 def fetch_benchmark(ticker: str, sector_name: str, sector_name_kr: str) -> dict:
     """Fetch benchmark data for a single ETF."""
     try:
-        etf = yf.Ticker(ticker)
+        etf = METRICS.instrument(yahoo_session.ticker(ticker))
         info = etf.info
 
         return {
@@ -67,6 +71,11 @@ def main():
 
     print(json.dumps(output))
 
+    try:
+        METRICS.write()
+    except Exception:
+        pass
+
 
 if __name__ == '__main__':
     main()
@@ -3,17 +3,28 @@
 StockStory.org 투자 분석 데이터 크롤링 스크립트
 Laravel에서 호출하여 JSON 형태로 데이터 반환
 
-사용법: python fetch_stockstory.py <ticker> <exchange>
-예시:   python fetch_stockstory.py meta nasdaq
+사용법: python fetch_stockstory.py <ticker> <exchange> [--stream] [--max-bytes=N] [--deadline=SECONDS] [--metrics-file=PATH]
+  --deadline  전체 제한시간(초). 시간이 다 되면 읽은 부분까지만 파싱하여 timed_out 표시와 함께 반환
+예시:   python fetch_stockstory.py meta nasdaq --stream
 """
 
 import sys
 import json
 import re
 import math
+import time
+import codecs
 import requests
 from datetime import datetime
 
+from metrics import Metrics
+
+STREAM_BYTE_BUDGET = 1_500_000
+STREAM_FIRST_CHECKPOINT = 64 * 1024
+STREAM_CHUNK_SIZE = 16 * 1024
+
+METRICS = Metrics("fetch_stockstory")
+
 
 def safe_float(val):
     """안전한 float 변환"""
@@ -135,6 +146,192 @@ def extract_from_json_ld(json_ld_items, result):
             result["_date_modified"] = item.get("dateModified")
 
 
+# 하이드레이션 JSON의 종목 노드(ticker/symbol을 가진 객체) 기준 경로 → 결과 필드
+# 경로 세그먼트는 normalize_key로 비교 (camelCase/snake_case 모두 허용), 앞쪽 경로가 우선
+# 실제 페이지로 검증되지 않은 경로이므로 정규식으로 찾지 못한 필드만 채우는 보조 출처로 사용
+HYDRATION_PATHS = {
+    "investment_rating": ("rating.label", "investmentRating"),
+    "analysis_summary": ("thesis.summary", "analysisSummary"),
+    "latest_quarter_label": ("latestQuarter.label",),
+    "quarterly_revenue": ("latestQuarter.revenue.actual",),
+    "quarterly_eps": ("latestQuarter.eps.actual",),
+    "quarterly_gross_margin": ("latestQuarter.grossMargin",),
+    "quarterly_operating_margin": ("latestQuarter.operatingMargin",),
+    "revenue_beat_percent": ("latestQuarter.revenue.surprise",),
+    "eps_beat_percent": ("latestQuarter.eps.surprise",),
+    "wall_street_revenue_estimate": ("latestQuarter.revenue.estimate",),
+    "wall_street_eps_estimate": ("latestQuarter.eps.estimate",),
+    "guidance_revenue": ("guidance.revenue.midpoint",),
+    "guidance_eps": ("guidance.eps.midpoint",),
+    "guidance_revenue_vs_estimate": ("guidance.revenue.vsEstimate",),
+    "guidance_eps_vs_estimate": ("guidance.eps.vsEstimate",),
+    "revenue_cagr_5y": ("growth.revenueCagr5y",),
+    "revenue_cagr_2y": ("growth.revenueCagr2y",),
+    "eps_cagr_5y": ("growth.epsCagr5y",),
+    "gross_margin": ("margins.gross",),
+    "operating_margin": ("margins.operating",),
+    "gross_margin_trend": ("margins.grossTrend",),
+    "operating_margin_trend": ("margins.operatingTrend",),
+    "roic": ("returns.roic",),
+    "cash": ("balanceSheet.cash",),
+    "debt": ("balanceSheet.debt",),
+    "net_debt_to_ebitda": ("balanceSheet.netDebtToEbitda",),
+    "quality_score": ("scores.quality",),
+    "value_score": ("scores.value",),
+}
+MONEY_FIELDS = {"quarterly_revenue", "guidance_revenue", "wall_street_revenue_estimate", "cash", "debt"}
+TEXT_FIELDS = {"investment_rating", "analysis_summary", "latest_quarter_label", "gross_margin_trend", "operating_margin_trend"}
+# 퍼센트 필드의 허용 범위 (정규식 경로와 DB는 퍼센트 단위: 81.8)
+# 하이드레이션 값은 소수(0.818)일 수도 퍼센트일 수도 있어, 소수로 보고 ×100한 값이 범위를 벗어나면 퍼센트로 보고
+# 그대로도 범위를 벗어나면 버림
+PERCENT_RANGES = {
+    "gross_margin": (-100, 100),
+    "operating_margin": (-500, 100),
+    "quarterly_gross_margin": (-100, 100),
+    "quarterly_operating_margin": (-500, 100),
+    "revenue_beat_percent": (-100, 100),
+    "eps_beat_percent": (-1000, 1000),
+    "guidance_revenue_vs_estimate": (-100, 100),
+    "guidance_eps_vs_estimate": (-1000, 1000),
+    "revenue_cagr_5y": (-100, 500),
+    "revenue_cagr_2y": (-100, 500),
+    "eps_cagr_5y": (-100, 500),
+    "roic": (-500, 500),
+}
+
+
+def extract_hydration_json(html):
+    """
+    서버 렌더링 시 함께 내려오는 프레임워크 하이드레이션 JSON 추출
+    (__NEXT_DATA__, Next.js app router의 self.__next_f.push 청크, 기타 application/json 스크립트)
+    """
+    payloads = []
+
+    for m in re.finditer(r'<script[^>]*type="application/json"[^>]*>(.*?)</script>', html, re.DOTALL):
+        try:
+            payloads.append(json.loads(m.group(1)))
+        except json.JSONDecodeError:
+            continue
+
+    # RSC flight 청크: 문자열 리터럴을 이어붙인 뒤 "id:JSON" 줄 단위로 파싱
+    chunks = re.findall(r'self\.__next_f\.push\(\[1,\s*("(?:[^"\\]|\\.)*")\]\)', html)
+    if chunks:
+        flight = ""
+        for chunk in chunks:
+            try:
+                flight += json.loads(chunk)
+            except json.JSONDecodeError:
+                continue
+        for line in flight.split("\n"):
+            _, _, body = line.partition(":")
+            if body[:1] in ("{", "["):
+                try:
+                    payloads.append(json.loads(body))
+                except json.JSONDecodeError:
+                    continue
+
+    return payloads
+
+
+def normalize_key(key):
+    return re.sub(r"[^a-z0-9]", "", str(key).lower())
+
+
+HYDRATION_KEYS = {
+    field: [tuple(normalize_key(part) for part in path.split(".")) for path in paths]
+    for field, paths in HYDRATION_PATHS.items()
+}
+
+
+def hydration_value(field, value):
+    """필드 종류에 맞게 변환 (문자열 금액/퍼센트도 허용, 비율은 단위 확인 후 퍼센트로, 범위 밖 값은 None)"""
+    if isinstance(value, dict):
+        value = value.get("value", value.get("raw"))
+    if value is None or isinstance(value, (dict, list, bool)):
+        return None
+    if field in TEXT_FIELDS:
+        text = re.sub(r"<[^>]+>", "", str(value)).strip()
+        if field == "latest_quarter_label" and not re.match(r"Q[1-4]", text):
+            return None
+        return text or None
+    if isinstance(value, str):
+        if field in MONEY_FIELDS and re.search(r"[A-Za-z]", value):
+            return parse_dollar_amount(value)
+        if "%" in value:
+            return parse_percent(value)
+    number = safe_float(value)
+    if number is None:
+        return None
+    if field in PERCENT_RANGES:
+        low, high = PERCENT_RANGES[field]
+        return next((round(v, 4) for v in (number * 100, number) if low <= v <= high), None)
+    if field in MONEY_FIELDS and number < 0:
+        return None
+    return number
+
+
+def resolve_path(node, path):
+    for part in path:
+        if not isinstance(node, dict):
+            return None
+        node = next((v for k, v in node.items() if normalize_key(k) == part), None)
+    return node
+
+
+def ticker_of(node):
+    for key in ("ticker", "symbol", "tickerSymbol"):
+        value = node.get(key)
+        if isinstance(value, str):
+            return value.upper()
+    return None
+
+
+def extract_from_hydration(payloads, result, ticker=None):
+    """
+    하이드레이션 JSON 트리를 한 번 순회하며 종목 노드(ticker/symbol을 가진 객체)에서 HYDRATION_PATHS 경로로 필드 매핑
+    해당 종목 노드의 값을 우선하고, 다른 종목 하위 트리는 건너뜀
+    반환: 채운 필드 수
+    """
+    ticker = ticker.upper() if ticker else None
+    found = {}  # field -> (priority, value)
+
+    def collect(node, own):
+        for field, paths in HYDRATION_KEYS.items():
+            if field in found and (found[field][0] or not own):
+                continue
+            for path in paths:
+                converted = hydration_value(field, resolve_path(node, path))
+                if converted is not None:
+                    found[field] = (own, converted)
+                    break
+
+    def walk(node, own):
+        if isinstance(node, dict):
+            node_ticker = ticker_of(node)
+            if node_ticker:
+                if ticker and node_ticker != ticker:
+                    return
+                own = own or ticker is not None
+                collect(node, own)
+            for value in node.values():
+                if isinstance(value, (dict, list, str)):
+                    walk(value, own)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item, own)
+        elif isinstance(node, str) and "chart-images" in node and node.startswith("http") and node.endswith(".png"):
+            if node not in result["chart_urls"]:
+                result["chart_urls"].append(node)
+
+    for payload in payloads:
+        walk(payload, False)
+
+    for field, (_, value) in found.items():
+        if result.get(field) is None:
+            result[field] = value
+    return len(found)
+
+
 def extract_from_html(html, result):
     """SSR HTML 본문에서 데이터 추출"""
     text = strip_html(html)
@@ -385,8 +582,126 @@ def extract_from_html(html, result):
             result["chart_urls"].append(img_url)
 
 
-def fetch_stockstory(ticker, exchange):
-    """StockStory.org에서 종목 데이터 크롤링"""
+def new_result():
+    """결과 초기화"""
+    return {
+        "investment_rating": None,
+        "analysis_summary": None,
+        "latest_quarter_label": None,
+        "quarterly_revenue": None,
+        "quarterly_eps": None,
+        "quarterly_gross_margin": None,
+        "quarterly_operating_margin": None,
+        "revenue_beat_percent": None,
+        "eps_beat_percent": None,
+        "guidance_revenue": None,
+        "guidance_eps": None,
+        "guidance_revenue_vs_estimate": None,
+        "guidance_eps_vs_estimate": None,
+        "revenue_cagr_5y": None,
+        "revenue_cagr_2y": None,
+        "eps_cagr_5y": None,
+        "wall_street_revenue_estimate": None,
+        "wall_street_eps_estimate": None,
+        "gross_margin": None,
+        "operating_margin": None,
+        "gross_margin_trend": None,
+        "operating_margin_trend": None,
+        "roic": None,
+        "cash": None,
+        "debt": None,
+        "net_debt_to_ebitda": None,
+        "quality_score": None,
+        "value_score": None,
+        "key_highlights": [],
+        "chart_urls": [],
+    }
+
+
+# 스트리밍 모드: parse_page가 추출하는 모든 필드(+ 차트 URL)를 찾아야 본문 읽기를 중단
+# 하나라도 비어 있으면 EOF까지 읽으므로, 조기 종료해도 갱신되지 않는 필드가 생기지 않음
+STREAM_TARGET_FIELDS = tuple(field for field in new_result() if field != "chart_urls")
+
+
+def parse_page(html, ticker=None):
+    """HTML 전체(또는 스트리밍으로 읽은 앞부분)에서 분석 데이터 추출"""
+    result = new_result()
+
+    # 1. SSR 본문 정규식 (검증된 기본 출처)
+    extract_from_html(html, result)
+
+    # 2. JSON-LD에서 데이터 추출
+    json_ld_items = extract_json_ld(html)
+    extract_from_json_ld(json_ld_items, result)
+
+    # 3. 비어 있는 필드만 하이드레이션 JSON으로 보완 (두 출처가 다르면 정규식 값 유지)
+    extract_from_hydration(extract_hydration_json(html), result, ticker)
+
+    # 임시 키 제거
+    result.pop("_date_modified", None)
+
+    return result
+
+
+def is_complete(result, previous_chart_count):
+    """모든 필드가 채워지고 차트 URL 수가 직전 체크포인트 이후 늘지 않았으면 완료"""
+    if any(result.get(field) in (None, []) for field in STREAM_TARGET_FIELDS):
+        return False
+    return bool(result["chart_urls"]) and len(result["chart_urls"]) == previous_chart_count
+
+
+def read_streaming(response, max_bytes=STREAM_BYTE_BUDGET, chunk_size=STREAM_CHUNK_SIZE, ticker=None, deadline_at=None):
+    """
+    응답 본문을 청크 단위로 디코딩하며 누적하고, 체크포인트(64KB에서 시작해 2배씩)마다 파싱하여
+    모든 대상 필드/차트 URL을 찾았거나 바이트 예산 또는 deadline_at(time.monotonic 기준)에 도달하면 읽기를 중단
+    """
+    decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+    parts = []
+    bytes_read = 0
+    next_checkpoint = STREAM_FIRST_CHECKPOINT
+    chart_count = -1
+    result = None
+    stop_reason = "eof"
+
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            bytes_read += len(chunk)
+            parts.append(decoder.decode(chunk))
+
+            if bytes_read >= max_bytes:
+                stop_reason = "byte_budget"
+                break
+
+            if deadline_at is not None and time.monotonic() >= deadline_at:
+                stop_reason = "deadline"
+                break
+
+            if bytes_read >= next_checkpoint:
+                next_checkpoint *= 2
+                result = parse_page("".join(parts), ticker)
+                if is_complete(result, chart_count):
+                    stop_reason = "complete"
+                    break
+                chart_count = len(result["chart_urls"])
+    finally:
+        response.close()
+
+    parts.append(decoder.decode(b"", final=True))
+    html = "".join(parts)
+    if stop_reason != "complete" or result is None:
+        result = parse_page(html, ticker)
+
+    return result, {"bytes_read": bytes_read, "stop_reason": stop_reason}
+
+
+def fetch_stockstory(ticker, exchange, stream=False, max_bytes=STREAM_BYTE_BUDGET, deadline=None):
+    """
+    StockStory.org에서 종목 데이터 크롤링 (stream=True: 필요한 필드를 찾으면 다운로드 조기 종료)
+    deadline(초) 지정 시 스트리밍으로 읽고, 시간이 다 되면 그때까지 받은 본문의 부분 결과를 반환
+    """
+    deadline_at = time.monotonic() + deadline if deadline else None
+    timeout = min(30, max(deadline, 1)) if deadline else 30
+    stream = stream or deadline_at is not None
     url = f"https://stockstory.org/us/stocks/{exchange.lower()}/{ticker.lower()}"
 
     headers = {
@@ -399,7 +714,15 @@ def fetch_stockstory(ticker, exchange):
     }
 
     try:
-        response = requests.get(url, headers=headers, timeout=30)
+        with METRICS.timer("stockstory_page") as span:
+            response = requests.get(url, headers=headers, timeout=timeout, stream=stream)
+            if response.status_code == 200:
+                if stream:
+                    result, stream_stats = read_streaming(response, max_bytes, ticker=ticker, deadline_at=deadline_at)
+                else:
+                    result, stream_stats = parse_page(response.text, ticker), None
+            else:
+                span["outcome"] = {404: "empty", 429: "429"}.get(response.status_code, "error")
 
         if response.status_code == 404:
             return {
@@ -417,52 +740,6 @@ def fetch_stockstory(ticker, exchange):
                 "timestamp": datetime.now().isoformat(),
             }
 
-        html = response.text
-
-        # 결과 초기화
-        result = {
-            "investment_rating": None,
-            "analysis_summary": None,
-            "latest_quarter_label": None,
-            "quarterly_revenue": None,
-            "quarterly_eps": None,
-            "quarterly_gross_margin": None,
-            "quarterly_operating_margin": None,
-            "revenue_beat_percent": None,
-            "eps_beat_percent": None,
-            "guidance_revenue": None,
-            "guidance_eps": None,
-            "guidance_revenue_vs_estimate": None,
-            "guidance_eps_vs_estimate": None,
-            "revenue_cagr_5y": None,
-            "revenue_cagr_2y": None,
-            "eps_cagr_5y": None,
-            "wall_street_revenue_estimate": None,
-            "wall_street_eps_estimate": None,
-            "gross_margin": None,
-            "operating_margin": None,
-            "gross_margin_trend": None,
-            "operating_margin_trend": None,
-            "roic": None,
-            "cash": None,
-            "debt": None,
-            "net_debt_to_ebitda": None,
-            "quality_score": None,
-            "value_score": None,
-            "key_highlights": [],
-            "chart_urls": [],
-        }
-
-        # 1. JSON-LD에서 데이터 추출
-        json_ld_items = extract_json_ld(html)
-        extract_from_json_ld(json_ld_items, result)
-
-        # 2. SSR HTML 본문에서 데이터 추출 (핵심)
-        extract_from_html(html, result)
-
-        # 임시 키 제거
-        result.pop("_date_modified", None)
-
         return {
             "success": True,
             "ticker": ticker.upper(),
@@ -470,6 +747,10 @@ def fetch_stockstory(ticker, exchange):
             "url": url,
             "timestamp": datetime.now().isoformat(),
             "data": result,
+            "stream": stream_stats,
+            "timed_out": bool(stream_stats and stream_stats["stop_reason"] == "deadline"),
+            # 본문 끝(EOF)까지 읽지 않았으면 대상 외 필드가 비어 있을 수 있으므로 찾은 필드만 저장해야 함
+            "stopped_early": bool(stream_stats and stream_stats["stop_reason"] != "eof"),
         }
 
     except requests.Timeout:
@@ -477,6 +758,7 @@ def fetch_stockstory(ticker, exchange):
             "success": False,
             "ticker": ticker.upper(),
             "error": "Request timeout",
+            "timed_out": True,
             "timestamp": datetime.now().isoformat(),
         }
     except requests.RequestException as e:
@@ -499,15 +781,26 @@ if __name__ == "__main__":
     import io
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8")
 
-    if len(sys.argv) < 3:
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if len(args) < 2:
         print(json.dumps({
             "success": False,
-            "error": "Usage: python fetch_stockstory.py <ticker> <exchange>"
+            "error": "Usage: python fetch_stockstory.py <ticker> <exchange> [--stream] [--max-bytes=N] [--deadline=SECONDS]"
         }))
         sys.exit(1)
 
-    ticker_symbol = sys.argv[1]
-    exchange_name = sys.argv[2]
+    ticker_symbol = args[0]
+    exchange_name = args[1]
+    stream_mode = "--stream" in sys.argv
+    byte_budget = next((int(a.split("=", 1)[1]) for a in sys.argv if a.startswith("--max-bytes=")), STREAM_BYTE_BUDGET)
+
+    deadline_seconds = next((float(a.split("=", 1)[1]) for a in sys.argv if a.startswith("--deadline=")), None)
+    metrics_file = next((a.split("=", 1)[1] for a in sys.argv if a.startswith("--metrics-file=")), None)
 
-    result = fetch_stockstory(ticker_symbol, exchange_name)
+    result = fetch_stockstory(ticker_symbol, exchange_name, stream_mode, byte_budget, deadline_seconds)
     print(json.dumps(result, ensure_ascii=False))
+
+    try:
+        METRICS.write(metrics_file)
+    except Exception:
+        pass
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+펀더멘털 컬럼형 스냅샷 (스크리닝용)
+종목별 최신 stock_fundamentals를 컬럼별 .npy 파일로 저장하고 memory-map으로 조회
+
+사용법:
+  python fundamentals_snapshot.py build [--full]
+  python fundamentals_snapshot.py query --where "pe_ratio<20" --where "roe_sector_pct>=80" --sort ev_ebitda --limit 10
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import operator
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import db
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+METRICS = [
+    "current_price", "market_cap", "enterprise_value",
+    "pe_ratio", "forward_pe", "peg_ratio", "pb_ratio", "ps_ratio", "ev_ebitda", "ev_revenue",
+    "profit_margin", "operating_margin", "gross_margin", "roe", "roa",
+    "earnings_growth", "revenue_growth",
+    "debt_to_equity", "current_ratio", "dividend_yield", "beta",
+]
+
+# 섹터 상대 순위/ z-score를 계산할 지표
+RANKED_METRICS = [
+    "pe_ratio", "forward_pe", "pb_ratio", "ps_ratio", "ev_ebitda", "peg_ratio",
+    "profit_margin", "operating_margin", "gross_margin", "roe", "roa",
+    "earnings_growth", "revenue_growth", "debt_to_equity", "dividend_yield",
+]
+
+# 스냅샷 값에 영향을 주는 테이블 (펀더멘털 갱신, 종목 섹터 재배정, 섹터 벤치마크 ETF 변경, 벤치마크 배수 갱신)
+WATERMARK_TABLES = ["stock_fundamentals", "stocks", "sectors", "sector_benchmarks"]
+
+OPERATORS = {
+    "<=": operator.le,
+    ">=": operator.ge,
+    "!=": operator.ne,
+    "<": operator.lt,
+    ">": operator.gt,
+    "=": operator.eq,
+}
+
+
+def snapshot_dir() -> str:
+    return os.path.join(db.storage_path("snapshots"), "fundamentals")
+
+
+def load_latest_fundamentals(database, since=None) -> pd.DataFrame:
+    """종목별 최신 펀더멘털 + 섹터/벤치마크 (since 지정 시 이후 갱신분만)"""
+    sql = f"""
+        SELECT s.id AS stock_id, s.ticker, s.sector_id, sec.code AS sector_code,
+               b.trailing_pe AS benchmark_pe, b.pb_ratio AS benchmark_pb,
+               f.updated_at, {", ".join("f." + m for m in METRICS)}
+        FROM stocks s
+        JOIN stock_fundamentals f ON f.stock_id = s.id
+        JOIN (SELECT stock_id, MAX(date) AS latest_date FROM stock_fundamentals GROUP BY stock_id) latest
+          ON latest.stock_id = f.stock_id AND latest.latest_date = f.date
+        LEFT JOIN sectors sec ON sec.id = s.sector_id
+        LEFT JOIN sector_benchmarks b ON b.etf_ticker = sec.benchmark_etf
+        WHERE s.is_active = 1
+    """
+    params = []
+    if since:
+        # 초 단위 타임스탬프라 마지막 빌드와 같은 초에 기록된 행도 다시 읽음 (변경 여부는 값 비교로 판단)
+        sql += " AND (f.updated_at >= ? OR s.updated_at >= ? OR sec.updated_at >= ? OR b.updated_at >= ?)"
+        params.extend([since] * 4)
+
+    return pd.DataFrame(database.fetch_all(sql, params))
+
+
+def current_watermark(database):
+    """WATERMARK_TABLES의 최신 updated_at (읽기 전에 구해야 빌드 중 기록된 행을 다음 빌드에서 놓치지 않음)"""
+    stamps = [database.fetch_all(f"SELECT MAX(updated_at) AS latest FROM {table}")[0]["latest"] for table in WATERMARK_TABLES]
+    stamps = [str(s) for s in stamps if s]
+    return max(stamps) if stamps else None
+
+
+def active_stock_ids(database) -> set:
+    return {int(r["id"]) for r in database.fetch_all("SELECT id FROM stocks WHERE is_active = 1")}
+
+
+def drop_unchanged(changed: pd.DataFrame, base: pd.DataFrame) -> pd.DataFrame:
+    """워터마크 경계에서 다시 읽힌 행 중 스냅샷과 값이 같은 종목 제외"""
+    if changed.empty or base.empty:
+        return changed
+    columns = ["sector_id", "benchmark_pe", "benchmark_pb"] + METRICS
+    fresh = changed.set_index(changed["stock_id"].astype("float64"))[columns].apply(pd.to_numeric, errors="coerce")
+    stored = base.set_index("stock_id")[columns].reindex(fresh.index)
+    same = ((fresh == stored) | (fresh.isna() & stored.isna())).all(axis=1)
+    return changed[~same.to_numpy()]
+
+
+def add_sector_relative(frame: pd.DataFrame) -> pd.DataFrame:
+    """섹터 내 백분위 순위(0~100)와 z-score, 벤치마크 ETF 대비 배수"""
+    frame = frame.copy()
+    for col in METRICS + ["benchmark_pe", "benchmark_pb"]:
+        frame[col] = pd.to_numeric(frame[col], errors="coerce").astype("float64")
+
+    by_sector = frame.groupby(frame["sector_id"].fillna(-1), sort=False)
+    for m in RANKED_METRICS:
+        frame[f"{m}_sector_pct"] = by_sector[m].rank(pct=True) * 100
+        mean = by_sector[m].transform("mean")
+        std = by_sector[m].transform("std").replace(0, np.nan)
+        frame[f"{m}_sector_z"] = (frame[m] - mean) / std
+
+    frame["pe_vs_benchmark"] = frame["pe_ratio"] / frame["benchmark_pe"]
+    frame["pb_vs_benchmark"] = frame["pb_ratio"] / frame["benchmark_pb"]
+    return frame
+
+
+def write_snapshot(frame: pd.DataFrame, watermark) -> None:
+    """컬럼별 .npy + meta.json을 빌드마다 고유한 임시 디렉터리에 쓰고 원자적으로 교체"""
+    target = snapshot_dir()
+    tmp = tempfile.mkdtemp(prefix=".fundamentals-", dir=os.path.dirname(target))
+    old = tmp + ".old"
+
+    numeric_cols = [c for c in frame.columns if c not in ("ticker", "sector_code", "updated_at")]
+    for col in numeric_cols:
+        np.save(os.path.join(tmp, f"{col}.npy"), frame[col].to_numpy(dtype="float64", na_value=np.nan))
+
+    meta = {
+        "built_at": datetime.now().isoformat(),
+        "watermark": watermark,
+        "rows": len(frame),
+        "columns": numeric_cols,
+        "tickers": frame["ticker"].tolist(),
+        "sector_codes": frame["sector_code"].where(frame["sector_code"].notna(), None).tolist(),
+        "updated_at": [str(v) for v in frame["updated_at"]],
+    }
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+    if os.path.exists(target):
+        os.replace(target, old)
+    os.replace(tmp, target)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+@contextmanager
+def locked():
+    """빌드(이전 스냅샷 읽기 → 병합 → 교체) 직렬화 (스케줄 빌드와 수동 빌드 동시 실행 대비)"""
+    with open(snapshot_dir() + ".lock", "w") as handle:
+        if fcntl:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def build(full=False) -> dict:
+    """스냅샷 빌드 (기본: 마지막 빌드 이후 갱신된 종목만 다시 읽어 병합)"""
+    with locked():
+        database = db.connect()
+        try:
+            previous = None if full else FundamentalsSnapshot.open_or_none()
+            since = previous.meta.get("watermark") if previous else None
+
+            watermark = current_watermark(database)
+            changed = load_latest_fundamentals(database, since)
+            pruned = 0
+
+            if previous is not None:
+                base = previous.to_frame(["stock_id", "sector_id", "benchmark_pe", "benchmark_pb"] + METRICS)
+                changed = drop_unchanged(changed, base)
+
+                # 비활성화 / 삭제된 종목 제거
+                active = base["stock_id"].isin(active_stock_ids(database))
+                pruned = int((~active).sum())
+                if changed.empty and not pruned:
+                    return {"success": True, "rows": previous.rows, "changed": 0, "rebuilt": False}
+
+                base = base[active]
+                if not changed.empty:
+                    base = base[~base["stock_id"].isin(changed["stock_id"].astype("float64"))]
+                frame = pd.concat([base, changed], ignore_index=True)
+            else:
+                frame = changed
+
+            if frame.empty:
+                return {"success": True, "rows": 0, "changed": 0, "rebuilt": False}
+
+            frame = add_sector_relative(frame.sort_values("ticker").reset_index(drop=True))
+            write_snapshot(frame, watermark)
+
+            return {"success": True, "rows": len(frame), "changed": len(changed), "pruned": pruned, "rebuilt": True}
+        finally:
+            database.close()
+
+
+class FundamentalsSnapshot:
+    """memory-map된 컬럼 스냅샷에 대한 필터/정렬/top-N 조회"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.rows = self.meta["rows"]
+        self.tickers = np.array(self.meta["tickers"], dtype=object)
+        self.sector_codes = np.array(self.meta["sector_codes"], dtype=object)
+        self._columns = {}
+
+    @classmethod
+    def open(cls):
+        return cls(snapshot_dir())
+
+    @classmethod
+    def open_or_none(cls):
+        if not os.path.exists(os.path.join(snapshot_dir(), "meta.json")):
+            return None
+        return cls.open()
+
+    def column(self, name: str) -> np.ndarray:
+        if name not in self._columns:
+            if name not in self.meta["columns"]:
+                raise KeyError(f"Unknown column: {name}")
+            self._columns[name] = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r")
+        return self._columns[name]
+
+    def to_frame(self, columns: list) -> pd.DataFrame:
+        frame = pd.DataFrame({c: np.asarray(self.column(c)) for c in columns})
+        frame["ticker"] = self.tickers
+        frame["sector_code"] = self.sector_codes
+        frame["updated_at"] = self.meta["updated_at"]
+        return frame
+
+    def mask(self, conditions=(), sector=None) -> np.ndarray:
+        """conditions: [(column, op, value)] — NaN은 항상 제외"""
+        selected = np.ones(self.rows, dtype=bool)
+        if sector:
+            selected &= self.sector_codes == sector
+        for col, op, value in conditions:
+            values = self.column(col)
+            selected &= ~np.isnan(values) & OPERATORS[op](values, value)
+        return selected
+
+    def query(self, conditions=(), sector=None, sort_by=None, descending=False, limit=None, columns=None) -> list:
+        idx = np.flatnonzero(self.mask(conditions, sector))
+
+        if sort_by:
+            keys = np.asarray(self.column(sort_by))[idx]
+            keys = np.where(np.isnan(keys), -np.inf if descending else np.inf, keys)
+            if limit and limit < len(idx):
+                part = np.argpartition(-keys if descending else keys, limit - 1)[:limit]
+                idx, keys = idx[part], keys[part]
+            order = np.argsort(-keys if descending else keys, kind="stable")
+            idx = idx[order]
+
+        if limit:
+            idx = idx[:limit]
+
+        columns = columns or ([sort_by] if sort_by else []) + [c for c, _, _ in conditions]
+        columns = list(dict.fromkeys(columns))
+        results = []
+        for i in idx:
+            row = {"ticker": self.tickers[i], "sector": self.sector_codes[i]}
+            for c in columns:
+                v = float(self.column(c)[i])
+                row[c] = None if np.isnan(v) else v
+            results.append(row)
+        return results
+
+
+def parse_condition(text: str):
+    """'pe_ratio<20' → ('pe_ratio', '<', 20.0)"""
+    for op in OPERATORS:
+        if op in text:
+            col, value = text.split(op, 1)
+            return col.strip(), op, float(value)
+    raise ValueError(f"Invalid condition: {text}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Columnar fundamentals snapshot for screening")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = sub.add_parser("build")
+    build_parser.add_argument("--full", action="store_true", help="Rebuild from scratch")
+
+    query_parser = sub.add_parser("query")
+    query_parser.add_argument("--where", action="append", default=[], help="e.g. pe_ratio<20")
+    query_parser.add_argument("--sector", help="Sector code")
+    query_parser.add_argument("--sort", help="Sort column")
+    query_parser.add_argument("--desc", action="store_true")
+    query_parser.add_argument("--limit", type=int, default=20)
+    query_parser.add_argument("--columns", help="Comma separated output columns")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "build":
+            output = build(args.full)
+        else:
+            snapshot = FundamentalsSnapshot.open()
+            started = time.perf_counter()
+            rows = snapshot.query(
+                [parse_condition(c) for c in args.where],
+                sector=args.sector,
+                sort_by=args.sort,
+                descending=args.desc,
+                limit=args.limit,
+                columns=args.columns.split(",") if args.columns else None,
+            )
+            output = {
+                "success": True,
+                "built_at": snapshot.meta["built_at"],
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+                "results": rows,
+            }
+    except Exception as e:
+        output = {"success": False, "error": str(e)}
+
+    print(json.dumps(output, ensure_ascii=False))
+    sys.exit(0 if output["success"] else 1)
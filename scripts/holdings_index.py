@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+보유자 → 보유 종목 역색인 (기관 보유 + 내부자 보유)
+보유자명은 정수 ID로 인턴하고, 보유 내역은 (보유자, 종목) 순 정렬 컬럼 배열 + 보유자/종목별 오프셋으로 저장
+storage/app/private/holdings/ 아래 원자적 디렉터리 교체, 종목 단위로 증분 갱신
+
+사용법:
+  python holdings_index.py build                      # institutional_holders 테이블에서 전체 재구성
+  python holdings_index.py holder "Vanguard Group Inc"
+  python holdings_index.py holders AAPL [--top 10]
+  python holdings_index.py overlap AAPL MSFT [--top 10]
+  python holdings_index.py crowding [--tickers AAPL,MSFT] [--top 20]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import argparse
+from contextlib import contextmanager
+from datetime import date
+
+import numpy as np
+
+import db
+from price_store import to_day, from_day
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+COLUMNS = {
+    "holder": np.dtype("<i4"),
+    "ticker": np.dtype("<i4"),
+    "shares": np.dtype("<f8"),
+    "value": np.dtype("<f8"),
+    "percent_out": np.dtype("<f8"),
+    "date": np.dtype("<i4"),  # 보고일 (1970-01-01 기준 일수, 없으면 -1)
+}
+
+# DB 재구성 시 종목별 최신 보고일에서 이 기간 안의 보고만 현재 보유로 간주
+REPORT_WINDOW_DAYS = 120
+
+
+def index_dir() -> str:
+    return db.storage_path("holdings")
+
+
+def normalize_name(name: str) -> str:
+    """대소문자 / 구두점 / 공백 차이를 무시한 인턴 키"""
+    return re.sub(r"\s+", " ", re.sub(r"[.,']", "", str(name))).strip().upper()
+
+
+def holding_rows(holdings: dict) -> list:
+    """fetch_holdings_data() 결과 → [(보유자명, 구분, 주식수, 평가액, 지분율, 보고일)]"""
+    rows = []
+    for holder in (holdings or {}).get("institutional_holders", []):
+        if holder.get("holder"):
+            rows.append((holder["holder"], "institution", holder.get("shares"), holder.get("value"),
+                         holder.get("percent_out"), holder.get("date_reported")))
+    for insider in (holdings or {}).get("insider_holders", []):
+        if insider.get("name"):
+            shares = [s for s in (insider.get("shares_owned_direct"), insider.get("shares_owned_indirect")) if s is not None]
+            rows.append((insider["name"], "insider", sum(shares) if shares else None, None,
+                         None, insider.get("latest_transaction_date")))
+    return rows
+
+
+def report_day(value) -> int:
+    try:
+        return to_day(value) if value else -1
+    except ValueError:
+        return -1
+
+
+class HoldingsIndex:
+    def __init__(self, path: str = None, load: bool = True):
+        self.path = path or index_dir()
+        meta_path = os.path.join(self.path, "meta.json")
+        if load and os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                self.meta = json.load(f)
+            self.columns = {c: np.load(os.path.join(self.path, f"{c}.npy"), mmap_mode="r") for c in COLUMNS}
+            self.holder_offsets = np.load(os.path.join(self.path, "holder_offsets.npy"), mmap_mode="r")
+            self.ticker_order = np.load(os.path.join(self.path, "ticker_order.npy"), mmap_mode="r")
+            self.ticker_offsets = np.load(os.path.join(self.path, "ticker_offsets.npy"), mmap_mode="r")
+        else:
+            self.meta = {"holders": [], "kinds": [], "tickers": [], "updated_at": {}}
+            self.columns = {c: np.empty(0, dtype=dtype) for c, dtype in COLUMNS.items()}
+            self.holder_offsets = np.zeros(1, dtype="int64")
+            self.ticker_order = np.empty(0, dtype="int64")
+            self.ticker_offsets = np.zeros(1, dtype="int64")
+
+        self.holder_ids = {normalize_name(h): i for i, h in enumerate(self.meta["holders"])}
+        self.ticker_ids = {t: i for i, t in enumerate(self.meta["tickers"])}
+
+    # --- 조회 ---
+
+    def _holder_rows(self, holder_id: int) -> slice:
+        return slice(int(self.holder_offsets[holder_id]), int(self.holder_offsets[holder_id + 1]))
+
+    def _ticker_rows(self, ticker_id: int):
+        return self.ticker_order[int(self.ticker_offsets[ticker_id]):int(self.ticker_offsets[ticker_id + 1])]
+
+    def _position(self, row: int, by: str) -> dict:
+        c = self.columns
+        entry = {
+            "shares": None if np.isnan(c["shares"][row]) else int(c["shares"][row]),
+            "value": None if np.isnan(c["value"][row]) else float(c["value"][row]),
+            "percent_out": None if np.isnan(c["percent_out"][row]) else float(c["percent_out"][row]),
+            "date_reported": from_day(c["date"][row]) if c["date"][row] >= 0 else None,
+        }
+        if by == "ticker":
+            return {"ticker": self.meta["tickers"][c["ticker"][row]], **entry}
+        holder = int(c["holder"][row])
+        return {"holder": self.meta["holders"][holder], "kind": self.meta["kinds"][holder], **entry}
+
+    def find_holder(self, name: str) -> list:
+        """정확히 일치하는 보유자, 없으면 이름에 포함되는 보유자들"""
+        key = normalize_name(name)
+        if key in self.holder_ids:
+            return [self.holder_ids[key]]
+        return [i for k, i in self.holder_ids.items() if key in k]
+
+    def holder(self, name: str) -> list:
+        """보유자별 유니버스 내 보유 종목 (평가액 순) + 보유자 포트폴리오 내 비중"""
+        results = []
+        for holder_id in self.find_holder(name):
+            span = self._holder_rows(holder_id)
+            rows = np.arange(span.start, span.stop)
+            if not len(rows):
+                continue
+            values = np.asarray(self.columns["value"][rows])
+            total = float(np.nansum(values))
+            order = rows[np.argsort(-np.nan_to_num(values, nan=-1), kind="stable")]
+            positions = [self._position(r, "ticker") for r in order]
+            for p in positions:
+                p["weight"] = round(p["value"] / total, 6) if p["value"] and total else None
+            results.append({
+                "holder": self.meta["holders"][holder_id],
+                "kind": self.meta["kinds"][holder_id],
+                "positions": positions,
+                "total_value": total,
+            })
+        return results
+
+    def holders(self, ticker: str, top: int = None, kind: str = None) -> list:
+        """종목의 보유자 (지분율 → 주식수 순)"""
+        ticker_id = self.ticker_ids.get(ticker.upper())
+        if ticker_id is None:
+            return []
+        rows = np.asarray(self._ticker_rows(ticker_id))
+        if kind:
+            kinds = np.array(self.meta["kinds"], dtype=object)
+            rows = rows[kinds[self.columns["holder"][rows]] == kind]
+        pct = np.nan_to_num(np.asarray(self.columns["percent_out"][rows]), nan=-1)
+        shares = np.nan_to_num(np.asarray(self.columns["shares"][rows]), nan=-1)
+        rows = rows[np.lexsort((-shares, -pct))]
+        return [self._position(r, "holder") for r in rows[:top]]
+
+    def overlap(self, a: str, b: str, top: int = 10) -> dict:
+        """두 종목 상위 기관 보유자의 겹침 (Jaccard + 공통 보유자가 차지하는 지분율)"""
+        top_a = {h["holder"]: h for h in self.holders(a, top, "institution")}
+        top_b = {h["holder"]: h for h in self.holders(b, top, "institution")}
+        common = sorted(set(top_a) & set(top_b))
+        union = set(top_a) | set(top_b)
+        return {
+            "tickers": [a.upper(), b.upper()],
+            "jaccard": round(len(common) / len(union), 4) if union else 0.0,
+            "shared_percent_out": {
+                a.upper(): round(sum(top_a[h]["percent_out"] or 0 for h in common), 6),
+                b.upper(): round(sum(top_b[h]["percent_out"] or 0 for h in common), 6),
+            },
+            "common_holders": [
+                {"holder": h, a.upper(): top_a[h]["percent_out"], b.upper(): top_b[h]["percent_out"]}
+                for h in common
+            ],
+        }
+
+    def crowding(self) -> dict:
+        """
+        종목별 crowding 점수 = Σ 기관 지분율 × 그 기관의 유니버스 보유 폭(보유 종목 수 / 전체 종목 수)
+        같은 대형 기관들이 넓게 겹쳐 보유할수록 높음. percentile은 유니버스 내 순위
+        """
+        n_tickers = len(self.meta["tickers"])
+        if not n_tickers:
+            return {}
+        holder, ticker = np.asarray(self.columns["holder"]), np.asarray(self.columns["ticker"])
+        institution = np.array(self.meta["kinds"], dtype=object)[holder] == "institution" if len(holder) else np.empty(0, bool)
+        pct = np.nan_to_num(np.asarray(self.columns["percent_out"]))
+
+        breadth = np.bincount(holder[institution], minlength=len(self.meta["holders"])) / n_tickers
+        score = np.bincount(ticker[institution], weights=pct[institution] * breadth[holder[institution]], minlength=n_tickers)
+        held = np.bincount(ticker[institution], weights=pct[institution], minlength=n_tickers)
+        count = np.bincount(ticker[institution], minlength=n_tickers)
+        percentile = (np.argsort(np.argsort(score)) + 1) / n_tickers
+
+        return {
+            t: {
+                "score": round(float(score[i]), 6),
+                "percentile": round(float(percentile[i]), 4),
+                "institutional_percent_out": round(float(held[i]), 6),
+                "institutions": int(count[i]),
+            }
+            for i, t in enumerate(self.meta["tickers"])
+        }
+
+    # --- 갱신 ---
+
+    def replace(self, updates: dict, today: str = None) -> "HoldingsIndex":
+        """
+        updates: {ticker: holding_rows(...)} — 해당 종목의 기존 보유 내역을 통째로 교체
+        새 보유자명은 인턴 테이블 뒤에 추가, 정렬 순서는 병합 삽입으로 유지
+        """
+        meta = {k: (list(v) if isinstance(v, list) else dict(v)) for k, v in self.meta.items()}
+        holder_ids, ticker_ids = dict(self.holder_ids), dict(self.ticker_ids)
+
+        for ticker in updates:
+            if ticker not in ticker_ids:
+                ticker_ids[ticker] = len(meta["tickers"])
+                meta["tickers"].append(ticker)
+
+        new = {c: [] for c in COLUMNS}
+        for ticker, rows in updates.items():
+            latest = {}
+            for name, kind, shares, value, percent_out, reported in rows:
+                key = normalize_name(name)
+                if key not in holder_ids:
+                    holder_ids[key] = len(meta["holders"])
+                    meta["holders"].append(str(name).strip())
+                    meta["kinds"].append(kind)
+                day = report_day(reported)
+                if key not in latest or day >= latest[key][-1]:
+                    latest[key] = (holder_ids[key], ticker_ids[ticker], shares, value, percent_out, day)
+            for entry in latest.values():
+                for column, v in zip(COLUMNS, entry):
+                    new[column].append(np.nan if v is None else v)
+            meta["updated_at"][ticker] = today or date.today().isoformat()
+
+        new = {c: np.array(new[c], dtype=dtype) for c, dtype in COLUMNS.items()}
+        order = np.lexsort((new["ticker"], new["holder"]))
+        new = {c: v[order] for c, v in new.items()}
+
+        replaced = np.array([ticker_ids[t] for t in updates], dtype="int32")
+        keep = ~np.isin(self.columns["ticker"], replaced)
+        kept = {c: np.asarray(v)[keep] for c, v in self.columns.items()}
+
+        # (보유자, 종목) 정렬 유지 병합
+        key_kept = (kept["holder"].astype("int64") << 32) | kept["ticker"]
+        key_new = (new["holder"].astype("int64") << 32) | new["ticker"]
+        at = np.searchsorted(key_kept, key_new)
+        columns = {c: np.insert(kept[c], at, new[c]) for c in COLUMNS}
+
+        write_index(self.path, columns, meta)
+        return HoldingsIndex(self.path)
+
+
+def offsets(ids, size: int):
+    result = np.zeros(size + 1, dtype="int64")
+    np.cumsum(np.bincount(ids, minlength=size), out=result[1:])
+    return result
+
+
+def write_index(path: str, columns: dict, meta: dict) -> None:
+    """임시 디렉터리에 쓰고 원자적으로 교체 (peer_index와 동일)"""
+    tmp, old = path + ".tmp", path + ".old"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for column, values in columns.items():
+        np.save(os.path.join(tmp, f"{column}.npy"), values)
+    np.save(os.path.join(tmp, "holder_offsets.npy"), offsets(columns["holder"], len(meta["holders"])))
+    np.save(os.path.join(tmp, "ticker_order.npy"), np.argsort(columns["ticker"], kind="stable"))
+    np.save(os.path.join(tmp, "ticker_offsets.npy"), offsets(columns["ticker"], len(meta["tickers"])))
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(path):
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+@contextmanager
+def locked():
+    """읽기-수정-쓰기 직렬화 (병렬 수집 워커 대비)"""
+    os.makedirs(os.path.dirname(index_dir()), exist_ok=True)
+    with open(index_dir() + ".lock", "w") as handle:
+        if fcntl:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def update(ticker: str, holdings: dict) -> dict:
+    """fetch_financials.py 수집 직후 종목 1개 증분 반영"""
+    rows = holding_rows(holdings)
+    with locked():
+        index = HoldingsIndex().replace({ticker.upper(): rows})
+    return {"positions": len(rows), "holders": len(index.meta["holders"])}
+
+
+def build() -> dict:
+    """institutional_holders 테이블에서 종목별 최근 보고분으로 전체 재구성 (내부자는 수집 시 증분 반영분만 유지)"""
+    started = time.perf_counter()
+    database = db.connect()
+    try:
+        rows = database.fetch_all(
+            "SELECT s.ticker, h.holder_name, h.shares, h.value, h.percent_out, h.date_reported "
+            "FROM institutional_holders h JOIN stocks s ON s.id = h.stock_id ORDER BY s.ticker"
+        )
+    finally:
+        database.close()
+
+    by_ticker = {}
+    for row in rows:
+        by_ticker.setdefault(row["ticker"], []).append(row)
+
+    updates = {}
+    for ticker, holders in by_ticker.items():
+        latest = max(report_day(h["date_reported"]) for h in holders)
+        updates[ticker] = [
+            (h["holder_name"], "institution",
+             float(h["shares"]) if h["shares"] is not None else None,
+             float(h["value"]) if h["value"] is not None else None,
+             float(h["percent_out"]) if h["percent_out"] is not None else None,
+             h["date_reported"])
+            for h in holders
+            if report_day(h["date_reported"]) >= latest - REPORT_WINDOW_DAYS
+        ]
+
+    with locked():
+        current = HoldingsIndex()
+        # 기존 내부자 보유분은 유지
+        for ticker in current.ticker_ids:
+            insiders = [
+                (p["holder"], "insider", p["shares"], p["value"], p["percent_out"], p["date_reported"])
+                for p in current.holders(ticker, kind="insider")
+            ]
+            if insiders:
+                updates[ticker] = updates.get(ticker, []) + insiders
+        # 빈 인덱스에서 시작해 빠진 종목 / 더 이상 보유 내역이 없는 보유자명을 정리
+        index = HoldingsIndex(load=False).replace(updates)
+
+    return {
+        "success": True,
+        "tickers": len(index.meta["tickers"]),
+        "holders": len(index.meta["holders"]),
+        "positions": int(len(index.columns["holder"])),
+        "elapsed": round(time.perf_counter() - started, 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Holder to positions inverted index")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("build")
+
+    holder_parser = sub.add_parser("holder")
+    holder_parser.add_argument("name", help="Holder name (exact or partial)")
+
+    holders_parser = sub.add_parser("holders")
+    holders_parser.add_argument("ticker")
+    holders_parser.add_argument("--top", type=int, default=10)
+
+    overlap_parser = sub.add_parser("overlap")
+    overlap_parser.add_argument("ticker_a")
+    overlap_parser.add_argument("ticker_b")
+    overlap_parser.add_argument("--top", type=int, default=10, help="Top institutional holders compared per stock")
+
+    crowding_parser = sub.add_parser("crowding")
+    crowding_parser.add_argument("--tickers", help="Comma separated tickers (default: most crowded)")
+    crowding_parser.add_argument("--top", type=int, default=20)
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "build":
+            output = build()
+        else:
+            index = HoldingsIndex()
+            started = time.perf_counter()
+            if args.command == "holder":
+                output = {"success": True, "holders": index.holder(args.name)}
+            elif args.command == "holders":
+                output = {"success": True, "ticker": args.ticker.upper(), "holders": index.holders(args.ticker, args.top)}
+            elif args.command == "overlap":
+                output = {"success": True, **index.overlap(args.ticker_a, args.ticker_b, args.top)}
+            else:
+                scores = index.crowding()
+                if args.tickers:
+                    selected = [t.strip().upper() for t in args.tickers.split(",") if t.strip()]
+                    scores = {t: scores[t] for t in selected if t in scores}
+                else:
+                    scores = dict(sorted(scores.items(), key=lambda kv: -kv[1]["score"])[:args.top])
+                output = {"success": True, "crowding": scores}
+            output["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    except Exception as e:
+        output = {"success": False, "error": str(e)}
+
+    print(json.dumps(output, ensure_ascii=False))
+    sys.exit(0 if output["success"] else 1)
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+수집 스크립트 실행 메트릭 (엔드포인트별 호출 수 / 결과 / 지연시간 히스토그램)
+실행 종료 시 누적 카운터를 OpenMetrics 텍스트(<job>.prom)로 쓰고, 실행 요약을 <job>.jsonl에 1줄 추가 (최근 JSONL_RUNS회만 유지)
+저장 위치: FETCH_METRICS_DIR (기본 storage/app/private/metrics)
+
+사용법:
+  python metrics.py check --job fetch_financials [--recent 100] [--baseline 1000] [--factor 2.0]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+import db
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+OUTCOMES = ("ok", "empty", "429", "error")
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# 엔드포인트별로 보관하는 최근 관측값 수 (check의 분위수 계산용, 실행 1회는 1~3건이라 실행별 p95는 잡음)
+SAMPLE_WINDOW = 2000
+# check가 비교에 필요로 하는 최소 관측값 수
+MIN_SAMPLES = 20
+JSONL_RUNS = 1000
+
+
+def metrics_dir() -> str:
+    configured = db.load_env().get("FETCH_METRICS_DIR")
+    if configured:
+        os.makedirs(configured, exist_ok=True)
+        return configured
+    return db.storage_path("metrics")
+
+
+def classify_error(error: Exception) -> str:
+    """yfinance YFRateLimitError / HTTP 429 응답은 '429', 나머지는 'error'"""
+    text = f"{type(error).__name__} {error}"
+    if "RateLimit" in text or "429" in text or "Too Many Requests" in text:
+        return "429"
+    return "error"
+
+
+def classify_value(value) -> str:
+    if value is None:
+        return "empty"
+    if getattr(value, "empty", False) is True:  # DataFrame / Series
+        return "empty"
+    if isinstance(value, (dict, list, tuple)) and not value:
+        return "empty"
+    return "ok"
+
+
+def percentile(values: list, pct: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+class Instrumented:
+    """yf.Ticker 등을 감싸 속성 접근/메서드 호출을 속성명 엔드포인트로 계측"""
+
+    def __init__(self, target, metrics):
+        self._target = target
+        self._metrics = metrics
+
+    def __getattr__(self, name):
+        started = time.perf_counter()
+        try:
+            value = getattr(self._target, name)
+        except Exception as e:
+            self._metrics.observe(name, time.perf_counter() - started, classify_error(e))
+            raise
+
+        if callable(value):
+            def call(*args, **kwargs):
+                return self._metrics.call(name, value, *args, **kwargs)
+            return call
+
+        self._metrics.observe(name, time.perf_counter() - started, classify_value(value))
+        return value
+
+
+class Metrics:
+    """한 번의 스크립트 실행 동안의 관측값"""
+
+    def __init__(self, job: str):
+        self.job = job
+        self.started_at = datetime.now()
+        self.samples = defaultdict(list)  # endpoint -> [(seconds, outcome)]
+
+    def observe(self, endpoint: str, seconds: float, outcome: str) -> None:
+        self.samples[endpoint].append((seconds, outcome))
+
+    @contextmanager
+    def timer(self, endpoint: str):
+        """with metrics.timer("stockstory_page") as span: ... span["outcome"] = "empty" """
+        span = {"outcome": "ok"}
+        started = time.perf_counter()
+        try:
+            yield span
+        except Exception as e:
+            span["outcome"] = classify_error(e)
+            raise
+        finally:
+            self.observe(endpoint, time.perf_counter() - started, span["outcome"])
+
+    def call(self, endpoint: str, fn, *args, **kwargs):
+        with self.timer(endpoint) as span:
+            result = fn(*args, **kwargs)
+            span["outcome"] = classify_value(result)
+            return result
+
+    def instrument(self, target) -> Instrumented:
+        return Instrumented(target, self)
+
+    def summary(self) -> dict:
+        endpoints = {}
+        for endpoint, samples in sorted(self.samples.items()):
+            latencies = [s for s, _ in samples]
+            outcomes = {o: 0 for o in OUTCOMES}
+            for _, outcome in samples:
+                outcomes[outcome] = outcomes.get(outcome, 0) + 1
+            endpoints[endpoint] = {
+                "count": len(samples),
+                "outcomes": outcomes,
+                "p50": round(percentile(latencies, 50), 4),
+                "p95": round(percentile(latencies, 95), 4),
+                "max": round(max(latencies), 4),
+            }
+        total = sum(e["count"] for e in endpoints.values())
+        throttled = sum(e["outcomes"]["429"] for e in endpoints.values())
+        return {
+            "job": self.job,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "duration": round((datetime.now() - self.started_at).total_seconds(), 3),
+            "requests": total,
+            "throttle_rate": round(throttled / total, 4) if total else 0.0,
+            "endpoints": endpoints,
+        }
+
+    def write(self, path: str = None) -> dict:
+        """
+        누적 상태(<job>.state.json)에 이번 실행분을 더해 OpenMetrics 파일을 다시 쓰고 요약을 jsonl에 추가
+        (실행마다 별도 프로세스이므로 카운터를 파일 누적해야 Prometheus rate()가 의미를 가짐)
+        """
+        prom_path = path or os.path.join(metrics_dir(), f"{self.job}.prom")
+        base = os.path.splitext(prom_path)[0]
+        summary = self.summary()
+
+        with open(base + ".lock", "w") as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+
+            try:
+                with open(base + ".state.json", encoding="utf-8") as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                state = {"runs": 0, "requests": {}, "histograms": {}}
+
+            state["runs"] += 1
+            state["last_run"] = time.time()
+            for endpoint, samples in self.samples.items():
+                window = state.setdefault("samples", {}).setdefault(endpoint, [])
+                window.extend([round(seconds, 4), outcome] for seconds, outcome in samples)
+                del window[:-SAMPLE_WINDOW]
+
+                counts = state["requests"].setdefault(endpoint, {})
+                hist = state["histograms"].setdefault(endpoint, {"buckets": [0] * len(BUCKETS), "sum": 0.0, "count": 0})
+                for seconds, outcome in samples:
+                    counts[outcome] = counts.get(outcome, 0) + 1
+                    for i, bound in enumerate(BUCKETS):
+                        if seconds <= bound:
+                            hist["buckets"][i] += 1
+                    hist["sum"] += seconds
+                    hist["count"] += 1
+
+            atomic_write(base + ".state.json", json.dumps(state))
+            atomic_write(prom_path, render_openmetrics(self.job, state))
+
+            try:
+                with open(base + ".jsonl", encoding="utf-8") as f:
+                    lines = [line for line in f if line.strip()]
+            except OSError:
+                lines = []
+            lines.append(json.dumps(summary, ensure_ascii=False) + "\n")
+            atomic_write(base + ".jsonl", "".join(lines[-JSONL_RUNS:]))
+
+        return summary
+
+
+def atomic_write(path: str, text: str) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def render_openmetrics(job: str, state: dict) -> str:
+    lines = [
+        "# TYPE fetcher_runs counter",
+        "# HELP fetcher_runs Completed fetcher runs.",
+        f'fetcher_runs_total{{job="{job}"}} {state["runs"]}',
+        "# TYPE fetcher_last_run_timestamp_seconds gauge",
+        f'fetcher_last_run_timestamp_seconds{{job="{job}"}} {state["last_run"]:.3f}',
+        "# TYPE fetcher_requests counter",
+        "# HELP fetcher_requests Upstream calls by endpoint and outcome.",
+    ]
+    for endpoint, counts in sorted(state["requests"].items()):
+        for outcome in OUTCOMES:
+            lines.append(f'fetcher_requests_total{{job="{job}",endpoint="{endpoint}",outcome="{outcome}"}} {counts.get(outcome, 0)}')
+
+    lines += [
+        "# TYPE fetcher_request_duration_seconds histogram",
+        "# UNIT fetcher_request_duration_seconds seconds",
+        "# HELP fetcher_request_duration_seconds Upstream call latency.",
+    ]
+    for endpoint, hist in sorted(state["histograms"].items()):
+        labels = f'job="{job}",endpoint="{endpoint}"'
+        for bound, count in zip(BUCKETS, hist["buckets"]):
+            lines.append(f'fetcher_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f'fetcher_request_duration_seconds_bucket{{{labels},le="+Inf"}} {hist["count"]}')
+        lines.append(f'fetcher_request_duration_seconds_sum{{{labels}}} {hist["sum"]:.6f}')
+        lines.append(f'fetcher_request_duration_seconds_count{{{labels}}} {hist["count"]}')
+
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def check(job: str, recent: int = 100, baseline: int = 1000, factor: float = 2.0, throttle_limit: float = 0.05) -> dict:
+    """
+    엔드포인트별 최근 recent건의 p95 / 429 비율을 그 직전 baseline건과 비교
+    (실행 단위가 아닌 관측값 단위 롤링 윈도우, 양쪽 모두 MIN_SAMPLES 미만이면 판단 보류)
+    """
+    path = os.path.join(metrics_dir(), f"{job}.state.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = {}
+    windows = state.get("samples", {})
+    if not windows:
+        return {"success": True, "job": job, "runs": state.get("runs", 0), "alerts": []}
+
+    alerts, throttled, total = [], 0, 0
+    for endpoint, window in sorted(windows.items()):
+        latest, previous = window[-recent:], window[-recent - baseline:-recent]
+        throttled += sum(1 for _, outcome in latest if outcome == "429")
+        total += len(latest)
+        if len(latest) < MIN_SAMPLES or len(previous) < MIN_SAMPLES:
+            continue
+
+        p95 = percentile([s for s, _ in latest], 95)
+        reference = percentile([s for s, _ in previous], 95)
+        if reference and p95 > reference * factor:
+            alerts.append({"endpoint": endpoint, "metric": "p95", "value": p95, "baseline": reference})
+
+    throttle_rate = round(throttled / total, 4) if total else 0.0
+    if total >= MIN_SAMPLES and throttle_rate > throttle_limit:
+        alerts.append({"endpoint": None, "metric": "throttle_rate", "value": throttle_rate, "baseline": throttle_limit})
+
+    return {
+        "success": True,
+        "job": job,
+        "runs": state.get("runs", 0),
+        "latest": datetime.fromtimestamp(state["last_run"]).isoformat(timespec="seconds") if state.get("last_run") else None,
+        "alerts": alerts,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetcher run metrics")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    check_parser = sub.add_parser("check")
+    check_parser.add_argument("--job", required=True, help="e.g. fetch_financials, fetch_stockstory")
+    check_parser.add_argument("--recent", type=int, default=100, help="Most recent samples per endpoint to evaluate")
+    check_parser.add_argument("--baseline", type=int, default=1000, help="Preceding samples per endpoint to compare against")
+    check_parser.add_argument("--factor", type=float, default=2.0, help="Alert when recent p95 exceeds baseline p95 by this factor")
+    check_parser.add_argument("--throttle-limit", type=float, default=0.05, help="Alert when 429 share exceeds this")
+
+    args = parser.parse_args()
+
+    try:
+        output = check(args.job, args.recent, args.baseline, args.factor, args.throttle_limit)
+    except Exception as e:
+        output = {"success": False, "error": str(e)}
+
+    print(json.dumps(output, ensure_ascii=False))
+    sys.exit(0 if output["success"] and not output.get("alerts") else 1)
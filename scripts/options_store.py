@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+일별 옵션 체인 스냅샷 저장소 (만기별 기준 체인 + 컬럼형 델타 로그)
+storage/app/private/options/<TICKER>/<EXPIRY>/ 아래
+  contracts.json        계약 심볼 / 구분 / 행사가 (인덱스 순서, 새 계약은 뒤에 추가)
+  base.npy              첫 스냅샷의 [계약, 필드] 값
+  log_*.bin             이후 날짜마다 바뀐 (계약 인덱스, 필드, 값)만 추가
+  offsets.bin, days.bin 날짜별 로그 끝 위치 (days가 커밋 지점)
+
+사용법:
+  python options_store.py chain AAPL [--expiry 2024-01-19] [--date 2024-01-05]
+  python options_store.py series AAPL240119C00150000 [--start 2024-01-01] [--end 2024-01-19]
+  python options_store.py stats AAPL
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+from contextlib import contextmanager
+from datetime import date
+
+import numpy as np
+
+import db
+from price_store import to_day, from_day
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+FIELDS = ("last_price", "bid", "ask", "volume", "open_interest", "implied_volatility")
+INTEGER_FIELDS = ("volume", "open_interest")
+
+LOG_COLUMNS = {
+    "contract": np.dtype("<u4"),
+    "field": np.dtype("u1"),
+    "value": np.dtype("<f8"),
+}
+DAY_DTYPE = np.dtype("<i4")
+OFFSET_DTYPE = np.dtype("<i8")
+
+# OCC 심볼: ROOT + YYMMDD + C/P + 행사가*1000 (8자리)
+OCC_SYMBOL = re.compile(r"^(?P<root>.+?)(?P<expiry>\d{6})(?P<type>[CP])(?P<strike>\d{8})$")
+
+
+def to_value(value) -> float:
+    return np.nan if value is None else float(value)
+
+
+def from_value(value, field: str):
+    if np.isnan(value):
+        return None
+    return int(value) if field in INTEGER_FIELDS else float(value)
+
+
+class ExpiryLog:
+    """만기 1개의 기준 체인 + 델타 로그"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _read(self, name: str, dtype, length: int = None):
+        path = self._file(name)
+        size = os.path.getsize(path) // dtype.itemsize if os.path.exists(path) else 0
+        length = size if length is None else min(length, size)
+        if length == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=(length,))
+
+    def contracts(self) -> dict:
+        try:
+            with open(self._file("contracts.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except OSError:
+            return {"symbols": [], "types": [], "strikes": []}
+
+    def days(self):
+        """커밋된 (날짜, 로그 끝 위치)"""
+        days = self._read("days.bin", DAY_DTYPE)
+        offsets = self._read("offsets.bin", OFFSET_DTYPE, len(days))
+        return days[:len(offsets)], offsets
+
+    def base(self):
+        path = self._file("base.npy")
+        return np.load(path, mmap_mode="r") if os.path.exists(path) else np.empty((0, len(FIELDS)))
+
+    def log(self, end: int) -> dict:
+        return {name: self._read(f"log_{name}.bin", dtype, end) for name, dtype in LOG_COLUMNS.items()}
+
+    def state(self, end: int, width: int):
+        """기준 체인에 로그 [0, end)를 적용한 [계약, 필드] 값"""
+        values = np.full((width, len(FIELDS)), np.nan)
+        base = self.base()
+        values[:len(base)] = base
+
+        log = self.log(end)
+        if len(log["value"]):
+            # 같은 (계약, 필드)는 마지막 기록이 유효
+            keys = log["contract"].astype("int64") * len(FIELDS) + log["field"]
+            _, last = np.unique(keys[::-1], return_index=True)
+            last = len(keys) - 1 - last
+            values[log["contract"][last], log["field"][last]] = log["value"][last]
+        return values
+
+    def at(self, day: int):
+        """day 이전 가장 최근 스냅샷의 (날짜, 값), 없으면 (None, None)"""
+        days, offsets = self.days()
+        pos = int(np.searchsorted(days, day, side="right")) - 1
+        if pos < 0:
+            return None, None
+        return int(days[pos]), self.state(int(offsets[pos]), len(self.contracts()["symbols"]))
+
+    def series(self, index: int, start: int = None, end: int = None) -> dict:
+        """계약 1개의 스냅샷 날짜별 필드 값 (변경 없는 날은 직전 값 유지)"""
+        days, offsets = self.days()
+        if not len(days):
+            return {"date": days}
+
+        base = self.base()
+        current = np.array(base[index], dtype="f8") if index < len(base) else np.full(len(FIELDS), np.nan)
+        columns = np.full((len(days), len(FIELDS)), np.nan)
+
+        log = self.log(int(offsets[-1]))
+        positions = np.flatnonzero(log["contract"] == index)
+        day_of = np.searchsorted(offsets, positions, side="right")
+        fields = log["field"][positions]
+        values = log["value"][positions]
+
+        cursor = 0
+        for i in range(len(days)):
+            while cursor < len(positions) and day_of[cursor] == i:
+                current[fields[cursor]] = values[cursor]
+                cursor += 1
+            columns[i] = current
+
+        lo = int(np.searchsorted(days, start, side="left")) if start is not None else 0
+        hi = int(np.searchsorted(days, end, side="right")) if end is not None else len(days)
+        return {"date": np.asarray(days[lo:hi]), **{f: columns[lo:hi, j] for j, f in enumerate(FIELDS)}}
+
+    def append(self, day: int, rows: list) -> dict:
+        """
+        rows: [{"contract_symbol", "option_type", "strike", FIELDS...}]
+        첫 스냅샷은 기준 체인으로, 이후는 직전 스냅샷 대비 바뀐 값만 기록
+        같은 날짜 재실행은 그날 델타를 버리고 다시 기록, 과거 날짜는 무시
+        """
+        os.makedirs(self.path, exist_ok=True)
+        contracts = self.contracts()
+        days, offsets = (np.array(a) for a in self.days())
+        committed = int(offsets[-1]) if len(offsets) else 0
+
+        if len(days) and day < days[-1]:
+            return {"skipped": "older than last snapshot"}
+        if len(days) and day == days[-1]:
+            # 그날 스냅샷을 먼저 커밋 해제한 뒤 다시 기록
+            days, offsets = days[:-1], offsets[:-1]
+            self._write("days.bin", len(days) * DAY_DTYPE.itemsize, days[:0])
+            committed = int(offsets[-1]) if len(offsets) else 0
+
+        index = {symbol: i for i, symbol in enumerate(contracts["symbols"])}
+        for row in rows:
+            if row["contract_symbol"] not in index:
+                index[row["contract_symbol"]] = len(contracts["symbols"])
+                contracts["symbols"].append(row["contract_symbol"])
+                contracts["types"].append(row["option_type"])
+                contracts["strikes"].append(row["strike"])
+
+        current = np.full((len(contracts["symbols"]), len(FIELDS)), np.nan)
+        for row in rows:
+            current[index[row["contract_symbol"]]] = [to_value(row.get(f)) for f in FIELDS]
+
+        tmp = self._file("contracts.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(contracts, f)
+        os.replace(tmp, self._file("contracts.json"))
+
+        if not len(days):
+            np.save(self._file("base.npy"), current)
+            changed = np.empty(0, dtype="int64"), np.empty(0, dtype="int64")
+        else:
+            previous = self.state(committed, len(current))
+            same = (previous == current) | (np.isnan(previous) & np.isnan(current))
+            changed = np.nonzero(~same)
+
+        entries = {
+            "contract": changed[0].astype(LOG_COLUMNS["contract"]),
+            "field": changed[1].astype(LOG_COLUMNS["field"]),
+            "value": current[changed].astype(LOG_COLUMNS["value"]),
+        }
+        # 로그 → offsets → days 순으로 기록 (커밋되지 않은 꼬리는 잘라냄)
+        for name, dtype in LOG_COLUMNS.items():
+            self._write(f"log_{name}.bin", committed * dtype.itemsize, entries[name])
+        self._write("offsets.bin", len(offsets) * OFFSET_DTYPE.itemsize,
+                    np.array([committed + len(entries["value"])], dtype=OFFSET_DTYPE))
+        self._write("days.bin", len(days) * DAY_DTYPE.itemsize, np.array([day], dtype=DAY_DTYPE))
+
+        return {
+            "base": not len(days),
+            "contracts": len(rows),
+            "changed": len(entries["value"]),
+        }
+
+    def _write(self, name: str, position: int, array) -> None:
+        path = self._file(name)
+        with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+            f.seek(position)
+            f.truncate()
+            f.write(array.tobytes())
+
+    def size(self) -> int:
+        return sum(os.path.getsize(os.path.join(self.path, name)) for name in os.listdir(self.path))
+
+
+class OptionsStore:
+    def __init__(self, root: str = None):
+        self.root = root or db.storage_path("options")
+
+    def _dir(self, ticker: str) -> str:
+        return os.path.join(self.root, ticker.upper())
+
+    def _expiry(self, ticker: str, expiry: str) -> ExpiryLog:
+        return ExpiryLog(os.path.join(self._dir(ticker), expiry))
+
+    @contextmanager
+    def _lock(self, ticker: str):
+        os.makedirs(self._dir(ticker), exist_ok=True)
+        with open(os.path.join(self._dir(ticker), ".lock"), "w") as handle:
+            if fcntl:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def expiries(self, ticker: str) -> list:
+        path = self._dir(ticker)
+        if not os.path.isdir(path):
+            return []
+        return sorted(d for d in os.listdir(path) if os.path.isdir(os.path.join(path, d)))
+
+    def append(self, ticker: str, options: dict, snapshot_date=None) -> dict:
+        """fetch_options_data() 결과 1회분을 snapshot_date(기본 오늘) 스냅샷으로 저장"""
+        day = to_day(snapshot_date or date.today().isoformat())
+        result = {}
+        with self._lock(ticker):
+            for chain in (options or {}).get("chains", []):
+                rows = [
+                    {**contract, "option_type": option_type}
+                    for option_type, contracts in (("call", chain.get("calls", [])), ("put", chain.get("puts", [])))
+                    for contract in contracts
+                    if contract.get("contract_symbol")
+                ]
+                if rows:
+                    result[chain["expiration_date"]] = self._expiry(ticker, chain["expiration_date"]).append(day, rows)
+        return {"date": from_day(day), "expiries": result}
+
+    def chain(self, ticker: str, expiry: str, snapshot_date=None):
+        """snapshot_date(기본 최신) 시점 체인 복원 — fetch_options_data()의 chains 항목과 같은 형식"""
+        log = self._expiry(ticker, expiry)
+        day, values = log.at(to_day(snapshot_date) if snapshot_date else np.iinfo(DAY_DTYPE).max)
+        if day is None:
+            return None
+
+        contracts = log.contracts()
+        chain = {"expiration_date": expiry, "snapshot_date": from_day(day), "calls": [], "puts": []}
+        for i, symbol in enumerate(contracts["symbols"]):
+            if np.isnan(values[i]).all():  # 이 날짜에 상장되지 않았거나 빠진 계약
+                continue
+            chain["calls" if contracts["types"][i] == "call" else "puts"].append({
+                "contract_symbol": symbol,
+                "strike": contracts["strikes"][i],
+                **{f: from_value(values[i, j], f) for j, f in enumerate(FIELDS)},
+            })
+        return chain
+
+    def snapshot(self, ticker: str, snapshot_date=None) -> list:
+        """snapshot_date 시점 아직 만기 전인 모든 만기 체인"""
+        expiries = [e for e in self.expiries(ticker) if not snapshot_date or e >= str(snapshot_date)[:10]]
+        chains = [self.chain(ticker, expiry, snapshot_date) for expiry in expiries]
+        return [c for c in chains if c]
+
+    def series(self, contract_symbol: str, start=None, end=None, ticker: str = None) -> dict:
+        """계약 1개의 일별 가격 / 거래량 / 미결제약정 / IV 시계열"""
+        match = OCC_SYMBOL.match(contract_symbol)
+        ticker = (ticker or (match.group("root") if match else "")).upper()
+        if match:
+            e = match.group("expiry")
+            candidates = [f"20{e[:2]}-{e[2:4]}-{e[4:]}"]
+        else:
+            candidates = self.expiries(ticker)
+
+        for expiry in candidates:
+            log = self._expiry(ticker, expiry)
+            symbols = log.contracts()["symbols"]
+            if contract_symbol in symbols:
+                return log.series(
+                    symbols.index(contract_symbol),
+                    to_day(start) if start else None,
+                    to_day(end) if end else None,
+                )
+        return {"date": np.empty(0, dtype=DAY_DTYPE)}
+
+    def stats(self, ticker: str) -> dict:
+        """디스크 사용량과 같은 스냅샷을 전체 체인으로 저장했을 때의 값 개수 비교"""
+        expiries = {}
+        for expiry in self.expiries(ticker):
+            log = self._expiry(ticker, expiry)
+            days, offsets = log.days()
+            width = len(log.contracts()["symbols"])
+            full_values = sum(
+                int((~np.isnan(log.state(int(end), width))).any(axis=1).sum()) * len(FIELDS) for end in offsets
+            )
+            stored_values = int(log.base().size) + (int(offsets[-1]) if len(offsets) else 0)
+            expiries[expiry] = {
+                "days": len(days),
+                "contracts": width,
+                "bytes": log.size(),
+                "stored_values": stored_values,
+                "full_values": full_values,
+                "ratio": round(stored_values / full_values, 4) if full_values else None,
+            }
+        return expiries
+
+
+def series_rows(series: dict) -> list:
+    return [
+        {"date": from_day(series["date"][i]), **{f: from_value(series[f][i], f) for f in FIELDS}}
+        for i in range(len(series["date"]))
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delta-compressed daily options chain snapshots")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    chain_parser = sub.add_parser("chain")
+    chain_parser.add_argument("ticker")
+    chain_parser.add_argument("--expiry", help="Expiration date (default: every stored expiry)")
+    chain_parser.add_argument("--date", help="Snapshot date to reconstruct (default: latest)")
+
+    series_parser = sub.add_parser("series")
+    series_parser.add_argument("contract_symbol")
+    series_parser.add_argument("--ticker", help="Needed only for non-OCC contract symbols")
+    series_parser.add_argument("--start")
+    series_parser.add_argument("--end")
+
+    stats_parser = sub.add_parser("stats")
+    stats_parser.add_argument("ticker")
+
+    args = parser.parse_args()
+
+    try:
+        store = OptionsStore()
+        if args.command == "chain":
+            ticker = args.ticker.upper()
+            chains = [store.chain(ticker, args.expiry, args.date)] if args.expiry else store.snapshot(ticker, args.date)
+            output = {"success": True, "ticker": ticker, "chains": [c for c in chains if c]}
+        elif args.command == "series":
+            series = store.series(args.contract_symbol, args.start, args.end, args.ticker)
+            output = {"success": True, "contract_symbol": args.contract_symbol, "series": series_rows(series)}
+        else:
+            ticker = args.ticker.upper()
+            output = {"success": True, "ticker": ticker, "expiries": store.stats(ticker)}
+    except Exception as e:
+        output = {"success": False, "error": str(e)}
+
+    print(json.dumps(output, ensure_ascii=False))
+    sys.exit(0 if output["success"] else 1)
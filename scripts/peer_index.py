@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+펀더멘털 벡터 기반 유사 종목(kNN) 인덱스
+펀더멘털 스냅샷(fundamentals_snapshot.py)의 마진/성장/레버리지/규모/밸류에이션 지표로 정규화 벡터를 만들고
+전 종목의 top-k 이웃 테이블을 미리 계산하여 storage/app/private/peers/에 저장
+펀더멘털이 바뀐 종목만 벡터를 다시 만들고 영향받는 이웃 목록만 갱신
+유사 종목 PER 적정가치용으로 밸류에이션 지표를 뺀 이웃 목록(fundamental_peers.json)도 함께 저장
+
+사용법:
+  python peer_index.py build [--full] [--k 10]
+  python peer_index.py query AAPL [--k 10] [--same-sector]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+import db
+from fundamentals_snapshot import FundamentalsSnapshot
+
+# 지표 그룹: 그룹별 가중치를 1/sqrt(그룹 크기)로 두어 그룹마다 비슷한 영향력을 갖도록 함
+FEATURE_GROUPS = {
+    "margins": ["gross_margin", "operating_margin", "profit_margin", "roe", "roa"],
+    "growth": ["revenue_growth", "earnings_growth"],
+    "leverage": ["debt_to_equity", "current_ratio"],
+    "size": ["market_cap"],
+    "valuation": ["pe_ratio", "forward_pe", "pb_ratio", "ps_ratio", "ev_ebitda", "ev_revenue"],
+}
+# 분포 꼬리가 긴 지표는 부호 유지 로그 변환
+LOG_FEATURES = {"market_cap", "debt_to_equity", "pe_ratio", "forward_pe", "pb_ratio", "ps_ratio", "ev_ebitda", "ev_revenue"}
+FEATURES = [f for group in FEATURE_GROUPS.values() for f in group]
+WEIGHTS = np.array([1 / np.sqrt(len(g)) for g in FEATURE_GROUPS.values() for _ in g], dtype="float32")
+# 이웃의 PER 중앙값으로 적정가치를 내는 경우 PER이 비슷한 종목을 고르면 순환 논리가 되므로 제외하는 그룹
+PEER_VALUATION_EXCLUDED = ("valuation",)
+FUNDAMENTAL_MASK = np.array(
+    [name not in PEER_VALUATION_EXCLUDED for name, g in FEATURE_GROUPS.items() for _ in g], dtype="float32"
+)
+
+DEFAULT_K = 10
+CLIP = 3.0
+BLOCK = 1024
+# 변경 종목 비율이 이 이상이면 정규화 통계부터 전체 재계산
+REBUILD_RATIO = 0.2
+
+
+def index_dir() -> str:
+    return db.storage_path("peers")
+
+
+def raw_features(snapshot: FundamentalsSnapshot) -> np.ndarray:
+    columns = []
+    for name in FEATURES:
+        values = np.asarray(snapshot.column(name), dtype="float64")
+        if name in LOG_FEATURES:
+            values = np.sign(values) * np.log1p(np.abs(values))
+        columns.append(values)
+    return np.column_stack(columns)
+
+
+def fit_scaler(raw: np.ndarray) -> dict:
+    """중앙값 / IQR 기반 robust 스케일링 통계"""
+    median = np.nanmedian(raw, axis=0)
+    q75, q25 = np.nanpercentile(raw, [75, 25], axis=0)
+    scale = np.where((q75 - q25) > 0, (q75 - q25) / 1.349, 1.0)
+    return {"median": np.nan_to_num(median), "scale": np.nan_to_num(scale, nan=1.0)}
+
+
+def transform(raw: np.ndarray, scaler: dict) -> np.ndarray:
+    """robust z-score → ±3 clip → 결측은 0(중앙값) → 그룹 가중치"""
+    z = (raw - scaler["median"]) / scaler["scale"]
+    z = np.clip(np.nan_to_num(z, nan=0.0), -CLIP, CLIP)
+    return (z * WEIGHTS).astype("float32")
+
+
+def squared_distances(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    d = (a * a).sum(1)[:, None] + (b * b).sum(1)[None, :] - 2 * a @ b.T
+    return np.maximum(d, 0)
+
+
+def knn(vectors: np.ndarray, rows: np.ndarray, k: int):
+    """rows의 이웃 top-k (자기 자신 제외), 블록 단위 행렬곱 — 다른 종목이 없으면 (len(rows), 0) 빈 테이블"""
+    k = max(min(k, len(vectors) - 1), 0)
+    neighbors = np.empty((len(rows), k), dtype="int32")
+    distances = np.empty((len(rows), k), dtype="float32")
+    if k == 0:
+        return neighbors, distances
+    for start in range(0, len(rows), BLOCK):
+        block = rows[start:start + BLOCK]
+        d = squared_distances(vectors[block], vectors)
+        d[np.arange(len(block)), block] = np.inf
+        part = np.argpartition(d, k - 1, axis=1)[:, :k]
+        pd_ = np.take_along_axis(d, part, axis=1)
+        order = np.argsort(pd_, axis=1)
+        neighbors[start:start + len(block)] = np.take_along_axis(part, order, axis=1)
+        distances[start:start + len(block)] = np.sqrt(np.take_along_axis(pd_, order, axis=1))
+    return neighbors, distances
+
+
+class PeerIndex:
+    def __init__(self, path: str = None):
+        self.path = path or index_dir()
+        with open(os.path.join(self.path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.tickers = self.meta["tickers"]
+        self.position = {t: i for i, t in enumerate(self.tickers)}
+        self.sector_codes = np.array(self.meta["sector_codes"], dtype=object)
+        self.vectors = np.load(os.path.join(self.path, "vectors.npy"), mmap_mode="r")
+        self.neighbors = np.load(os.path.join(self.path, "neighbors.npy"), mmap_mode="r")
+        self.distances = np.load(os.path.join(self.path, "distances.npy"), mmap_mode="r")
+
+    @classmethod
+    def open_or_none(cls):
+        if not os.path.exists(os.path.join(index_dir(), "meta.json")):
+            return None
+        return cls()
+
+    def similar(self, ticker: str, k: int = DEFAULT_K, same_sector: bool = False) -> list:
+        """사전 계산된 이웃 테이블 조회 (k가 테이블보다 크거나 섹터 제한 시 mat-vec 1회로 계산)"""
+        i = self.position.get(ticker.upper())
+        if i is None:
+            raise KeyError(f"{ticker} is not in the peer index")
+
+        if k <= self.neighbors.shape[1] and not same_sector:
+            idx, dist = self.neighbors[i, :k], self.distances[i, :k]
+        else:
+            d = squared_distances(np.asarray(self.vectors[i:i + 1]), np.asarray(self.vectors))[0]
+            d[i] = np.inf
+            if same_sector:
+                d[self.sector_codes != self.sector_codes[i]] = np.inf
+            idx = np.argsort(d)[:k]
+            idx = idx[np.isfinite(d[idx])]
+            dist = np.sqrt(d[idx])
+
+        return [
+            {"ticker": self.tickers[j], "sector": self.sector_codes[j], "distance": round(float(dd), 4)}
+            for j, dd in zip(idx, dist)
+        ]
+
+
+def peer_lists(tickers: list, neighbors, distances) -> dict:
+    return {
+        ticker: [{"ticker": tickers[j], "distance": round(float(d), 4)} for j, d in zip(neighbors[i], distances[i])]
+        for i, ticker in enumerate(tickers)
+    }
+
+
+def write_index(path: str, vectors, neighbors, distances, meta: dict) -> None:
+    """
+    임시 디렉터리에 쓰고 원자적으로 교체 (fundamentals_snapshot과 동일)
+    fundamental_peers.json은 밸류에이션 지표를 뺀 벡터로 매번 전체 계산 (행렬곱 몇 번이면 충분)
+    """
+    tmp, old = path + ".tmp", path + ".old"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    np.save(os.path.join(tmp, "vectors.npy"), vectors)
+    np.save(os.path.join(tmp, "neighbors.npy"), neighbors)
+    np.save(os.path.join(tmp, "distances.npy"), distances)
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+    # PHP에서 읽는 이웃 목록 (ValuationService의 유사 종목 PER은 fundamental_peers.json)
+    with open(os.path.join(tmp, "peers.json"), "w", encoding="utf-8") as f:
+        json.dump(peer_lists(meta["tickers"], neighbors, distances), f, ensure_ascii=False)
+
+    fundamental = np.asarray(vectors) * FUNDAMENTAL_MASK
+    with open(os.path.join(tmp, "fundamental_peers.json"), "w", encoding="utf-8") as f:
+        json.dump(peer_lists(meta["tickers"], *knn(fundamental, np.arange(len(fundamental)), neighbors.shape[1])), f, ensure_ascii=False)
+
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(path):
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def build(full=False, k=DEFAULT_K) -> dict:
+    started = time.perf_counter()
+    snapshot = FundamentalsSnapshot.open_or_none()
+    if snapshot is None:
+        raise RuntimeError("Fundamentals snapshot not built (run fundamentals_snapshot.py build)")
+
+    tickers = list(snapshot.tickers)
+    updated_at = dict(zip(tickers, snapshot.meta["updated_at"]))
+    raw = raw_features(snapshot)
+    previous = None if full else PeerIndex.open_or_none()
+
+    changed = tickers
+    if previous is not None:
+        changed = [t for t in tickers if previous.meta["updated_at"].get(t) != updated_at[t]]
+        removed = set(previous.tickers) - set(tickers)
+        # 종목 수가 k 이하일 때 만든 테이블은 폭이 좁으므로 종목이 늘면 전체 재빌드
+        narrow = previous.neighbors.shape[1] != min(k, len(tickers) - 1)
+        if removed or narrow or previous.meta["k"] != k or len(changed) > REBUILD_RATIO * len(tickers):
+            previous = None
+
+    if previous is None:
+        # 전체 빌드: 정규화 통계 재계산 + 전 종목 이웃 계산
+        scaler = fit_scaler(raw)
+        vectors = transform(raw, scaler)
+        neighbors, distances = knn(vectors, np.arange(len(tickers)), k)
+        mode, changed = "full", tickers
+    else:
+        # 증분: 기존 정규화 통계로 변경/신규 종목 벡터만 다시 계산
+        scaler = {key: np.array(v) for key, v in previous.meta["scaler"].items()}
+        old_pos = previous.position
+        vectors = np.empty((len(tickers), len(FEATURES)), dtype="float32")
+        neighbors = np.zeros((len(tickers), previous.neighbors.shape[1]), dtype="int32")
+        distances = np.zeros(neighbors.shape, dtype="float32")
+        keep = np.array([t in old_pos for t in tickers])
+        remap = np.full(len(previous.tickers), -1, dtype="int32")
+        for i, t in enumerate(tickers):
+            if t in old_pos:
+                remap[old_pos[t]] = i
+                vectors[i] = previous.vectors[old_pos[t]]
+                neighbors[i] = previous.neighbors[old_pos[t]]
+                distances[i] = previous.distances[old_pos[t]]
+        neighbors[keep] = remap[neighbors[keep]]
+
+        changed_set = set(changed)
+        changed_idx = np.array([i for i, t in enumerate(tickers) if t in changed_set], dtype="int32")
+        if len(changed_idx):
+            vectors[changed_idx] = transform(raw[changed_idx], scaler)
+
+            # 변경 종목을 이웃으로 갖던 종목은 목록 전체 재계산, 그 외는 변경 종목과의 거리만 병합
+            is_changed = np.zeros(len(tickers), dtype=bool)
+            is_changed[changed_idx] = True
+            stale = is_changed | ~keep | is_changed[neighbors].any(axis=1)
+            stale_idx = np.flatnonzero(stale)
+            if len(stale_idx):
+                neighbors[stale_idx], distances[stale_idx] = knn(vectors, stale_idx, neighbors.shape[1])
+
+            rest = np.flatnonzero(~stale)
+            if len(rest):
+                d = np.sqrt(squared_distances(vectors[rest], vectors[changed_idx]))
+                cand_idx = np.hstack([neighbors[rest], np.broadcast_to(changed_idx, (len(rest), len(changed_idx)))])
+                cand_d = np.hstack([distances[rest], d])
+                order = np.argsort(cand_d, axis=1, kind="stable")[:, :neighbors.shape[1]]
+                neighbors[rest] = np.take_along_axis(cand_idx, order, axis=1)
+                distances[rest] = np.take_along_axis(cand_d, order, axis=1)
+        mode = "incremental"
+
+    meta = {
+        "built_at": datetime.now().isoformat(),
+        "k": k,
+        "features": FEATURES,
+        "scaler": {key: v.tolist() for key, v in scaler.items()},
+        "tickers": tickers,
+        "sector_codes": list(snapshot.sector_codes),
+        "updated_at": updated_at,
+    }
+    write_index(index_dir(), vectors, neighbors, distances, meta)
+
+    return {
+        "success": True,
+        "mode": mode,
+        "rows": len(tickers),
+        "changed": len(changed),
+        "elapsed": round(time.perf_counter() - started, 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fundamentals-vector nearest-neighbor peer index")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = sub.add_parser("build")
+    build_parser.add_argument("--full", action="store_true", help="Refit normalization and rebuild every neighbor list")
+    build_parser.add_argument("--k", type=int, default=DEFAULT_K, help="Neighbors stored per ticker")
+
+    query_parser = sub.add_parser("query")
+    query_parser.add_argument("ticker")
+    query_parser.add_argument("--k", type=int, default=DEFAULT_K)
+    query_parser.add_argument("--same-sector", action="store_true", help="Only return peers from the same sector")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "build":
+            output = build(args.full, args.k)
+        else:
+            index = PeerIndex()
+            started = time.perf_counter()
+            peers = index.similar(args.ticker, args.k, args.same_sector)
+            output = {
+                "success": True,
+                "ticker": args.ticker.upper(),
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+                "peers": peers,
+            }
+    except Exception as e:
+        output = {"success": False, "error": str(e)}
+
+    print(json.dumps(output, ensure_ascii=False))
+    sys.exit(0 if output["success"] else 1)
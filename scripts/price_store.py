@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+종목별 컬럼형 OHLCV 저장소 (append-only, memory-mapped)
+storage/app/private/prices/<interval>/<TICKER>/ 아래 컬럼마다 고정폭 바이너리 파일 1개
+
+사용법:
+  python price_store.py read AAPL [--start 2024-01-01] [--end 2024-12-31] [--interval 1mo]
+  python price_store.py import-db [--interval 1mo]  # stock_prices 테이블에서 백필 (기본: 히스토리 주기)
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+from contextlib import contextmanager
+
+import numpy as np
+
+import db
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# dates는 1970-01-01 기준 일수 (int32), 나머지는 float64
+COLUMNS = {
+    "date": np.dtype("<i4"),
+    "open": np.dtype("<f8"),
+    "high": np.dtype("<f8"),
+    "low": np.dtype("<f8"),
+    "close": np.dtype("<f8"),
+    "volume": np.dtype("<f8"),
+}
+VALUE_COLUMNS = [c for c in COLUMNS if c != "date"]
+
+# 주기별 대표 봉 간격(일), import-db 주기 검증용 (일봉은 주말 때문에 중앙값이 1~3일)
+INTERVAL_DAYS = {"1d": 1.5, "5d": 5, "1wk": 7, "1mo": 30, "3mo": 91}
+
+
+def to_day(value) -> int:
+    return int(np.datetime64(str(value)[:10], "D").astype("int64"))
+
+
+def from_day(day: int) -> str:
+    return str(np.datetime64(int(day), "D"))
+
+
+class PriceStore:
+    def __init__(self, interval: str = "1d", root: str = None):
+        self.interval = interval
+        self.root = root or os.path.join(db.storage_path("prices"), interval)
+
+    def _dir(self, ticker: str) -> str:
+        return os.path.join(self.root, ticker.upper())
+
+    def _file(self, ticker: str, column: str) -> str:
+        return os.path.join(self._dir(ticker), f"{column}.bin")
+
+    @contextmanager
+    def _lock(self, ticker: str):
+        """종목 디렉터리 밖의 <root>/<TICKER>.lock (merge가 디렉터리를 교체해도 같은 잠금 파일 유지)"""
+        os.makedirs(self._dir(ticker), exist_ok=True)
+        with open(os.path.join(self.root, f"{ticker.upper()}.lock"), "w") as handle:
+            if fcntl:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def length(self, ticker: str) -> int:
+        """커밋된 행 수: dates 파일이 마지막에 기록되므로 모든 컬럼의 최소 길이"""
+        lengths = []
+        for column, dtype in COLUMNS.items():
+            path = self._file(ticker, column)
+            lengths.append(os.path.getsize(path) // dtype.itemsize if os.path.exists(path) else 0)
+        return min(lengths)
+
+    def _map(self, ticker: str, column: str, length: int, mode: str = "r"):
+        if length == 0:
+            return np.empty(0, dtype=COLUMNS[column])
+        return np.memmap(self._file(ticker, column), dtype=COLUMNS[column], mode=mode, shape=(length,))
+
+    def append(self, ticker: str, bars: list) -> dict:
+        """
+        bars: [{"date", "open", "high", "low", "close", "volume"}]
+        마지막 저장일 이후 봉만 추가하고, 마지막 저장일과 같은 날짜의 봉(진행 중인 봉)은 제자리 갱신
+        """
+        rows = sorted((b for b in bars if b.get("date")), key=lambda b: b["date"])
+        if not rows:
+            return {"appended": 0, "updated": 0}
+
+        with self._lock(ticker):
+            length = self.length(ticker)
+            last_day = int(self._map(ticker, "date", length)[-1]) if length else None
+            updated = 0
+
+            if last_day is not None:
+                same = [b for b in rows if to_day(b["date"]) == last_day]
+                if same:
+                    for column in VALUE_COLUMNS:
+                        mapped = self._map(ticker, column, length, mode="r+")
+                        mapped[-1] = same[-1].get(column) if same[-1].get(column) is not None else np.nan
+                        mapped.flush()
+                    updated = 1
+                rows = [b for b in rows if to_day(b["date"]) > last_day]
+
+            if rows:
+                arrays = {
+                    column: np.array(
+                        [b.get(column) if b.get(column) is not None else np.nan for b in rows],
+                        dtype=COLUMNS[column],
+                    )
+                    for column in VALUE_COLUMNS
+                }
+                arrays["date"] = np.array([to_day(b["date"]) for b in rows], dtype=COLUMNS["date"])
+
+                # 값 컬럼 → dates 순으로 기록 (dates가 커밋 지점)
+                for column in VALUE_COLUMNS + ["date"]:
+                    path = self._file(ticker, column)
+                    with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+                        f.seek(length * COLUMNS[column].itemsize)
+                        f.truncate()
+                        f.write(arrays[column].tobytes())
+
+        return {"appended": len(rows), "updated": updated}
+
+    def merge(self, ticker: str, bars: list) -> dict:
+        """
+        append와 달리 첫 저장일 이전 봉도 받아들이는 백필용 병합 (같은 날짜는 새 봉 우선)
+        앞쪽에 끼워 넣어야 하면 새 디렉터리에 전체를 다시 쓰고 디렉터리 교체
+        """
+        rows = sorted((b for b in bars if b.get("date")), key=lambda b: b["date"])
+        length = self.length(ticker)
+        if not rows or length == 0 or to_day(rows[0]["date"]) >= int(self._map(ticker, "date", length)[0]):
+            return self.append(ticker, rows)
+
+        with self._lock(ticker):
+            existing = self.read(ticker)
+            merged = {
+                int(day): {"date": from_day(day), **{c: float(existing[c][i]) for c in VALUE_COLUMNS}}
+                for i, day in enumerate(existing["date"])
+            }
+            before = len(merged)
+            merged.update({to_day(b["date"]): b for b in rows})
+            ordered = [merged[day] for day in sorted(merged)]
+
+            staging = PriceStore(self.interval, root=os.path.join(self.root, ".staging"))
+            shutil.rmtree(staging._dir(ticker), ignore_errors=True)
+            staging.append(ticker, ordered)
+
+            retired = os.path.join(self.root, ".staging", f"{ticker.upper()}.old")
+            shutil.rmtree(retired, ignore_errors=True)
+            os.replace(self._dir(ticker), retired)
+            os.replace(staging._dir(ticker), self._dir(ticker))
+            shutil.rmtree(retired, ignore_errors=True)
+
+        return {"appended": len(ordered) - before, "updated": 0}
+
+    def read(self, ticker: str, start=None, end=None) -> dict:
+        """날짜 구간 [start, end]의 zero-copy memmap 슬라이스"""
+        length = self.length(ticker)
+        dates = self._map(ticker, "date", length)
+        lo = int(np.searchsorted(dates, to_day(start), side="left")) if start else 0
+        hi = int(np.searchsorted(dates, to_day(end), side="right")) if end else length
+        return {column: self._map(ticker, column, length)[lo:hi] for column in COLUMNS}
+
+    def read_many(self, tickers: list, start=None, end=None) -> dict:
+        return {ticker.upper(): self.read(ticker, start, end) for ticker in tickers}
+
+    def panel(self, tickers: list, column: str = "close", start=None, end=None):
+        """여러 종목을 날짜 합집합 기준으로 정렬한 (dates, matrix[date, ticker]) — 결측은 NaN"""
+        slices = self.read_many(tickers, start, end)
+        all_days = np.unique(np.concatenate([s["date"] for s in slices.values()] or [np.empty(0, "<i4")]))
+        matrix = np.full((len(all_days), len(tickers)), np.nan)
+        for j, ticker in enumerate(tickers):
+            s = slices[ticker.upper()]
+            matrix[np.searchsorted(all_days, s["date"]), j] = s[column]
+        return all_days, matrix
+
+    def tickers(self) -> list:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            d for d in os.listdir(self.root)
+            if not d.startswith(".") and os.path.isdir(os.path.join(self.root, d))
+        )
+
+
+def median_gap_days(by_ticker: dict):
+    """종목별 봉 간격(일) 중앙값의 중앙값"""
+    gaps = [
+        float(np.median(np.diff([to_day(b["date"]) for b in bars])))
+        for bars in by_ticker.values() if len(bars) > 1
+    ]
+    return float(np.median(gaps)) if gaps else None
+
+
+def import_from_database(interval: str = None) -> dict:
+    """
+    stock_prices 테이블 전체를 종목별로 저장소에 추가
+    stock_prices는 fetch_financials.py의 히스토리 주기(HISTORY_INTERVAL) 봉이므로 기본값도 같고,
+    실제 봉 간격이 지정한 interval과 다르면 다른 주기 저장소가 섞이지 않도록 중단
+    """
+    from fetch_financials import HISTORY_INTERVAL
+
+    interval = interval or HISTORY_INTERVAL
+    database = db.connect()
+    try:
+        rows = database.fetch_all(
+            "SELECT s.ticker, p.date, p.open, p.high, p.low, p.close, p.volume "
+            "FROM stock_prices p JOIN stocks s ON s.id = p.stock_id ORDER BY s.ticker, p.date"
+        )
+    finally:
+        database.close()
+
+    by_ticker = {}
+    for row in rows:
+        by_ticker.setdefault(row["ticker"], []).append({k: (float(v) if k not in ("ticker", "date") and v is not None else v) for k, v in row.items()})
+
+    gap = median_gap_days(by_ticker)
+    expected = INTERVAL_DAYS.get(interval)
+    if gap is not None and expected is not None and not expected / 2 <= gap <= expected * 2:
+        raise ValueError(f"stock_prices bars are ~{gap:g} days apart, which does not match interval {interval}")
+
+    store = PriceStore(interval)
+    appended = sum(store.append(ticker, bars)["appended"] for ticker, bars in by_ticker.items())
+    return {"success": True, "interval": interval, "tickers": len(by_ticker), "appended": appended}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory-mapped columnar OHLCV store")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    read_parser = sub.add_parser("read")
+    read_parser.add_argument("tickers", help="Comma separated tickers")
+    read_parser.add_argument("--start")
+    read_parser.add_argument("--end")
+    read_parser.add_argument("--interval", default="1d")
+
+    import_parser = sub.add_parser("import-db")
+    import_parser.add_argument("--interval", help="Store interval (default: fetch_financials.py history interval)")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "import-db":
+            output = import_from_database(args.interval)
+        else:
+            store = PriceStore(args.interval)
+            slices = store.read_many(args.tickers.split(","), args.start, args.end)
+            output = {
+                "success": True,
+                "prices": {
+                    ticker: [
+                        {"date": from_day(s["date"][i]), **{c: (None if np.isnan(s[c][i]) else float(s[c][i])) for c in VALUE_COLUMNS}}
+                        for i in range(len(s["date"]))
+                    ]
+                    for ticker, s in slices.items()
+                },
+            }
+    except Exception as e:
+        output = {"success": False, "error": str(e)}
+
+    print(json.dumps(output, ensure_ascii=False))
+    sys.exit(0 if output["success"] else 1)
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+유니버스 전체 추정치 리비전 모멘텀 엔진
+fetch_earnings_data()의 eps_trend / eps_revisions / earnings_estimate / recommendations를
+종목 × 기간 정렬 배열로 보관하고, 리비전 폭(breadth) / 크기(magnitude) / 투자의견 변화(drift) /
+섹터 내 순위를 한 번의 벡터 연산으로 계산하여 대시보드용 순위표(revisions/rankings.json) 출력
+
+사용법:
+  python revision_momentum.py build                     # 섹터 정보 갱신 후 전체 재계산
+  python revision_momentum.py top [--sector tech] [--limit 20]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+
+import db
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+PERIODS = ("0q", "+1q", "0y", "+1y")
+TREND_POINTS = ("current", "7days_ago", "30days_ago", "60days_ago", "90days_ago")
+REVISION_COUNTS = ("up_7d", "up_30d", "down_7d", "down_30d")
+REC_MONTHS = ("0m", "-1m", "-2m", "-3m")
+REC_COUNTS = ("strong_buy", "buy", "hold", "sell", "strong_sell")
+
+# 1(Strong Buy) ~ 5(Strong Sell), 낮을수록 긍정적 (Yahoo recommendationMean과 동일한 척도)
+REC_SCORES = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+
+# 종합 점수 가중치 (각 지표의 유니버스 z-score)
+SCORE_WEIGHTS = {"breadth": 0.4, "magnitude_30d": 0.4, "rating_drift": 0.2}
+
+ARRAYS = {
+    "trend": (len(PERIODS), len(TREND_POINTS)),
+    "revisions": (len(PERIODS), len(REVISION_COUNTS)),
+    "analysts": (len(PERIODS),),
+    "recommendations": (len(REC_MONTHS), len(REC_COUNTS)),
+}
+
+
+def state_dir() -> str:
+    return db.storage_path("revisions")
+
+
+def earnings_arrays(earnings: dict) -> dict:
+    """fetch_earnings_data() 결과 1종목 → ARRAYS 형태 행 (없는 값은 NaN)"""
+    earnings = earnings or {}
+    row = {name: np.full(shape, np.nan) for name, shape in ARRAYS.items()}
+
+    for item in earnings.get("eps_trend", []):
+        if item.get("period") in PERIODS:
+            p = PERIODS.index(item["period"])
+            row["trend"][p] = [np.nan if item.get(k) is None else item[k] for k in TREND_POINTS]
+    for item in earnings.get("eps_revisions", []):
+        if item.get("period") in PERIODS:
+            p = PERIODS.index(item["period"])
+            row["revisions"][p] = [np.nan if item.get(k) is None else item[k] for k in REVISION_COUNTS]
+    for item in earnings.get("earnings_estimate", []):
+        if item.get("period") in PERIODS and item.get("number_of_analysts") is not None:
+            row["analysts"][PERIODS.index(item["period"])] = item["number_of_analysts"]
+    for item in earnings.get("recommendations", []):
+        if item.get("period") in REC_MONTHS:
+            row["recommendations"][REC_MONTHS.index(item["period"])] = [item.get(k) or 0 for k in REC_COUNTS]
+    return row
+
+
+def nanmean(values, axis):
+    """경고 없는 nanmean (전부 NaN이면 NaN)"""
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=axis)
+    total = np.where(valid, values, 0.0).sum(axis=axis)
+    return np.where(count > 0, total / np.maximum(count, 1), np.nan)
+
+
+def zscore(values):
+    valid = ~np.isnan(values)
+    if valid.sum() < 2:
+        return np.where(valid, 0.0, np.nan)
+    std = values[valid].std()
+    return (values - values[valid].mean()) / std if std > 0 else np.where(valid, 0.0, np.nan)
+
+
+def percentile_rank(values, groups=None):
+    """(그룹 내) 백분위 순위 0~1, NaN은 NaN"""
+    n = len(values)
+    groups = np.zeros(n, dtype="int64") if groups is None else groups
+    result = np.full(n, np.nan)
+    valid = np.flatnonzero(~np.isnan(values))
+    if not len(valid):
+        return result
+
+    order = valid[np.lexsort((values[valid], groups[valid]))]
+    sorted_groups = groups[order]
+    starts = np.r_[0, np.flatnonzero(np.diff(sorted_groups)) + 1]
+    sizes = np.diff(np.r_[starts, len(order)])
+    position = np.arange(len(order)) - np.repeat(starts, sizes)
+    result[order] = (position + 1) / np.repeat(sizes, sizes)
+    return result
+
+
+def compute(state: dict, sectors: list) -> dict:
+    """전 종목 지표를 한 번에 계산 → 컬럼 dict (길이 N)"""
+    trend = state["trend"]
+    current = trend[:, :, 0]
+
+    # 크기: 기간별 (현재 - n일 전) / |n일 전|, ±100%로 제한 후 기간 평균
+    magnitude = {}
+    for label, point in (("7d", 1), ("30d", 2), ("90d", 4)):
+        ago = trend[:, :, point]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change = np.where(np.abs(ago) > 1e-9, (current - ago) / np.abs(ago), np.nan)
+        magnitude[label] = nanmean(np.clip(change, -1.0, 1.0), axis=1)
+
+    # 폭: 30일 상향 - 하향 애널리스트 수 / 커버리지
+    # eps_revisions가 없으면 ±100%로 제한한 30일 크기로 대체하고, 점수/순위에는 두 출처를 각각 z-score하여 사용
+    # (방향 부호로 대체하면 항상 ±1이라 실제 폭보다 훨씬 큰 값이 됨)
+    up, down = state["revisions"][:, :, 1], state["revisions"][:, :, 3]
+    coverage = np.fmax(state["analysts"], up + down)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        breadth = nanmean(np.where(coverage > 0, (up - down) / coverage, np.nan), axis=1)
+    reported = ~np.isnan(breadth)
+    breadth_z = np.where(reported, zscore(breadth), zscore(np.where(reported, np.nan, magnitude["30d"])))
+    breadth = np.where(reported, breadth, magnitude["30d"])
+
+    # 투자의견: 평균 점수와 가장 오래된 월 대비 변화 (양수 = 상향)
+    recs = state["recommendations"]
+    totals = recs.sum(axis=2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rating_by_month = np.where(totals > 0, (recs * REC_SCORES).sum(axis=2) / totals, np.nan)
+    rating = rating_by_month[:, 0]
+    has_month = ~np.isnan(rating_by_month[:, 1:])
+    oldest = np.where(has_month.any(axis=1), has_month.shape[1] - np.argmax(has_month[:, ::-1], axis=1), 0)
+    rating_then = rating_by_month[np.arange(len(rating)), oldest]
+    rating_drift = np.where(oldest > 0, rating_then - rating, np.nan)
+
+    columns = {
+        "breadth": breadth,
+        "magnitude_7d": magnitude["7d"],
+        "magnitude_30d": magnitude["30d"],
+        "magnitude_90d": magnitude["90d"],
+        "rating": rating,
+        "rating_drift": rating_drift,
+        "analysts": np.fmax.reduce(state["analysts"], axis=1, initial=np.nan) if len(rating) else rating,
+    }
+
+    # 종합 점수: 있는 지표만으로 가중 평균한 z-score
+    zscores = {"breadth": breadth_z}
+    weighted = np.zeros(len(rating))
+    weights = np.zeros(len(rating))
+    for name, weight in SCORE_WEIGHTS.items():
+        z = zscores[name] if name in zscores else zscore(columns[name])
+        weighted += np.where(np.isnan(z), 0.0, z * weight)
+        weights += np.where(np.isnan(z), 0.0, weight)
+    score = np.where(weights > 0, weighted / np.maximum(weights, 1e-12), np.nan)
+
+    codes = {code: i for i, code in enumerate(sorted({s or "" for s in sectors}))}
+    sector_ids = np.array([codes[s or ""] for s in sectors], dtype="int64")
+    columns["score"] = score
+    columns["universe_pct"] = percentile_rank(score)
+    columns["sector_pct"] = percentile_rank(score, sector_ids)
+    columns["sector_breadth_pct"] = percentile_rank(breadth_z, sector_ids)
+    return columns
+
+
+def ranking_table(meta: dict, columns: dict) -> dict:
+    rows = []
+    for i, ticker in enumerate(meta["tickers"]):
+        row = {"ticker": ticker, "sector": meta["sectors"][i], "updated_at": meta["updated_at"].get(ticker)}
+        for name, values in columns.items():
+            value = values[i]
+            row[name] = None if np.isnan(value) else round(float(value), 4)
+        rows.append(row)
+
+    rows.sort(key=lambda r: (r["score"] is None, -(r["score"] or 0)))
+    for rank, row in enumerate(rows, start=1):
+        row["rank"] = rank if row["score"] is not None else None
+    return {"generated_at": datetime.now().isoformat(timespec="seconds"), "count": len(rows), "rows": rows}
+
+
+class RevisionState:
+    def __init__(self, path: str = None):
+        self.path = path or state_dir()
+        meta_path = os.path.join(self.path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                self.meta = json.load(f)
+            self.arrays = {name: np.load(os.path.join(self.path, f"{name}.npy")) for name in ARRAYS}
+        else:
+            self.meta = {"tickers": [], "sectors": [], "updated_at": {}}
+            self.arrays = {name: np.empty((0, *shape)) for name, shape in ARRAYS.items()}
+        self.position = {t: i for i, t in enumerate(self.meta["tickers"])}
+
+    def set(self, ticker: str, row: dict, sector=None) -> None:
+        if ticker not in self.position:
+            self.position[ticker] = len(self.meta["tickers"])
+            self.meta["tickers"].append(ticker)
+            self.meta["sectors"].append(sector)
+            for name, shape in ARRAYS.items():
+                self.arrays[name] = np.concatenate([self.arrays[name], np.full((1, *shape), np.nan)])
+        i = self.position[ticker]
+        for name in ARRAYS:
+            self.arrays[name][i] = row[name]
+        if sector is not None:
+            self.meta["sectors"][i] = sector
+        self.meta["updated_at"][ticker] = datetime.now().isoformat(timespec="seconds")
+
+    def keep(self, tickers: set) -> None:
+        """비활성 / 삭제된 종목 제거"""
+        mask = np.array([t in tickers for t in self.meta["tickers"]], dtype=bool)
+        self.meta["tickers"] = [t for t, m in zip(self.meta["tickers"], mask) if m]
+        self.meta["sectors"] = [s for s, m in zip(self.meta["sectors"], mask) if m]
+        self.meta["updated_at"] = {t: self.meta["updated_at"][t] for t in self.meta["tickers"] if t in self.meta["updated_at"]}
+        self.arrays = {name: values[mask] for name, values in self.arrays.items()}
+        self.position = {t: i for i, t in enumerate(self.meta["tickers"])}
+
+    def save(self) -> dict:
+        """지표 재계산 후 상태 + 순위표를 임시 디렉터리에 쓰고 원자적으로 교체"""
+        table = ranking_table(self.meta, compute(self.arrays, self.meta["sectors"]))
+
+        tmp, old = self.path + ".tmp", self.path + ".old"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for name, values in self.arrays.items():
+            np.save(os.path.join(tmp, f"{name}.npy"), values)
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, ensure_ascii=False)
+        # PHP(ValuationController)에서 읽는 순위표
+        with open(os.path.join(tmp, "rankings.json"), "w", encoding="utf-8") as f:
+            json.dump(table, f, ensure_ascii=False)
+
+        shutil.rmtree(old, ignore_errors=True)
+        if os.path.exists(self.path):
+            os.replace(self.path, old)
+        os.replace(tmp, self.path)
+        shutil.rmtree(old, ignore_errors=True)
+        return table
+
+
+@contextmanager
+def locked():
+    """읽기-수정-쓰기 직렬화 (병렬 수집 워커 대비)"""
+    os.makedirs(os.path.dirname(state_dir()), exist_ok=True)
+    with open(state_dir() + ".lock", "w") as handle:
+        if fcntl:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def load_sectors(tickers=None) -> dict:
+    database = db.connect()
+    try:
+        rows = database.fetch_all(
+            "SELECT s.ticker, sec.code AS sector_code FROM stocks s "
+            "LEFT JOIN sectors sec ON sec.id = s.sector_id WHERE s.is_active = 1"
+        )
+    finally:
+        database.close()
+    return {r["ticker"]: r["sector_code"] for r in rows if tickers is None or r["ticker"] in tickers}
+
+
+def update(ticker: str, earnings: dict) -> dict:
+    """
+    fetch_financials.py 실적 섹션 수집 직후 종목 1개 반영 + 전 종목 순위 재계산
+    실적 데이터가 모두 비어 있으면(수집 실패/미지원) 기존 행을 NaN으로 덮어쓰지 않고 건너뜀
+    """
+    ticker = ticker.upper()
+    row = earnings_arrays(earnings)
+    if all(np.isnan(values).all() for values in row.values()):
+        return {"skipped": True, "reason": "no earnings data"}
+    try:
+        sector = load_sectors({ticker}).get(ticker)
+    except Exception:
+        sector = None
+
+    with locked():
+        state = RevisionState()
+        state.set(ticker, row, sector)
+        table = state.save()
+
+    ranked = next(r for r in table["rows"] if r["ticker"] == ticker)
+    return {"rank": ranked["rank"], "score": ranked["score"], "tickers": table["count"]}
+
+
+def build() -> dict:
+    """섹터 매핑 갱신, 비활성 종목 제거 후 전체 재계산"""
+    started = time.perf_counter()
+    sectors = load_sectors()
+    with locked():
+        state = RevisionState()
+        state.keep(set(sectors))
+        state.meta["sectors"] = [sectors.get(t) for t in state.meta["tickers"]]
+        table = state.save()
+    return {
+        "success": True,
+        "tickers": table["count"],
+        "ranked": sum(1 for r in table["rows"] if r["rank"] is not None),
+        "missing": sorted(set(sectors) - set(state.meta["tickers"])),
+        "elapsed": round(time.perf_counter() - started, 3),
+    }
+
+
+def top(sector=None, limit=20) -> dict:
+    with open(os.path.join(state_dir(), "rankings.json"), encoding="utf-8") as f:
+        table = json.load(f)
+    rows = [r for r in table["rows"] if r["rank"] is not None and (not sector or r["sector"] == sector)]
+    return {"success": True, "generated_at": table["generated_at"], "rows": rows[:limit]}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estimate revision momentum engine")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("build")
+
+    top_parser = sub.add_parser("top")
+    top_parser.add_argument("--sector", help="Sector code filter")
+    top_parser.add_argument("--limit", type=int, default=20)
+
+    args = parser.parse_args()
+
+    try:
+        output = build() if args.command == "build" else top(args.sector, args.limit)
+    except Exception as e:
+        output = {"success": False, "error": str(e)}
+
+    print(json.dumps(output, ensure_ascii=False))
+    sys.exit(0 if output["success"] else 1)
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+수평 확장 수집 워커 (sync_tasks 테이블 기반 작업 큐)
+종목 단위 작업을 원자적으로 임대(lease)하여 수집 스크립트를 실행하고 결과를 DB와 작업 행에 기록
+임대 만료(visibility timeout)가 지난 작업은 다른 워커가 다시 가져가고, 실패는 지수 백오프로 재시도
+여러 프로세스 / 여러 노드가 같은 DB를 바라보면 함께 큐를 비움 (SQLite는 로컬 다중 프로세스)
+
+사용법:
+  python sync_worker.py enqueue --kind yahoo [--tickers AAPL,MSFT] [--sections info,history] [--due] [--batch NAME]
+  python sync_worker.py enqueue --kind stockstory
+  python sync_worker.py enqueue --kind sector_benchmarks
+  python sync_worker.py work [--kinds yahoo,stockstory] [--processes 4] [--forever] [--max-tasks N]
+  python sync_worker.py status [--batch NAME]
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import signal
+import socket
+import argparse
+import subprocess
+from datetime import datetime
+from multiprocessing import Pool
+
+import db
+from db_writer import benchmark_rows, stockstory_rows, write_rows
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY = 30  # 초, 실패할 때마다 2배
+POLL_INTERVAL = 2.0
+LEASE_MARGIN = 60  # 프로세스 제한시간보다 이만큼 길게 임대
+
+_stopping = False
+
+
+class PermanentError(Exception):
+    """재시도해도 결과가 같은 작업 오류 (남은 시도와 관계없이 바로 failed)"""
+
+
+def now_ts() -> int:
+    return int(time.time())
+
+
+def now_str() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def run_script(args: list, timeout: int) -> dict:
+    """수집 스크립트 실행 → 출력 JSON (Laravel Process 호출과 동일한 규약)"""
+    try:
+        completed = subprocess.run(
+            [sys.executable, *args], capture_output=True, text=True, timeout=timeout, cwd=SCRIPTS_DIR,
+        )
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"timed out after {timeout}s")
+
+    try:
+        data = json.loads(completed.stdout)
+    except ValueError:
+        raise RuntimeError(f"invalid output (exit {completed.returncode}): {completed.stderr.strip()[-500:]}")
+    if not data.get("success"):
+        raise RuntimeError(data.get("error") or f"exit {completed.returncode}")
+    return data
+
+
+# --- 작업 종류별 실행 ---
+
+def run_yahoo(task: dict, payload: dict) -> dict:
+    """fetch_financials.py --sink db (스크립트가 직접 저장하고 요약만 반환)"""
+    args = ["fetch_financials.py", task["ticker"], "--sink", "db", "--deadline", str(payload.get("deadline", 110))]
+    if payload.get("sections"):
+        args += ["--sections", ",".join(payload["sections"])]
+    if payload.get("due"):
+        args.append("--due")
+    for flag in ("price_store", "options_store", "holdings_index", "revision_engine"):
+        if payload.get(flag):
+            args.append("--" + flag.replace("_", "-"))
+
+    data = run_script(args, TASKS["yahoo"]["timeout"])
+    return {k: data[k] for k in ("sections", "timed_out", "sink") if k in data}
+
+
+def run_stockstory(task: dict, payload: dict) -> dict:
+    if not payload.get("exchange"):
+        raise PermanentError(f"{task['ticker']} has no exchange; StockStory URLs need one")
+    data = run_script(
+        ["fetch_stockstory.py", task["ticker"].lower(), payload["exchange"].lower(), "--stream", "--deadline=50"],
+        TASKS["stockstory"]["timeout"],
+    )
+    timed_out = bool(data.get("timed_out"))
+    partial = timed_out or bool(data.get("stopped_early"))
+    database = db.connect()
+    try:
+        rows = stockstory_rows(payload["stock_id"], data.get("data"), partial=partial)
+        written = write_rows(database, "stock_story_analyses", rows, ["stock_id"])
+    finally:
+        database.close()
+    return {"written": written, "timed_out": timed_out, "partial": partial}
+
+
+def run_sector_benchmarks(task: dict, payload: dict) -> dict:
+    data = run_script(["fetch_sector_benchmarks.py"], TASKS["sector_benchmarks"]["timeout"])
+    database = db.connect()
+    try:
+        written = write_rows(database, "sector_benchmarks", benchmark_rows(data.get("benchmarks")), ["etf_ticker"])
+    finally:
+        database.close()
+    skipped = [b["etf_ticker"] for b in data.get("benchmarks", []) if "error" in b]
+    return {"written": written, "skipped": skipped}
+
+
+# timeout: 스크립트 제한시간(초), delay: 작업 후 대기(초, 기존 sync 커맨드의 sleep과 동일)
+TASKS = {
+    "yahoo": {"run": run_yahoo, "timeout": 120, "delay": 2},
+    "stockstory": {"run": run_stockstory, "timeout": 60, "delay": 3},
+    "sector_benchmarks": {"run": run_sector_benchmarks, "timeout": 120, "delay": 0},
+}
+
+
+# --- 큐 ---
+
+def enqueue(kind: str, tickers=None, payload=None, batch=None, max_attempts=MAX_ATTEMPTS) -> dict:
+    """종목별 작업 등록 (같은 종류/종목의 대기·진행 중 작업이 있으면 건너뜀)"""
+    if kind not in TASKS:
+        raise ValueError(f"Unknown task kind: {kind}")
+    payload = payload or {}
+    batch = batch or f"{kind}-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+
+    no_exchange = []
+    database = db.connect()
+    try:
+        if kind == "sector_benchmarks":
+            targets = [(None, {})]
+        else:
+            stocks = database.fetch_all("SELECT id, ticker, exchange FROM stocks WHERE is_active = 1 ORDER BY ticker")
+            if tickers:
+                wanted = {t.upper() for t in tickers}
+                stocks = [s for s in stocks if s["ticker"] in wanted]
+            # StockStory URL에는 거래소가 필요하므로 거래소가 없는 종목은 등록하지 않음
+            if kind == "stockstory":
+                no_exchange = [s["ticker"] for s in stocks if not s["exchange"]]
+                stocks = [s for s in stocks if s["exchange"]]
+            targets = [(s["ticker"], {"stock_id": s["id"], "exchange": s["exchange"]}) for s in stocks]
+
+        active = {
+            r["ticker"] for r in database.fetch_all(
+                "SELECT ticker FROM sync_tasks WHERE kind = ? AND status IN ('pending', 'leased')", (kind,))
+        }
+        now, stamp = now_ts(), now_str()
+        rows = [
+            (kind, ticker, json.dumps({**extra, **payload}), batch, "pending", 0, max_attempts, now, stamp, stamp)
+            for ticker, extra in targets if ticker not in active
+        ]
+        database.executemany(
+            "INSERT INTO sync_tasks (kind, ticker, payload, batch, status, attempts, max_attempts, available_at, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        database.commit()
+    finally:
+        database.close()
+
+    return {"success": True, "kind": kind, "batch": batch, "enqueued": len(rows), "skipped": len(targets) - len(rows),
+            "no_exchange": no_exchange}
+
+
+def claim(database, worker: str, kinds: list, visibility: int = None):
+    """
+    대기 중이거나 임대가 만료된 작업 1개를 원자적으로 임대
+    SQLite: 서브쿼리를 포함한 단일 UPDATE (쓰기 잠금 안에서 선택)
+    MySQL: SELECT ... FOR UPDATE SKIP LOCKED 후 UPDATE
+    """
+    now, token = now_ts(), str(uuid.uuid4())
+    marks = ", ".join("?" * len(kinds))
+    claimable = (
+        f"kind IN ({marks}) AND ((status = 'pending' AND available_at <= ?) "
+        "OR (status = 'leased' AND leased_until < ? AND attempts < max_attempts))"
+    )
+    params = (*kinds, now, now)
+
+    # 재시도 횟수를 다 쓴 채 임대가 만료된 작업은 실패 처리
+    database.execute(
+        "UPDATE sync_tasks SET status = 'failed', last_error = COALESCE(last_error, 'lease expired'), "
+        "finished_at = ?, updated_at = ? WHERE status = 'leased' AND leased_until < ? AND attempts >= max_attempts",
+        (now, now_str(), now),
+    )
+    database.commit()
+
+    until = now + (visibility or max(TASKS[k]["timeout"] for k in kinds) + LEASE_MARGIN)
+    lease = (
+        "UPDATE sync_tasks SET status = 'leased', attempts = attempts + 1, leased_by = ?, lease_token = ?, "
+        "leased_until = ?, updated_at = ? WHERE id = "
+    )
+    if database.driver == "mysql":
+        rows = database.fetch_all(
+            f"SELECT id FROM sync_tasks WHERE {claimable} ORDER BY available_at, id LIMIT 1 FOR UPDATE SKIP LOCKED", params)
+        if not rows:
+            database.commit()
+            return None
+        database.execute(lease + "?", (worker, token, until, now_str(), rows[0]["id"]))
+    else:
+        database.execute(
+            lease + f"(SELECT id FROM sync_tasks WHERE {claimable} ORDER BY available_at, id LIMIT 1)",
+            (worker, token, until, now_str(), *params),
+        )
+    database.commit()
+
+    rows = database.fetch_all("SELECT * FROM sync_tasks WHERE lease_token = ?", (token,))
+    return rows[0] if rows else None
+
+
+def complete(database, task: dict, result: dict) -> bool:
+    """임대 토큰이 그대로일 때만 완료 기록 (만료 후 다른 워커가 가져간 경우 False)"""
+    cur = database.execute(
+        "UPDATE sync_tasks SET status = 'done', result = ?, last_error = NULL, leased_until = NULL, "
+        "finished_at = ?, updated_at = ? WHERE id = ? AND lease_token = ?",
+        (json.dumps(result, ensure_ascii=False), now_ts(), now_str(), task["id"], task["lease_token"]),
+    )
+    database.commit()
+    return cur.rowcount == 1
+
+
+def fail(database, task: dict, error: str, permanent: bool = False) -> str:
+    """남은 시도가 있으면 백오프 후 재대기, 없거나 재시도해도 소용없는 오류(permanent)면 failed"""
+    retry = not permanent and task["attempts"] < task["max_attempts"]
+    status = "pending" if retry else "failed"
+    cur = database.execute(
+        "UPDATE sync_tasks SET status = ?, last_error = ?, available_at = ?, leased_until = NULL, "
+        "finished_at = ?, updated_at = ? WHERE id = ? AND lease_token = ?",
+        (
+            status, error[:2000],
+            now_ts() + RETRY_BASE_DELAY * 2 ** (task["attempts"] - 1),
+            None if retry else now_ts(), now_str(), task["id"], task["lease_token"],
+        ),
+    )
+    database.commit()
+    return status if cur.rowcount == 1 else "lost"
+
+
+def outstanding(database, kinds: list) -> int:
+    marks = ", ".join("?" * len(kinds))
+    rows = database.fetch_all(
+        f"SELECT COUNT(*) AS n FROM sync_tasks WHERE kind IN ({marks}) AND status IN ('pending', 'leased')", tuple(kinds))
+    return int(rows[0]["n"])
+
+
+def work(kinds=None, forever=False, max_tasks=None, visibility=None, delay=True) -> dict:
+    """큐가 빌 때까지(forever면 계속) 작업을 임대 → 실행 → 결과 기록"""
+    kinds = kinds or list(TASKS)
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    counts = {"done": 0, "pending": 0, "failed": 0, "lost": 0}
+
+    database = db.connect()
+    try:
+        while not _stopping and (max_tasks is None or sum(counts.values()) < max_tasks):
+            task = claim(database, worker, kinds, visibility)
+            if task is None:
+                if not forever and outstanding(database, kinds) == 0:
+                    break
+                time.sleep(POLL_INTERVAL)
+                continue
+
+            spec = TASKS[task["kind"]]
+            try:
+                result = spec["run"](task, json.loads(task["payload"] or "{}"))
+                counts["done" if complete(database, task, result) else "lost"] += 1
+            except PermanentError as e:
+                counts[fail(database, task, str(e), permanent=True)] += 1
+            except Exception as e:
+                counts[fail(database, task, str(e))] += 1
+
+            if delay and spec["delay"]:
+                time.sleep(spec["delay"])
+    finally:
+        database.close()
+
+    return {"worker": worker, **counts}
+
+
+def _stop(signum, frame):
+    """SIGTERM/SIGINT: 진행 중인 작업까지만 처리하고 종료"""
+    global _stopping
+    _stopping = True
+
+
+def _work_process(options: dict) -> dict:
+    # 작업 중에만 정상 종료 처리기를 걸어 둠 (Pool 정리 시 SIGTERM으로는 바로 종료되어야 함)
+    previous = {sig: signal.signal(sig, _stop) for sig in (signal.SIGTERM, signal.SIGINT)}
+    try:
+        return work(**options)
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+
+
+def run_workers(processes: int, **options) -> dict:
+    started = time.perf_counter()
+    if processes <= 1:
+        workers = [_work_process(options)]
+    else:
+        with Pool(processes) as pool:
+            workers = pool.map(_work_process, [options] * processes)
+
+    totals = {k: sum(w[k] for w in workers) for k in ("done", "pending", "failed", "lost")}
+    return {
+        "success": True,
+        "processed": sum(totals.values()),
+        **totals,
+        "workers": workers,
+        "elapsed": round(time.perf_counter() - started, 3),
+    }
+
+
+def status(batch=None) -> dict:
+    database = db.connect()
+    try:
+        where, params = ("WHERE batch = ?", (batch,)) if batch else ("", ())
+        counts = database.fetch_all(
+            f"SELECT kind, status, COUNT(*) AS n FROM sync_tasks {where} GROUP BY kind, status", params)
+        failures = database.fetch_all(
+            f"SELECT kind, ticker, attempts, last_error FROM sync_tasks {where} {'AND' if where else 'WHERE'} status = 'failed' "
+            "ORDER BY finished_at DESC LIMIT 20", params)
+    finally:
+        database.close()
+
+    summary = {}
+    for row in counts:
+        summary.setdefault(row["kind"], {})[row["status"]] = int(row["n"])
+    return {"success": True, "batch": batch, "tasks": summary, "recent_failures": failures}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Queue worker for per-ticker sync tasks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    enqueue_parser = sub.add_parser("enqueue")
+    enqueue_parser.add_argument("--kind", choices=list(TASKS), default="yahoo")
+    enqueue_parser.add_argument("--tickers", help="Comma separated tickers (default: all active stocks)")
+    enqueue_parser.add_argument("--sections", help="yahoo: comma separated sections")
+    enqueue_parser.add_argument("--due", action="store_true", help="yahoo: only fetch sections that are due")
+    enqueue_parser.add_argument("--batch", help="Batch label for status reporting")
+    enqueue_parser.add_argument("--max-attempts", type=int, default=MAX_ATTEMPTS)
+
+    work_parser = sub.add_parser("work")
+    work_parser.add_argument("--kinds", help=f"Comma separated task kinds ({','.join(TASKS)})")
+    work_parser.add_argument("--processes", type=int, default=1, help="Worker processes on this node")
+    work_parser.add_argument("--forever", action="store_true", help="Keep polling after the queue is drained")
+    work_parser.add_argument("--max-tasks", type=int, help="Stop each process after this many tasks")
+    work_parser.add_argument("--visibility", type=int, help="Lease seconds (default: script timeout + 60)")
+
+    status_parser = sub.add_parser("status")
+    status_parser.add_argument("--batch")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "enqueue":
+            tickers = [t.strip() for t in args.tickers.split(",") if t.strip()] if args.tickers else None
+            payload = {}
+            if args.sections:
+                payload["sections"] = [s.strip() for s in args.sections.split(",") if s.strip()]
+            if args.due:
+                payload["due"] = True
+            if args.kind == "yahoo":
+                env = db.load_env()
+                for flag in ("price_store", "options_store", "holdings_index", "revision_engine"):
+                    if env.get(f"YAHOO_FINANCE_{flag.upper()}", "").lower() in ("1", "true"):
+                        payload[flag] = True
+            output = enqueue(args.kind, tickers, payload, args.batch, args.max_attempts)
+        elif args.command == "work":
+            kinds = [k.strip() for k in args.kinds.split(",") if k.strip()] if args.kinds else None
+            output = run_workers(
+                args.processes, kinds=kinds, forever=args.forever, max_tasks=args.max_tasks, visibility=args.visibility,
+            )
+        else:
+            output = status(args.batch)
+    except Exception as e:
+        output = {"success": False, "error": str(e)}
+
+    print(json.dumps(output, ensure_ascii=False, default=str))
+    sys.exit(0 if output["success"] else 1)
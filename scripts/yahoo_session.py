@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Yahoo Finance 공유 HTTP 세션
+프로세스당 커넥션 풀 세션 1개를 모든 yf.Ticker가 공유하고,
+쿠키/crumb을 storage/app/private/yahoo_session.json에 만료시각과 함께 저장하여
+다음 실행에서 fc.yahoo.com / getcrumb 핸드셰이크를 생략
+Yahoo가 저장된 쿠키/crumb을 거부하면(401, Invalid Crumb) 저장본을 폐기
+"""
+
+import os
+import json
+import time
+import atexit
+import tempfile
+from http.cookiejar import Cookie
+
+import yfinance as yf
+
+import db
+
+# crumb은 쿠키보다 먼저 무효화될 수 있어 보수적으로 재사용
+SESSION_TTL = 12 * 3600
+
+_session = None
+_restored_crumb = None
+
+
+def session_path() -> str:
+    return os.path.join(db.storage_path(), "yahoo_session.json")
+
+
+def cookie_jar(session):
+    """curl_cffi는 session.cookies.jar, requests는 session.cookies 자체가 CookieJar"""
+    cookies = session.cookies
+    return getattr(cookies, "jar", cookies)
+
+
+def yf_data(session=None):
+    """yfinance 내부 싱글턴 (쿠키/crumb 보관). 버전 차이로 없으면 None"""
+    try:
+        from yfinance.data import YfData
+    except ImportError:
+        return None
+    return YfData(session=session) if session is not None else YfData()
+
+
+def new_session():
+    try:
+        from yfinance._http import new_session as yf_new_session
+        return yf_new_session()
+    except ImportError:
+        from curl_cffi import requests as curl_requests
+        return curl_requests.Session(impersonate="chrome")
+
+
+def load_saved() -> dict:
+    try:
+        with open(session_path(), encoding="utf-8") as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if saved.get("expires_at", 0) <= time.time():
+        return {}
+    return saved
+
+
+def restore(session) -> bool:
+    """저장된 쿠키/crumb을 세션과 yfinance 싱글턴에 주입"""
+    global _restored_crumb
+
+    data = yf_data(session)
+    saved = load_saved()
+    if data is None or not saved.get("crumb"):
+        return False
+
+    jar = cookie_jar(session)
+    for c in saved.get("cookies", []):
+        jar.set_cookie(Cookie(
+            version=0, name=c["name"], value=c["value"], port=None, port_specified=False,
+            domain=c["domain"], domain_specified=True, domain_initial_dot=c["domain"].startswith("."),
+            path=c.get("path", "/"), path_specified=True, secure=c.get("secure", False),
+            expires=c.get("expires"), discard=False, comment=None, comment_url=None, rest={},
+        ))
+
+    data._cookie = True
+    data._crumb = saved["crumb"]
+    _restored_crumb = saved["crumb"]
+    return True
+
+
+def save() -> bool:
+    """이번 실행에서 새로 받은 crumb이 있으면 쿠키와 함께 저장"""
+    if _session is None:
+        return False
+    data = yf_data()
+    crumb = getattr(data, "_crumb", None) if data is not None else None
+    if not crumb or crumb == _restored_crumb:
+        return False
+
+    now = time.time()
+    cookies = [
+        {
+            "name": c.name, "value": c.value, "domain": c.domain, "path": c.path,
+            "secure": c.secure, "expires": c.expires,
+        }
+        for c in cookie_jar(_session) if "yahoo" in (c.domain or "")
+    ]
+    cookie_expiry = min((c["expires"] for c in cookies if c["expires"]), default=now + SESSION_TTL)
+    payload = {
+        "crumb": crumb,
+        "cookies": cookies,
+        "saved_at": now,
+        "expires_at": min(now + SESSION_TTL, cookie_expiry),
+    }
+
+    # 여러 워커가 동시에 저장할 수 있어 프로세스별 임시 파일에 쓴 뒤 교체
+    fd, tmp = tempfile.mkstemp(prefix=".yahoo_session.", suffix=".tmp", dir=os.path.dirname(session_path()))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(tmp, session_path())
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return True
+
+
+def invalidate() -> None:
+    """crumb이 거부된 경우(401 Invalid Crumb) 저장본 폐기"""
+    try:
+        os.remove(session_path())
+    except OSError:
+        pass
+
+
+def rejected(response) -> bool:
+    """쿠키/crumb 거부 응답 여부 (본문은 오류 응답일 때만 확인)"""
+    status = getattr(response, "status_code", None)
+    if status == 401:
+        return True
+    if status is None or status < 400:
+        return False
+    try:
+        return "Invalid Crumb" in response.text
+    except Exception:
+        return False
+
+
+def watch(session) -> None:
+    """세션의 모든 요청 응답을 확인해 거부되면 저장본 폐기 (yfinance는 session.get/post → request 경유)"""
+    original = session.request
+
+    def request(*args, **kwargs):
+        global _restored_crumb
+        response = original(*args, **kwargs)
+        if rejected(response):
+            invalidate()
+            # 다시 받은 crumb이 같은 값이어도 저장되도록
+            _restored_crumb = None
+        return response
+
+    session.request = request
+
+
+def get_session():
+    """프로세스 공유 세션 (최초 호출 시 생성 + 저장된 쿠키/crumb 복원)"""
+    global _session
+    if _session is None:
+        _session = new_session()
+        watch(_session)
+        try:
+            restore(_session)
+        except Exception:
+            invalidate()
+        atexit.register(_save_quietly)
+    return _session
+
+
+def _save_quietly():
+    try:
+        save()
+    except Exception:
+        pass
+
+
+def ticker(symbol: str):
+    return yf.Ticker(symbol, session=get_session())
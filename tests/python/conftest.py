@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "scripts")
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+sys.path.insert(0, SCRIPTS_DIR)
+
+
+@pytest.fixture
+def storage_root(tmp_path, monkeypatch):
+    """db.storage_path()가 임시 디렉터리 아래를 가리키도록 변경"""
+    import db
+
+    monkeypatch.setattr(db, "ROOT_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def fixture_text():
+    def load(name):
+        with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+            return f.read()
+    return load
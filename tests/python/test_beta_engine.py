@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+import beta_engine
+from beta_engine import BetaEngine
+from price_store import PriceStore, from_day
+
+
+def bars(count, seed):
+    closes = 100 * np.cumprod(1 + np.random.default_rng(seed).normal(0, 0.01, count))
+    return [{"date": from_day(19000 + i), "close": float(c)} for i, c in enumerate(closes)]
+
+
+def test_short_history_fails_instead_of_publishing_nulls(storage_root):
+    store = PriceStore("1d")
+    store.append("SPY", bars(60, 0))
+    store.append("AAPL", bars(60, 1)[-5:])
+    store.append("MSFT", bars(60, 2)[-5:])
+
+    engine = BetaEngine("1d", window=40)
+    with pytest.raises(RuntimeError, match="run 'beta_engine.py backfill --interval 1d' first"):
+        engine.build([{"ticker": "AAPL"}, {"ticker": "MSFT"}])
+
+
+def test_backfill_fills_short_stocks(storage_root, monkeypatch):
+    store = PriceStore("1d")
+    store.append("SPY", bars(60, 0))
+    store.append("AAPL", bars(60, 1)[-5:])
+    store.append("MSFT", bars(60, 2))
+    requested = []
+
+    def download(tickers, period, interval):
+        requested.append((tickers, period))
+        return {"AAPL": bars(60, 1)}, {}
+
+    monkeypatch.setattr("bulk_prices.download", download)
+    universe = [{"ticker": "AAPL", "benchmark_etf": "SPY"}, {"ticker": "MSFT", "benchmark_etf": "SPY"}]
+
+    result = beta_engine.backfill(universe, "1d", window=40)
+
+    assert requested == [(["AAPL"], "2y")]
+    assert result["short"] == 1 and result["appended"] == 55
+    assert store.length("AAPL") == 60
+
+    output = BetaEngine("1d", window=40).build(universe)
+    assert output["stocks"] == 2 and output["short_history"] == 0
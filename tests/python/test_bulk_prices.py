@@ -0,0 +1,109 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import bulk_prices
+from bulk_prices import split_frame, write_to_database
+from fetch_financials import HISTORY_INTERVAL
+
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+DATES = pd.to_datetime(["2026-10-14", "2026-10-15", "2026-10-16"])
+
+
+def multi_frame(data: dict) -> pd.DataFrame:
+    """yf.download(group_by="ticker", multi_level_index=True)와 같은 (종목, 필드) 컬럼 프레임"""
+    columns = pd.MultiIndex.from_product([list(data), FIELDS])
+    values = np.column_stack([np.asarray(data[t], dtype=float) for t in data])
+    return pd.DataFrame(values, index=DATES, columns=columns)
+
+
+def bars(closes, volume=100.0):
+    return [[c - 1, c + 1, c - 2, c, volume] if c is not None else [np.nan] * 5 for c in closes]
+
+
+def test_split_multiindex_frame():
+    frame = multi_frame({
+        "AAPL": bars([10.0, 11.0, 12.0]),
+        "DEAD": bars([None, None, None]),  # 상장폐지 등으로 전부 NaN
+        "MSFT": bars([None, 21.0, 22.0]),
+    })
+
+    result = split_frame(frame, ["AAPL", "DEAD", "MSFT", "GONE"])
+
+    assert sorted(result) == ["AAPL", "MSFT"]
+    assert result["AAPL"][0] == {"date": "2026-10-14", "open": 9.0, "high": 11.0, "low": 8.0, "close": 10.0, "volume": 100.0}
+    assert [b["date"] for b in result["MSFT"]] == ["2026-10-15", "2026-10-16"]
+
+
+def test_split_skips_rows_without_close():
+    rows = bars([10.0, 11.0, 12.0])
+    rows[1][3] = np.nan
+    result = split_frame(multi_frame({"AAPL": rows}), ["AAPL"])
+
+    assert [b["date"] for b in result["AAPL"]] == ["2026-10-14", "2026-10-16"]
+
+
+def test_split_single_level_frame_and_empty():
+    frame = pd.DataFrame(bars([10.0, 11.0, 12.0]), index=DATES, columns=FIELDS)
+
+    assert [b["close"] for b in split_frame(frame, ["AAPL"])["AAPL"]] == [10.0, 11.0, 12.0]
+    assert split_frame(pd.DataFrame(), ["AAPL"]) == {}
+    assert split_frame(None, ["AAPL"]) == {}
+
+
+def test_download_chunks_and_records_failures(monkeypatch):
+    calls = []
+
+    def fake_download(tickers, **kwargs):
+        calls.append(list(tickers))
+        if "BAD" in tickers:
+            raise RuntimeError("boom")
+        return multi_frame({t: bars([1.0, 2.0, 3.0]) for t in tickers})
+
+    monkeypatch.setattr(bulk_prices.yahoo_session, "get_session", lambda: None)
+    monkeypatch.setattr(bulk_prices.yf, "download", fake_download)
+
+    result, failed = bulk_prices.download(["AAPL", "MSFT", "BAD", "NVDA"], chunk_size=2, delay=0)
+
+    assert calls == [["AAPL", "MSFT"], ["BAD", "NVDA"]]
+    assert sorted(result) == ["AAPL", "MSFT"]
+    assert failed == {"BAD..NVDA": "boom"}
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    path = str(tmp_path / "db.sqlite")
+    monkeypatch.setenv("DB_CONNECTION", "sqlite")
+    monkeypatch.setenv("DB_DATABASE", path)
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE stocks (id INTEGER PRIMARY KEY, ticker TEXT)")
+    conn.execute("CREATE TABLE stock_fundamentals (stock_id INTEGER, date TEXT, current_price REAL, updated_at TEXT)")
+    conn.execute(
+        "CREATE TABLE stock_prices (stock_id INTEGER, date TEXT, open REAL, high REAL, low REAL, close REAL, volume INTEGER, "
+        "created_at TEXT, updated_at TEXT, UNIQUE (stock_id, date))"
+    )
+    conn.execute("INSERT INTO stocks (id, ticker) VALUES (1, 'AAPL')")
+    conn.executemany("INSERT INTO stock_fundamentals VALUES (1, ?, ?, NULL)", [("2026-09-30", 9.0), ("2026-10-01", 9.5)])
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+SERIES = {"AAPL": [{"date": "2026-10-01", "open": 9.0, "high": 11.0, "low": 8.0, "close": 10.0, "volume": 100.0}], "UNKNOWN": []}
+
+
+def test_daily_bars_only_update_current_price(database):
+    assert write_to_database(SERIES, "1d") == {"current_price": 1, "stock_prices": 0}
+
+    prices = database.execute("SELECT date, current_price FROM stock_fundamentals ORDER BY date").fetchall()
+    assert prices == [("2026-09-30", 9.0), ("2026-10-01", 10.0)]
+    assert database.execute("SELECT COUNT(*) FROM stock_prices").fetchone()[0] == 0
+
+
+def test_history_interval_bars_are_upserted(database):
+    assert write_to_database(SERIES, HISTORY_INTERVAL) == {"current_price": 1, "stock_prices": 1}
+    assert write_to_database(SERIES, HISTORY_INTERVAL)["stock_prices"] == 1
+
+    assert database.execute("SELECT stock_id, date, close, volume FROM stock_prices").fetchall() == [(1, "2026-10-01", 10.0, 100)]
@@ -0,0 +1,136 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import compute_indicators
+from compute_indicators import compute_from_history, compute_indicator_frame, latest_snapshots
+
+
+def bars(stock_id, closes, start="2024-01-01", freq="D"):
+    dates = pd.date_range(start, periods=len(closes), freq=freq)
+    closes = np.asarray(closes, dtype=float)
+    return pd.DataFrame({
+        "stock_id": stock_id,
+        "date": dates.strftime("%Y-%m-%d"),
+        "open": closes,
+        "high": closes + 1,
+        "low": closes - 1,
+        "close": closes,
+        "volume": 1000.0,
+    })
+
+
+def test_moving_averages_match_pandas():
+    closes = np.linspace(10, 40, 60)
+    frame = compute_indicator_frame(bars(1, closes))
+
+    assert frame["sma_5"].iloc[-1] == pytest.approx(closes[-5:].mean())
+    assert frame["sma_20"].iloc[-1] == pytest.approx(closes[-20:].mean())
+    assert np.isnan(frame["sma_5"].iloc[3])
+    assert np.isnan(frame["sma_200"]).all()
+
+    expected_ema = pd.Series(closes).ewm(span=12, adjust=False, min_periods=12).mean()
+    np.testing.assert_allclose(frame["ema_12"].to_numpy(), expected_ema.to_numpy())
+
+
+def test_rsi_bounds_and_direction():
+    rising = compute_indicator_frame(bars(1, np.arange(1, 31)))
+    assert rising["rsi_14"].iloc[-1] == pytest.approx(100.0)
+
+    falling = compute_indicator_frame(bars(1, np.arange(30, 0, -1)))
+    assert falling["rsi_14"].iloc[-1] == pytest.approx(0.0)
+
+    rng = np.random.default_rng(0)
+    noisy = compute_indicator_frame(bars(1, 100 + rng.normal(0, 1, 200).cumsum()))
+    rsi = noisy["rsi_14"].dropna()
+    assert ((rsi >= 0) & (rsi <= 100)).all()
+
+
+def test_atr_uses_true_range():
+    # high - low = 2, 종가 변화 1 → True Range는 항상 2
+    frame = compute_indicator_frame(bars(1, np.arange(1, 41)))
+    assert frame["atr_14"].iloc[-1] == pytest.approx(2.0)
+    assert np.isnan(frame["atr_14"].iloc[12])
+
+
+def test_drawdown_and_52_week_range():
+    closes = [10, 20, 15, 30, 24, 27]
+    frame = compute_indicator_frame(bars(1, closes))
+
+    np.testing.assert_allclose(frame["drawdown"], [0, 0, -0.25, 0, -0.2, -0.1])
+    assert frame["max_drawdown"].iloc[-1] == pytest.approx(-0.25)
+    assert frame["week_52_high"].iloc[-1] == 31
+    assert frame["week_52_low"].iloc[-1] == 9
+    assert frame["week_52_percentile"].iloc[-1] == pytest.approx((27 - 9) / (31 - 9) * 100)
+
+
+def test_stocks_are_computed_independently():
+    a = bars(1, np.linspace(10, 20, 30))
+    b = bars(2, np.linspace(200, 100, 30))
+    together = compute_indicator_frame(pd.concat([b, a]))
+    alone = compute_indicator_frame(a)
+
+    mine = together[together["stock_id"] == 1].reset_index(drop=True)
+    for column in ("sma_20", "ema_12", "rsi_14", "atr_14", "volatility", "drawdown", "week_52_high"):
+        np.testing.assert_allclose(mine[column], alone[column], equal_nan=True)
+
+
+def test_volatility_is_annualized_by_bar_spacing():
+    rng = np.random.default_rng(1)
+    returns = rng.normal(0, 0.01, 60)
+    closes = 100 * np.exp(returns.cumsum())
+
+    daily = compute_indicator_frame(bars(1, closes, freq="D"))
+    weekly = compute_indicator_frame(bars(1, closes, freq="7D"))
+
+    # 같은 수익률 열이면 주봉의 연율화 변동성은 일봉의 1/sqrt(7)
+    assert weekly["volatility"].iloc[-1] == pytest.approx(daily["volatility"].iloc[-1] / np.sqrt(7))
+
+
+def test_latest_snapshots_and_history_entry_point():
+    frame = compute_indicator_frame(pd.concat([bars(1, np.arange(1, 26)), bars(2, np.arange(50, 60))]))
+    snapshots = latest_snapshots(frame)
+
+    assert snapshots[1]["bar_count"] == 25
+    assert snapshots[1]["sma"]["20"] == pytest.approx(np.arange(6, 26).mean())
+    assert snapshots[2]["sma"]["20"] is None
+
+    history = bars(0, np.arange(1, 26)).drop(columns="stock_id").to_dict("records")
+    history.append({"date": None, "close": 5})
+    single = compute_from_history(history)
+    assert single["as_of_date"] == "2024-01-25"
+    assert single["close"] == 25
+    assert compute_from_history([]) == {}
+
+
+def test_run_uses_daily_store(tmp_path, storage_root, monkeypatch):
+    from price_store import PriceStore
+
+    path = str(tmp_path / "db.sqlite")
+    monkeypatch.setenv("DB_CONNECTION", "sqlite")
+    monkeypatch.setenv("DB_DATABASE", path)
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE stocks (id INTEGER PRIMARY KEY, ticker TEXT, is_active INTEGER)")
+    conn.execute(
+        "CREATE TABLE stock_indicators (stock_id INTEGER UNIQUE, as_of_date TEXT, bar_count INTEGER, close REAL, sma TEXT, ema TEXT, "
+        "rsi_14 REAL, atr_14 REAL, volatility REAL, drawdown REAL, max_drawdown REAL, week_52_high REAL, week_52_low REAL, week_52_percentile REAL, created_at TEXT, updated_at TEXT)"
+    )
+    conn.executemany("INSERT INTO stocks VALUES (?, ?, 1)", [(1, "AAPL"), (2, "MSFT")])
+    conn.commit()
+    conn.close()
+
+    closes = np.linspace(100, 140, 250)
+    PriceStore("1d").append("AAPL", bars(1, closes).to_dict("records"))
+
+    result = compute_indicators.run()
+    assert result["updated"] == 1
+    assert result["missing"] == ["MSFT"]
+
+    snap = compute_indicators.compute_for_ticker("AAPL")
+    assert snap["bar_count"] == 250
+    assert snap["sma"]["200"] == pytest.approx(closes[-200:].mean())
+    assert compute_indicators.compute_for_ticker("MSFT") == {}
+
+    assert compute_indicators.run()["skipped_up_to_date"] is True
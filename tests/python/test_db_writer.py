@@ -0,0 +1,61 @@
+import sqlite3
+
+import pytest
+
+import db
+from db_writer import holder_rows, insider_rows, merge_by_key
+
+SCHEMA = [
+    """CREATE TABLE institutional_holders (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, stock_id INTEGER, holder_name TEXT, shares INTEGER,
+        date_reported DATE, percent_out REAL, value REAL, created_at DATETIME, updated_at DATETIME,
+        UNIQUE (stock_id, holder_name, date_reported))""",
+    """CREATE TABLE insider_transactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, stock_id INTEGER, insider_name TEXT, position TEXT,
+        transaction_type TEXT, shares INTEGER, value REAL, transaction_date DATE, url TEXT,
+        created_at DATETIME, updated_at DATETIME)""",
+]
+
+
+@pytest.fixture
+def database():
+    conn = sqlite3.connect(":memory:")
+    for sql in SCHEMA:
+        conn.execute(sql)
+    database = db.Database("sqlite", conn)
+    yield database
+    database.close()
+
+
+def holdings(shares):
+    return {
+        "institutional_holders": [
+            {"holder": "Vanguard", "date_reported": "2024-03-31 00:00:00", "shares": shares, "value": 10.0},
+            {"holder": "Undated Fund", "date_reported": None, "shares": shares, "value": 5.0},
+        ],
+        "insider_transactions": [
+            {"insider": "Jane Doe", "start_date": "2024-02-01", "shares": 100, "position": "CEO", "transaction_type": "Sale"},
+        ],
+    }
+
+
+def test_resync_does_not_duplicate_rows_with_null_dates(database):
+    for shares in (100, 200):
+        merge_by_key(database, "institutional_holders", 1, holder_rows(1, holdings(shares)), ("holder_name", "date_reported"))
+        merge_by_key(database, "insider_transactions", 1, insider_rows(1, holdings(shares)),
+                     ("insider_name", "transaction_date", "shares"))
+
+    rows = database.fetch_all("SELECT holder_name, date_reported, shares FROM institutional_holders ORDER BY holder_name")
+    assert rows == [
+        {"holder_name": "Undated Fund", "date_reported": None, "shares": 200},
+        {"holder_name": "Vanguard", "date_reported": "2024-03-31", "shares": 200},
+    ]
+    assert database.fetch_all("SELECT COUNT(*) AS n FROM insider_transactions")[0]["n"] == 1
+
+
+def test_other_stocks_are_not_touched(database):
+    merge_by_key(database, "institutional_holders", 1, holder_rows(1, holdings(100)), ("holder_name", "date_reported"))
+    merge_by_key(database, "institutional_holders", 2, holder_rows(2, holdings(300)), ("holder_name", "date_reported"))
+
+    counts = database.fetch_all("SELECT stock_id, COUNT(*) AS n FROM institutional_holders GROUP BY stock_id")
+    assert counts == [{"stock_id": 1, "n": 2}, {"stock_id": 2, "n": 2}]
@@ -0,0 +1,112 @@
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+import earnings_calendar
+from fetch_financials import load_state, modify_state, save_state
+
+
+class FakeTicker:
+    def __init__(self, next_date, reported):
+        self.calendar = {"Earnings Date": [next_date]} if next_date else {}
+        self.reported = reported
+        self.history_calls = 0
+
+    def get_earnings_dates(self, limit=12):
+        self.history_calls += 1
+        index = pd.DatetimeIndex([pd.Timestamp(d, tz="America/New_York") for d in self.reported])
+        return pd.DataFrame({"Reported EPS": [1.0] * len(index)}, index=index)
+
+
+@pytest.fixture
+def tickers(storage_root, monkeypatch):
+    fakes = {}
+    monkeypatch.setattr(earnings_calendar.yahoo_session, "ticker", lambda symbol: fakes[symbol])
+    return fakes
+
+
+def test_first_scan_finds_recent_report(tickers):
+    today = date.today()
+    tickers["AAPL"] = FakeTicker(today + timedelta(days=90), [today + timedelta(days=90), today - timedelta(days=2), today - timedelta(days=93)])
+
+    result = earnings_calendar.scan(["AAPL"], delay=0)
+
+    assert result["scanned"] == 1
+    entry = earnings_calendar.load_index()["AAPL"]
+    assert entry["last_reported_date"] == (today - timedelta(days=2)).isoformat()
+    assert load_state("AAPL")["last_reported_date"] == entry["last_reported_date"]
+
+    targets = earnings_calendar.plan(reported_days=3)["targets"]
+    assert [(t["ticker"], t["priority"]) for t in targets] == [("AAPL", 1)]
+
+
+def test_history_is_only_fetched_when_needed(tickers):
+    today = date.today()
+    tickers["MSFT"] = FakeTicker(today + timedelta(days=30), [today - timedelta(days=60)])
+
+    earnings_calendar.scan(["MSFT"], delay=0)
+    earnings_calendar.scan(["MSFT"], force=True, delay=0)
+
+    assert tickers["MSFT"].history_calls == 1
+    assert earnings_calendar.load_index()["MSFT"]["last_reported_date"] == (today - timedelta(days=60)).isoformat()
+
+
+def test_history_failure_falls_back_to_calendar(tickers):
+    today = date.today()
+    fake = FakeTicker(today, [])
+
+    def unavailable(limit=12):
+        raise RuntimeError("boom")
+
+    fake.get_earnings_dates = unavailable
+    tickers["NVDA"] = fake
+
+    result = earnings_calendar.scan(["NVDA"], delay=0)
+
+    assert result["errors"] == {}
+    assert earnings_calendar.load_index()["NVDA"]["last_reported_date"] == today.isoformat()
+
+
+def test_scan_deadline_stops_and_resumes(tickers, monkeypatch):
+    today = date.today()
+    for symbol in ("AAPL", "MSFT", "NVDA"):
+        tickers[symbol] = FakeTicker(today + timedelta(days=30), [today - timedelta(days=60)])
+
+    clock = {"t": 0.0}
+    monkeypatch.setattr(earnings_calendar.time, "monotonic", lambda: clock["t"])
+    monkeypatch.setattr(earnings_calendar.time, "sleep", lambda seconds: clock.__setitem__("t", clock["t"] + seconds))
+
+    first = earnings_calendar.scan(["AAPL", "MSFT", "NVDA"], delay=1, deadline=1.5)
+    assert (first["scanned"], first["remaining"]) == (2, 1)
+    assert sorted(earnings_calendar.load_index()) == ["AAPL", "MSFT"]
+
+    second = earnings_calendar.scan(["AAPL", "MSFT", "NVDA"], delay=1, deadline=1.5)
+    assert (second["scanned"], second["remaining"]) == (1, 0)
+    assert sorted(earnings_calendar.load_index()) == ["AAPL", "MSFT", "NVDA"]
+
+
+@pytest.mark.parametrize("fetched_days_after_report, targeted", [(-1, True), (0, False), (1, False)])
+def test_plan_stops_targeting_once_statements_are_fetched(tickers, fetched_days_after_report, targeted):
+    today = date.today()
+    reported = today - timedelta(days=2)
+    tickers["AAPL"] = FakeTicker(today + timedelta(days=90), [reported])
+    earnings_calendar.scan(["AAPL"], delay=0)
+
+    fetched = reported + timedelta(days=fetched_days_after_report)
+    modify_state("AAPL", lambda state: {**state, "fetched_at": {"statements": f"{fetched.isoformat()}T22:00:00"}})
+
+    targets = earnings_calendar.plan(reported_days=3)["targets"]
+    assert [t["ticker"] for t in targets if t["priority"] == 1] == (["AAPL"] if targeted else [])
+
+
+def test_scan_keeps_state_written_by_fetch(tickers):
+    today = date.today()
+    tickers["AAPL"] = FakeTicker(today + timedelta(days=90), [today - timedelta(days=2)])
+    save_state("AAPL", {"fetched_at": {"info": "2026-01-01T00:00:00"}})
+
+    earnings_calendar.scan(["AAPL"], delay=0)
+
+    state = load_state("AAPL")
+    assert state["fetched_at"] == {"info": "2026-01-01T00:00:00"}
+    assert state["earnings_date"] == (today + timedelta(days=90)).isoformat()
@@ -0,0 +1,203 @@
+import itertools
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+import fetch_financials
+from fetch_financials import SECTIONS, fetch_stock_data, load_state, resolve_sections, run_with_budget, save_state, section_due
+
+
+class FakeTicker:
+    serials = itertools.count(1)
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.serial = next(self.serials)
+
+
+@pytest.fixture
+def stub_sections(storage_root, monkeypatch):
+    """yahoo_session.ticker와 섹션 수집 함수를 네트워크 없는 스텁으로 교체"""
+    release = threading.Event()
+    seen = {}
+
+    def slow(ticker):
+        seen["info"] = ticker.serial
+        release.wait(5)
+        return {"info": {"late": True}}
+
+    def fast(section):
+        def fetch(ticker):
+            seen[section] = ticker.serial
+            return {section: {"serial": ticker.serial}}
+        return fetch
+
+    monkeypatch.setattr(fetch_financials.yahoo_session, "ticker", FakeTicker)
+    monkeypatch.setattr(fetch_financials, "SECTION_FETCHERS", {"info": slow, "holdings": fast("holdings"), "earnings": fast("earnings")})
+    monkeypatch.setattr(fetch_financials, "SECTION_BUDGETS", {"info": 0.2, "holdings": 5, "earnings": 5})
+    yield seen
+    release.set()
+
+
+def test_run_with_budget_returns_value_within_budget():
+    assert run_with_budget(lambda: 42, 1) == (42, False)
+    assert run_with_budget(lambda: 42, None) == (42, False)
+
+
+def test_run_with_budget_ignores_abandoned_result():
+    release = threading.Event()
+
+    def slow():
+        release.wait(5)
+        raise RuntimeError("late failure")
+
+    assert run_with_budget(slow, 0.05) == (None, True)
+    release.set()
+
+
+def test_expired_section_is_reported_and_partial_result_kept(stub_sections):
+    result = fetch_stock_data("AAPL", sections=["info", "holdings", "earnings"], deadline=10)
+
+    assert result["success"] is True
+    assert result["timed_out"] is True
+    assert result["sections"]["fetched"] == ["holdings", "earnings"]
+    assert result["sections"]["timed_out"] == {"info": "exceeded 0.2s budget"}
+    assert "info" not in result
+    assert result["holdings"] == {"serial": stub_sections["holdings"]}
+
+
+def test_sections_after_expiry_get_a_fresh_ticker(stub_sections):
+    fetch_stock_data("AAPL", sections=["info", "holdings", "earnings"], deadline=10)
+
+    assert stub_sections["holdings"] != stub_sections["info"]
+    assert stub_sections["earnings"] == stub_sections["holdings"]
+
+
+def test_deadline_exhausted_sections_are_not_started(stub_sections, monkeypatch):
+    monkeypatch.setitem(fetch_financials.SECTION_BUDGETS, "info", 5)
+    result = fetch_stock_data("AAPL", sections=["info", "holdings", "earnings"], deadline=0.2)
+
+    assert result["timed_out"] is True
+    assert result["sections"]["timed_out"] == {
+        "info": "exceeded 0.2s budget",
+        "holdings": "deadline reached before start",
+        "earnings": "deadline reached before start",
+    }
+    assert result["sections"]["fetched"] == []
+    assert "holdings" not in stub_sections
+
+
+def test_no_deadline_is_not_timed_out(storage_root, monkeypatch):
+    monkeypatch.setattr(fetch_financials.yahoo_session, "ticker", FakeTicker)
+    monkeypatch.setattr(fetch_financials, "SECTION_FETCHERS", {"holdings": lambda ticker: {"holdings": {}}})
+    result = fetch_stock_data("AAPL", sections=["holdings"])
+
+    assert result["timed_out"] is False
+    assert result["sections"]["timed_out"] == {}
+
+
+def test_state_written_during_fetch_is_not_lost(storage_root, monkeypatch):
+    def holdings(ticker):
+        # 수집 도중 earnings_calendar.py scan이 상태를 갱신한 경우
+        save_state("AAPL", {"earnings_date": "2026-11-01", "fetched_at": {"info": "2026-10-01T00:00:00"}})
+        return {"holdings": {}}
+
+    monkeypatch.setattr(fetch_financials.yahoo_session, "ticker", FakeTicker)
+    monkeypatch.setattr(fetch_financials, "SECTION_FETCHERS", {"holdings": holdings})
+    fetch_stock_data("AAPL", sections=["holdings"])
+
+    state = load_state("AAPL")
+    assert state["earnings_date"] == "2026-11-01"
+    assert set(state["fetched_at"]) == {"info", "holdings"}
+
+
+NOW = datetime(2026, 10, 21, 12, 0)  # 수요일
+SATURDAY = datetime(2026, 10, 24, 12, 0)
+
+
+def ago(**delta):
+    return (NOW - timedelta(**delta)).isoformat(timespec="seconds")
+
+
+def day(offset):
+    return (NOW + timedelta(days=offset)).date().isoformat()
+
+
+@pytest.mark.parametrize("section, state, now, due", [
+    # info/history: 20시간
+    ("info", {"fetched_at": {"info": ago(hours=19)}}, NOW, False),
+    ("info", {"fetched_at": {"info": ago(hours=20)}}, NOW, True),
+    ("history", {"fetched_at": {"history": ago(hours=19)}}, NOW, False),
+    ("history", {"fetched_at": {"history": ago(hours=21)}}, NOW, True),
+    # options: 거래일마다 하루 한 번
+    ("options", {"fetched_at": {"options": ago(hours=2)}}, NOW, False),
+    ("options", {"fetched_at": {"options": ago(hours=13)}}, NOW, True),
+    ("options", {"fetched_at": {"options": "2026-10-23T12:00:00"}}, SATURDAY, False),
+    # holdings: 매주
+    ("holdings", {"fetched_at": {"holdings": ago(days=6)}}, NOW, False),
+    ("holdings", {"fetched_at": {"holdings": ago(days=7)}}, NOW, True),
+    # earnings: 매주, 실적발표 ±7일 구간은 매일
+    ("earnings", {"fetched_at": {"earnings": ago(days=2)}}, NOW, False),
+    ("earnings", {"fetched_at": {"earnings": ago(days=7)}}, NOW, True),
+    ("earnings", {"fetched_at": {"earnings": ago(days=1)}, "earnings_date": day(3)}, NOW, True),
+    ("earnings", {"fetched_at": {"earnings": ago(hours=12)}, "earnings_date": day(3)}, NOW, False),
+    ("earnings", {"fetched_at": {"earnings": ago(days=1)}, "earnings_date": day(-5)}, NOW, True),
+    ("earnings", {"fetched_at": {"earnings": ago(days=1)}, "earnings_date": day(30)}, NOW, False),
+    # statements: 실적발표 이후 또는 90일
+    ("statements", {"fetched_at": {"statements": ago(days=30)}}, NOW, False),
+    ("statements", {"fetched_at": {"statements": ago(days=90)}}, NOW, True),
+    ("statements", {"fetched_at": {"statements": ago(days=30)}, "last_reported_date": day(-2)}, NOW, True),
+    ("statements", {"fetched_at": {"statements": ago(days=1)}, "last_reported_date": day(-2)}, NOW, False),
+    ("statements", {"fetched_at": {"statements": ago(days=30)}, "earnings_date": day(-1)}, NOW, True),
+    ("statements", {"fetched_at": {"statements": ago(days=30)}, "earnings_date": day(5)}, NOW, False),
+])
+def test_section_due_cadence(section, state, now, due):
+    assert section_due(section, state, now)[0] is due
+
+
+@pytest.mark.parametrize("section", SECTIONS)
+@pytest.mark.parametrize("state", [{}, {"fetched_at": {}}, {"fetched_at": {"info": "garbage", "statements": None}}])
+def test_section_due_without_state(section, state):
+    assert section_due(section, state, NOW) == (True, "never fetched")
+
+
+def test_statements_due_reason_names_the_report():
+    state = {"fetched_at": {"statements": ago(days=30)}, "last_reported_date": day(-2)}
+
+    assert section_due("statements", state, NOW) == (True, "earnings reported since last fetch")
+
+
+FRESH = {"fetched_at": {s: ago(hours=1) for s in SECTIONS}}
+
+
+@pytest.mark.parametrize("requested, due_only, state, selected, skipped", [
+    (None, False, FRESH, list(SECTIONS), {}),
+    (None, True, {}, list(SECTIONS), {}),
+    (None, True, FRESH, [], set(SECTIONS)),
+    (["earnings", "info"], False, FRESH, ["earnings", "info"], {"statements", "history", "options", "holdings"}),
+    (["earnings", "info"], True, {"fetched_at": {"info": ago(hours=1)}}, ["earnings"], {"statements", "history", "options", "holdings", "info"}),
+])
+def test_resolve_sections(storage_root, requested, due_only, state, selected, skipped):
+    save_state("AAPL", state)
+
+    got_selected, got_skipped, got_state = resolve_sections("AAPL", requested, due_only, NOW)
+
+    assert got_selected == selected
+    assert set(got_skipped) == set(skipped)
+    assert got_state == state
+    if requested:
+        assert all(got_skipped[s] == "not requested" for s in SECTIONS if s not in requested)
+
+
+def test_resolve_sections_reports_why_a_requested_section_was_skipped(storage_root):
+    save_state("AAPL", {"fetched_at": {"info": ago(hours=1)}})
+
+    _, skipped, _ = resolve_sections("AAPL", ["info"], True, NOW)
+
+    assert skipped["info"].startswith("not due")
+
+
+def test_resolve_sections_rejects_unknown_sections(storage_root):
+    with pytest.raises(ValueError, match="Unknown sections: news"):
+        resolve_sections("AAPL", ["info", "news"], False, NOW)
@@ -0,0 +1,145 @@
+import json
+
+import fetch_stockstory
+from db_writer import stockstory_rows
+from fetch_stockstory import read_streaming
+
+# 앞부분에 일부 필드만 있고, 현금/부채는 패딩 뒤 페이지 끝에 있는 합성 페이지
+HEAD = """<html><body>
+<p>High Quality Timely Buy</p>
+<script type="application/ld+json">{"@type": "Corporation", "description": "A durable compounder with pricing power and a long runway."}</script>
+<p>Q3 CY2024 results. Revenue: $40.59 billion, 5.2% analyst beat.</p>
+<p>Adjusted EPS of $6.03 vs analyst estimates of $5.25 (14.9% beat).</p>
+<p>81.8% gross profit margin. Operating margin of 42.7%.</p>
+<p>Guidance for next quarter revenue of $45.5 billion at the midpoint.</p>
+<p>12.3% annualized revenue growth over the last five years. ROIC of 29.5%.</p>
+<img src="https://cdn.stockstory.org/chart-images/meta-revenue.png">
+"""
+TAIL = "<p>The company holds $5 billion of cash and $3 billion of debt.</p></body></html>"
+
+# 정규식으로는 나오지 않는 필드까지 하이드레이션 JSON으로 모두 채운 앞부분
+COMPLETE_STOCK = {
+    "ticker": "META",
+    "latestQuarter": {"revenue": {"estimate": 40290000000}, "eps": {"estimate": 5.25}},
+    "guidance": {"revenue": {"vsEstimate": 0.012}, "eps": {"midpoint": 6.7, "vsEstimate": 0.021}},
+    "growth": {"revenueCagr2y": 0.152, "epsCagr5y": 0.198},
+    "margins": {"grossTrend": "Flat", "operatingTrend": "Rising"},
+    "balanceSheet": {"cash": 70900000000, "debt": 28800000000, "netDebtToEbitda": -0.5},
+    "scores": {"quality": 8.4, "value": 5.1},
+}
+COMPLETE_HEAD = (
+    HEAD
+    + '<script type="application/json">' + json.dumps({"props": {"stock": COMPLETE_STOCK}}) + "</script>"
+    + "<p>We'd invest in the stock at the right price.</p>"
+)
+
+
+class FakeResponse:
+    status_code = 200
+    encoding = "utf-8"
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+
+def page(head=HEAD, padding=200_000):
+    return (head + "<div>" + "x" * padding + "</div>" + TAIL).encode()
+
+
+def test_stream_targets_cover_every_parsed_field():
+    assert set(fetch_stockstory.STREAM_TARGET_FIELDS) | {"chart_urls"} == set(fetch_stockstory.new_result())
+
+
+def test_stream_reads_to_eof_while_any_field_is_missing():
+    response = FakeResponse(page())
+    result, stats = read_streaming(response, ticker="META")
+
+    assert stats["stop_reason"] == "eof"
+    assert stats["bytes_read"] == len(response.body)
+    assert result["gross_margin"] == 81.8
+    assert result["cash"] == 5e9 and result["debt"] == 3e9
+
+
+def test_stream_stops_once_every_field_is_found():
+    response = FakeResponse(page(COMPLETE_HEAD))
+    result, stats = read_streaming(response, ticker="META")
+
+    assert stats["stop_reason"] == "complete"
+    assert stats["bytes_read"] < len(response.body)
+    assert response.closed
+    assert all(result[field] not in (None, []) for field in fetch_stockstory.STREAM_TARGET_FIELDS)
+    assert result["cash"] == 70900000000
+
+
+def test_byte_budget_stop_is_reported_and_saved_partially(monkeypatch):
+    monkeypatch.setattr(fetch_stockstory.requests, "get", lambda *args, **kwargs: FakeResponse(page()))
+
+    output = fetch_stockstory.fetch_stockstory("meta", "nasdaq", stream=True, max_bytes=100_000)
+    assert output["success"] is True
+    assert output["stream"]["stop_reason"] == "byte_budget"
+    assert output["timed_out"] is False
+    assert output["stopped_early"] is True
+
+    row = stockstory_rows(1, output["data"], partial=output["stopped_early"])[0]
+    assert "cash" not in row and "debt" not in row
+    assert row["gross_margin"] == 81.8
+
+
+def test_full_read_is_not_partial(monkeypatch):
+    monkeypatch.setattr(fetch_stockstory.requests, "get", lambda *args, **kwargs: FakeResponse(page()))
+
+    output = fetch_stockstory.fetch_stockstory("meta", "nasdaq", stream=True)
+    assert output["stream"]["stop_reason"] == "eof"
+    assert output["stopped_early"] is False
+    assert output["data"]["cash"] == 5e9
+
+
+def test_regex_value_wins_over_hydration(fixture_text):
+    html = fixture_text("stockstory_meta.html")
+
+    result = fetch_stockstory.parse_page(html, "META")
+    scraped = fetch_stockstory.new_result()
+    fetch_stockstory.extract_from_html(html, scraped)
+
+    for field in ("quarterly_revenue", "gross_margin", "operating_margin", "revenue_beat_percent", "eps_beat_percent", "roic"):
+        assert result[field] == scraped[field], field
+    assert result["quarterly_revenue"] == 40.59e9
+
+
+def test_hydration_fills_missing_fields_in_percent(fixture_text):
+    result = fetch_stockstory.parse_page(fixture_text("stockstory_meta.html"), "META")
+
+    assert result["revenue_cagr_2y"] == 15.2
+    assert result["eps_cagr_5y"] == 19.8
+    assert result["guidance_revenue_vs_estimate"] == 1.2
+    assert result["wall_street_eps_estimate"] == 5.25
+    assert result["net_debt_to_ebitda"] == -0.5
+
+
+def test_hydration_value_unit_sanity():
+    value = fetch_stockstory.hydration_value
+    assert value("gross_margin", 0.818) == 81.8
+    assert value("gross_margin", 81.8) == 81.8
+    assert value("roic", 29.5) == 29.5
+    assert value("gross_margin", 5000) is None
+    assert value("gross_margin", "81.8%") == 81.8
+    assert value("cash", -1) is None
+
+
+def test_hydration_ignores_generic_keys_and_peers(fixture_text):
+    result = fetch_stockstory.parse_page(fixture_text("stockstory_meta.html"), "META")
+
+    assert result["investment_rating"] == "High Quality / Timely Buy"
+    assert result["analysis_summary"] == "Meta's ad machine keeps compounding with strong margins."
+    assert result["quarterly_eps"] == 6.03
+    assert result["cash"] == 70900000000 and result["debt"] == 28800000000
+    assert result["guidance_eps"] is None
+    assert "https://cdn.stockstory.org/chart-images/meta-margins.png" in result["chart_urls"]
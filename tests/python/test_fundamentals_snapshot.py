@@ -0,0 +1,134 @@
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from fundamentals_snapshot import METRICS, FundamentalsSnapshot, build, snapshot_dir
+
+SCHEMA = [
+    "CREATE TABLE sectors (id INTEGER PRIMARY KEY, code TEXT, benchmark_etf TEXT, updated_at TEXT)",
+    "CREATE TABLE sector_benchmarks (etf_ticker TEXT PRIMARY KEY, trailing_pe REAL, pb_ratio REAL, updated_at TEXT)",
+    "CREATE TABLE stocks (id INTEGER PRIMARY KEY, ticker TEXT, sector_id INTEGER, is_active INTEGER, updated_at TEXT)",
+    f"CREATE TABLE stock_fundamentals (stock_id INTEGER, date TEXT, updated_at TEXT, {', '.join(m + ' REAL' for m in METRICS)})",
+]
+
+
+@pytest.fixture
+def database(tmp_path, storage_root, monkeypatch):
+    path = str(tmp_path / "db.sqlite")
+    monkeypatch.setenv("DB_CONNECTION", "sqlite")
+    monkeypatch.setenv("DB_DATABASE", path)
+    conn = sqlite3.connect(path)
+    for sql in SCHEMA:
+        conn.execute(sql)
+    conn.executemany("INSERT INTO sectors VALUES (?, ?, ?, '2024-01-01 00:00:00')", [(1, "tech", "XLK"), (2, "comm", "XLC")])
+    conn.executemany("INSERT INTO sector_benchmarks VALUES (?, 30, 8, '2024-01-01 00:00:00')", [("XLK",), ("XLC",)])
+    conn.executemany("INSERT INTO stocks VALUES (?, ?, 1, 1, '2024-01-01 00:00:00')", [(1, "AAPL"), (2, "MSFT")])
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def write(conn, stock_id, updated_at, price, date="2024-01-02"):
+    conn.execute("DELETE FROM stock_fundamentals WHERE stock_id = ? AND date = ?", (stock_id, date))
+    conn.execute(
+        "INSERT INTO stock_fundamentals (stock_id, date, updated_at, current_price, pe_ratio) VALUES (?, ?, ?, ?, 20)",
+        (stock_id, date, updated_at, price),
+    )
+    conn.commit()
+
+
+def prices():
+    snapshot = FundamentalsSnapshot.open()
+    return dict(zip(snapshot.tickers, snapshot.column("current_price")))
+
+
+def test_rows_written_in_the_watermark_second_are_picked_up(database):
+    write(database, 1, "2024-01-02 10:00:00", 100)
+    assert build()["rebuilt"] is True
+
+    # 마지막 빌드와 같은 초에 기록된 행
+    write(database, 2, "2024-01-02 10:00:00", 200)
+    result = build()
+    assert result["changed"] == 1
+    assert prices() == {"AAPL": 100, "MSFT": 200}
+
+    # 다시 읽혀도 값이 같으면 재빌드하지 않음
+    assert build() == {"success": True, "rows": 2, "changed": 0, "rebuilt": False}
+
+    # 같은 초 안의 값 변경
+    write(database, 1, "2024-01-02 10:00:00", 101)
+    assert build()["changed"] == 1
+    assert prices()["AAPL"] == 101
+
+
+def test_inactive_stocks_are_pruned(database):
+    write(database, 1, "2024-01-02 10:00:00", 100)
+    write(database, 2, "2024-01-02 10:00:00", 200)
+    build()
+
+    database.execute("UPDATE stocks SET is_active = 0 WHERE id = 2")
+    database.commit()
+    result = build()
+
+    assert result["pruned"] == 1
+    assert list(FundamentalsSnapshot.open().tickers) == ["AAPL"]
+    assert build()["rebuilt"] is False
+
+
+def column(name):
+    snapshot = FundamentalsSnapshot.open()
+    return dict(zip(snapshot.tickers, snapshot.column(name)))
+
+
+def test_sector_reassignment_is_picked_up(database):
+    # 워터마크(11:00)보다 이전에 기록된 AAPL 펀더멘털은 경계 재읽기 대상이 아님
+    write(database, 1, "2024-01-02 10:00:00", 100)
+    write(database, 2, "2024-01-02 11:00:00", 200)
+    build()
+    assert set(FundamentalsSnapshot.open().sector_codes) == {"tech"}
+
+    database.execute("UPDATE stocks SET sector_id = 2, updated_at = '2024-01-03 09:00:00' WHERE id = 1")
+    database.commit()
+    result = build()
+
+    assert result["changed"] == 1
+    snapshot = FundamentalsSnapshot.open()
+    assert dict(zip(snapshot.tickers, snapshot.sector_codes)) == {"AAPL": "comm", "MSFT": "tech"}
+    assert build()["rebuilt"] is False
+
+
+def test_benchmark_update_is_picked_up(database):
+    write(database, 1, "2024-01-02 10:00:00", 100)
+    write(database, 2, "2024-01-02 11:00:00", 200)
+    build()
+    assert column("pe_vs_benchmark")["AAPL"] == pytest.approx(20 / 30)
+
+    database.execute("UPDATE sector_benchmarks SET trailing_pe = 40, updated_at = '2024-01-05 00:00:00' WHERE etf_ticker = 'XLK'")
+    database.commit()
+
+    assert build()["changed"] == 2
+    assert column("pe_vs_benchmark") == {"AAPL": pytest.approx(0.5), "MSFT": pytest.approx(0.5)}
+
+
+def test_concurrent_builds_do_not_share_staging(database):
+    write(database, 1, "2024-01-02 10:00:00", 100)
+    write(database, 2, "2024-01-02 10:00:00", 200)
+    errors = []
+
+    def run():
+        try:
+            build(full=True)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert prices() == {"AAPL": 100, "MSFT": 200}
+    assert sorted(os.listdir(os.path.dirname(snapshot_dir()))) == ["fundamentals", "fundamentals.lock"]
@@ -0,0 +1,181 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+import holdings_index
+from holdings_index import HoldingsIndex, holding_rows, normalize_name
+
+AAPL = [
+    ("Vanguard Group Inc", "institution", 1300.0, 260000.0, 0.085, "2026-06-30"),
+    ("Blackrock Inc.", "institution", 1000.0, 200000.0, 0.065, "2026-06-30"),
+    ("Berkshire Hathaway, Inc", "institution", 400.0, 80000.0, 0.026, "2026-06-30"),
+]
+MSFT = [
+    ("VANGUARD GROUP INC", "institution", 900.0, 450000.0, 0.09, "2026-06-30"),
+    ("BlackRock Inc", "institution", 700.0, 350000.0, 0.07, "2026-06-30"),
+]
+NVDA = [
+    ("Vanguard Group, Inc.", "institution", 2000.0, 300000.0, 0.08, "2026-06-30"),
+    ("Huang Jen Hsun", "insider", 800.0, None, None, "2026-05-01"),
+]
+
+
+def sort_keys(index):
+    return (np.asarray(index.columns["holder"]).astype("int64") << 32) | np.asarray(index.columns["ticker"])
+
+
+def positions(index):
+    """인턴 ID와 무관한 비교용: {(보유자, 종목): (주식수, 지분율)}"""
+    return {
+        (h["holder"], ticker): (h["shares"], h["percent_out"])
+        for ticker in index.meta["tickers"]
+        for h in index.holders(ticker)
+    }
+
+
+def test_replace_round_trip(tmp_path):
+    index = HoldingsIndex(str(tmp_path / "holdings"), load=False).replace({"AAPL": AAPL}, today="2026-07-01")
+    reloaded = HoldingsIndex(index.path)
+
+    assert reloaded.meta["tickers"] == ["AAPL"]
+    assert reloaded.meta["updated_at"] == {"AAPL": "2026-07-01"}
+    assert [h["holder"] for h in reloaded.holders("aapl")] == ["Vanguard Group Inc", "Blackrock Inc.", "Berkshire Hathaway, Inc"]
+    assert reloaded.holders("AAPL", top=1)[0] == {
+        "holder": "Vanguard Group Inc", "kind": "institution",
+        "shares": 1300, "value": 260000.0, "percent_out": 0.085, "date_reported": "2026-06-30",
+    }
+
+
+def test_incremental_updates_keep_merge_order(tmp_path):
+    path = str(tmp_path / "holdings")
+    index = HoldingsIndex(path, load=False).replace({"AAPL": AAPL})
+    index = index.replace({"MSFT": MSFT})
+    index = index.replace({"NVDA": NVDA})
+    # AAPL 재수집: Berkshire 이탈, 새 보유자 추가
+    index = index.replace({"AAPL": AAPL[:2] + [("State Street Corp", "institution", 500.0, 100000.0, 0.03, "2026-06-30")]})
+
+    keys = sort_keys(index)
+    assert np.all(np.diff(keys) > 0)
+
+    fresh = HoldingsIndex(str(tmp_path / "fresh"), load=False).replace({
+        "AAPL": AAPL[:2] + [("State Street Corp", "institution", 500.0, 100000.0, 0.03, "2026-06-30")],
+        "MSFT": MSFT,
+        "NVDA": NVDA,
+    })
+    assert positions(index) == positions(fresh)
+    assert "Berkshire Hathaway, Inc" not in {h for h, _ in positions(index)}
+
+    # 보유자/종목 오프셋도 병합 결과와 일치
+    vanguard = index.holder("Vanguard Group Inc")[0]
+    assert sorted(p["ticker"] for p in vanguard["positions"]) == ["AAPL", "MSFT", "NVDA"]
+
+
+def test_duplicate_holder_keeps_latest_report(tmp_path):
+    rows = [
+        ("Vanguard Group Inc", "institution", 1000.0, None, 0.08, "2026-03-31"),
+        ("Vanguard Group Inc.", "institution", 1300.0, None, 0.085, "2026-06-30"),
+    ]
+    index = HoldingsIndex(str(tmp_path / "holdings"), load=False).replace({"AAPL": rows})
+
+    assert [(h["shares"], h["date_reported"]) for h in index.holders("AAPL")] == [(1300, "2026-06-30")]
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("Vanguard Group Inc", ["Vanguard Group Inc"]),
+    ("vanguard group, inc.", ["Vanguard Group Inc"]),
+    ("  BLACKROCK   INC ", ["Blackrock Inc."]),
+    ("Berkshire Hathaway Inc", ["Berkshire Hathaway, Inc"]),
+    ("GROUP", ["Vanguard Group Inc"]),
+    ("inc", ["Vanguard Group Inc", "Blackrock Inc.", "Berkshire Hathaway, Inc"]),
+    ("Fidelity", []),
+])
+def test_find_holder_normalises_names(tmp_path, name, expected):
+    index = HoldingsIndex(str(tmp_path / "holdings"), load=False).replace({"AAPL": AAPL, "MSFT": MSFT})
+
+    assert [index.meta["holders"][i] for i in index.find_holder(name)] == expected
+
+
+def test_normalize_name():
+    assert normalize_name("Berkshire Hathaway, Inc.") == normalize_name("BERKSHIRE  HATHAWAY INC")
+    assert normalize_name("O'Shaughnessy Asset Mgmt") == "OSHAUGHNESSY ASSET MGMT"
+
+
+def test_holders_filters_by_kind(tmp_path):
+    index = HoldingsIndex(str(tmp_path / "holdings"), load=False).replace({"NVDA": NVDA})
+
+    assert [h["holder"] for h in index.holders("NVDA", kind="insider")] == ["Huang Jen Hsun"]
+    assert [h["holder"] for h in index.holders("NVDA", kind="institution")] == ["Vanguard Group, Inc."]
+
+
+def test_queries_on_empty_index(tmp_path):
+    index = HoldingsIndex(str(tmp_path / "missing"))
+
+    assert index.holder("Vanguard") == []
+    assert index.holders("AAPL") == []
+    assert index.holders("AAPL", kind="insider") == []
+    assert index.overlap("AAPL", "MSFT")["jaccard"] == 0.0
+    assert index.crowding() == {}
+
+
+def test_queries_on_ticker_without_positions(tmp_path):
+    index = HoldingsIndex(str(tmp_path / "holdings"), load=False).replace({"AAPL": []})
+
+    assert index.holders("AAPL", kind="institution") == []
+    assert index.overlap("AAPL", "MSFT")["common_holders"] == []
+    assert index.crowding() == {"AAPL": {"score": 0.0, "percentile": 1.0, "institutional_percent_out": 0.0, "institutions": 0}}
+
+
+def test_overlap_and_crowding(tmp_path):
+    index = HoldingsIndex(str(tmp_path / "holdings"), load=False).replace({"AAPL": AAPL, "MSFT": MSFT, "NVDA": NVDA})
+
+    overlap = index.overlap("AAPL", "MSFT")
+    assert [h["holder"] for h in overlap["common_holders"]] == ["Blackrock Inc.", "Vanguard Group Inc"]
+    assert overlap["jaccard"] == round(2 / 3, 4)
+
+    crowding = index.crowding()
+    assert crowding["MSFT"]["institutions"] == 2
+    assert crowding["NVDA"]["institutions"] == 1  # 내부자는 제외
+    assert max(crowding, key=lambda t: crowding[t]["score"]) == "AAPL"
+
+
+def test_holding_rows_sums_insider_shares():
+    rows = holding_rows({
+        "institutional_holders": [{"holder": "Vanguard Group Inc", "shares": 10, "value": 5.0, "percent_out": 0.1, "date_reported": "2026-06-30"}, {"holder": None}],
+        "insider_holders": [{"name": "Jane Doe", "shares_owned_direct": 3, "shares_owned_indirect": 4, "latest_transaction_date": "2026-05-01"}],
+    })
+
+    assert rows == [
+        ("Vanguard Group Inc", "institution", 10, 5.0, 0.1, "2026-06-30"),
+        ("Jane Doe", "insider", 7, None, None, "2026-05-01"),
+    ]
+
+
+def test_build_keeps_insider_rows(tmp_path, storage_root, monkeypatch):
+    path = str(tmp_path / "db.sqlite")
+    monkeypatch.setenv("DB_CONNECTION", "sqlite")
+    monkeypatch.setenv("DB_DATABASE", path)
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE stocks (id INTEGER PRIMARY KEY, ticker TEXT)")
+    conn.execute(
+        "CREATE TABLE institutional_holders (stock_id INTEGER, holder_name TEXT, shares REAL, value REAL, percent_out REAL, date_reported TEXT)"
+    )
+    conn.executemany("INSERT INTO stocks (id, ticker) VALUES (?, ?)", [(1, "NVDA"), (2, "AAPL")])
+    conn.executemany("INSERT INTO institutional_holders VALUES (?, ?, ?, ?, ?, ?)", [
+        (1, "Vanguard Group Inc", 2100.0, 310000.0, 0.081, "2026-06-30"),
+        (1, "Old Fund LP", 50.0, 1000.0, 0.001, "2025-09-30"),  # 보고 기간 밖
+        (2, "Vanguard Group Inc", 1300.0, 260000.0, 0.085, "2026-06-30"),
+    ])
+    conn.commit()
+    conn.close()
+
+    holdings_index.update("NVDA", {"insider_holders": [{"name": "Huang Jen Hsun", "shares_owned_direct": 800}]})
+
+    result = holdings_index.build()
+    index = HoldingsIndex()
+
+    assert result["success"] is True
+    assert sorted(index.meta["tickers"]) == ["AAPL", "NVDA"]
+    assert [h["holder"] for h in index.holders("NVDA", kind="insider")] == ["Huang Jen Hsun"]
+    assert [(h["holder"], h["shares"]) for h in index.holders("NVDA", kind="institution")] == [("Vanguard Group Inc", 2100)]
+    assert index.find_holder("Old Fund") == []
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+import metrics
+from metrics import Metrics
+
+
+@pytest.fixture
+def metrics_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "metrics_dir", lambda: str(tmp_path))
+    return tmp_path
+
+
+def run(latencies, outcome="ok"):
+    m = Metrics("job")
+    for seconds in latencies:
+        m.observe("info", seconds, outcome)
+    m.write()
+
+
+def test_check_uses_samples_not_per_run_p95(metrics_dir):
+    # 실행당 2건: 실행별 p95는 매번 크게 흔들리지만 관측값 윈도우의 p95는 안정적
+    for i in range(60):
+        run([0.1, 0.5 if i % 2 else 0.1])
+
+    assert metrics.check("job", recent=40, baseline=80)["alerts"] == []
+
+    for _ in range(20):
+        run([2.0, 2.0])
+
+    alerts = metrics.check("job", recent=40, baseline=80)["alerts"]
+    assert [(a["endpoint"], a["metric"], a["value"], a["baseline"]) for a in alerts] == [("info", "p95", 2.0, 0.5)]
+
+
+def test_check_needs_enough_samples(metrics_dir):
+    run([0.1] * 5)
+    run([9.0], outcome="429")
+
+    assert metrics.check("job", recent=1, baseline=10)["alerts"] == []
+
+
+def test_sample_window_and_jsonl_are_capped(metrics_dir, monkeypatch):
+    monkeypatch.setattr(metrics, "SAMPLE_WINDOW", 10)
+    monkeypatch.setattr(metrics, "JSONL_RUNS", 3)
+    for i in range(5):
+        run([float(i)] * 4)
+
+    state = json.loads((metrics_dir / "job.state.json").read_text())
+    assert len(state["samples"]["info"]) == 10
+    assert state["histograms"]["info"]["count"] == 20
+
+    lines = (metrics_dir / "job.jsonl").read_text().splitlines()
+    assert [json.loads(line)["endpoints"]["info"]["max"] for line in lines] == [2.0, 3.0, 4.0]
@@ -0,0 +1,81 @@
+import numpy as np
+
+from options_store import FIELDS, ExpiryLog, OptionsStore
+from price_store import to_day
+
+
+def contract(symbol, option_type, strike, last_price, volume=10, open_interest=100):
+    return {
+        "contract_symbol": symbol, "option_type": option_type, "strike": strike,
+        "last_price": last_price, "bid": last_price - 0.1, "ask": last_price + 0.1,
+        "volume": volume, "open_interest": open_interest, "implied_volatility": 0.3,
+    }
+
+
+def options(calls, puts=(), expiry="2024-03-15"):
+    def strip(rows):
+        return [{k: v for k, v in r.items() if k != "option_type"} for r in rows]
+    return {"chains": [{"expiration_date": expiry, "calls": strip(calls), "puts": strip(puts)}]}
+
+
+def test_expiry_log_stores_only_changes(tmp_path):
+    log = ExpiryLog(str(tmp_path / "exp"))
+    day1 = [contract("C100", "call", 100, 5.0), contract("P100", "put", 100, 3.0)]
+    day2 = [contract("C100", "call", 100, 5.5), contract("P100", "put", 100, 3.0)]
+
+    assert log.append(10, day1) == {"base": True, "contracts": 2, "changed": 0}
+    assert log.append(11, day2) == {"base": False, "contracts": 2, "changed": 3}  # last_price, bid, ask
+
+    day, values = log.at(11)
+    assert day == 11
+    assert values[0, FIELDS.index("last_price")] == 5.5
+    _, values = log.at(10)
+    assert values[0, FIELDS.index("last_price")] == 5.0
+    assert log.at(9) == (None, None)
+
+
+def test_expiry_log_same_day_rerun_and_older_day(tmp_path):
+    log = ExpiryLog(str(tmp_path / "exp"))
+    log.append(10, [contract("C100", "call", 100, 5.0)])
+    log.append(11, [contract("C100", "call", 100, 6.0)])
+    log.append(11, [contract("C100", "call", 100, 7.0)])
+
+    days, offsets = log.days()
+    assert list(days) == [10, 11]
+    assert log.at(11)[1][0, 0] == 7.0
+    assert log.append(5, [contract("C100", "call", 100, 1.0)]) == {"skipped": "older than last snapshot"}
+
+    series = log.series(0)
+    np.testing.assert_allclose(series["last_price"], [5.0, 7.0])
+
+
+def test_options_store_round_trip(tmp_path):
+    store = OptionsStore(root=str(tmp_path))
+    day1 = options([contract("AAPL240315C00100000", "call", 100, 5.0)], [contract("AAPL240315P00100000", "put", 100, 2.0)])
+    day2 = options([
+        contract("AAPL240315C00100000", "call", 100, 5.0, volume=20),
+        contract("AAPL240315C00110000", "call", 110, 1.0),
+    ])
+
+    store.append("AAPL", day1, "2024-03-01")
+    store.append("AAPL", day2, "2024-03-04")
+
+    first = store.chain("AAPL", "2024-03-15", "2024-03-01")
+    assert first["snapshot_date"] == "2024-03-01"
+    assert [c["contract_symbol"] for c in first["calls"]] == ["AAPL240315C00100000"]
+    assert first["puts"][0]["last_price"] == 2.0
+
+    # 다음 날 빠진 풋은 복원되지 않고, 새 콜은 추가됨
+    latest = store.chain("AAPL", "2024-03-15")
+    assert latest["snapshot_date"] == "2024-03-04"
+    assert [c["strike"] for c in latest["calls"]] == [100, 110]
+    assert latest["calls"][0]["volume"] == 20
+    assert isinstance(latest["calls"][0]["volume"], int)
+    assert latest["puts"] == []
+
+    series = store.series("AAPL240315C00100000")
+    assert [int(d) for d in series["date"]] == [to_day("2024-03-01"), to_day("2024-03-04")]
+    np.testing.assert_allclose(series["volume"], [10, 20])
+
+    assert store.snapshot("AAPL", "2024-04-01") == []
+    assert store.stats("AAPL")["2024-03-15"]["days"] == 2
@@ -0,0 +1,62 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+import peer_index
+from fundamentals_snapshot import METRICS, add_sector_relative, write_snapshot
+from peer_index import FEATURES, PeerIndex, knn, write_index
+
+
+def test_fundamental_peers_ignore_valuation_features(tmp_path):
+    valuation = [i for i, name in enumerate(FEATURES) if name in ("pe_ratio", "forward_pe")]
+    margin = FEATURES.index("gross_margin")
+
+    # B는 PER만 A와 같고, C는 펀더멘털이 A와 같지만 PER이 다름
+    vectors = np.zeros((3, len(FEATURES)), dtype="float32")
+    vectors[0, margin], vectors[1, margin], vectors[2, margin] = 0.0, 1.0, 0.1
+    vectors[2, valuation] = 2.0
+    neighbors, distances = knn(vectors, np.arange(3), 1)
+
+    path = str(tmp_path / "peers")
+    write_index(path, vectors, neighbors, distances, {"tickers": ["A", "B", "C"]})
+
+    with open(f"{path}/peers.json", encoding="utf-8") as f:
+        assert json.load(f)["A"][0]["ticker"] == "B"
+    with open(f"{path}/fundamental_peers.json", encoding="utf-8") as f:
+        assert json.load(f)["A"][0]["ticker"] == "C"
+
+
+def snapshot(tickers):
+    """tickers: {ticker: (updated_at, market_cap)}"""
+    frame = pd.DataFrame([
+        {"stock_id": i + 1, "ticker": t, "sector_id": 1, "sector_code": "tech", "benchmark_pe": 30.0, "benchmark_pb": 8.0,
+         "updated_at": updated_at, **{m: 1.0 for m in METRICS}, "market_cap": market_cap}
+        for i, (t, (updated_at, market_cap)) in enumerate(tickers.items())
+    ])
+    write_snapshot(add_sector_relative(frame), max(frame["updated_at"]))
+
+
+def test_knn_without_other_stocks_is_empty():
+    neighbors, distances = knn(np.zeros((1, len(FEATURES)), dtype="float32"), np.arange(1), 10)
+
+    assert neighbors.shape == (1, 0)
+    assert distances.shape == (1, 0)
+    assert knn(np.zeros((0, len(FEATURES)), dtype="float32"), np.arange(0), 10)[0].shape == (0, 0)
+
+
+def test_single_stock_universe_then_growth(storage_root, monkeypatch):
+    monkeypatch.setattr(peer_index, "REBUILD_RATIO", 1.0)  # 변경 비율이 아니라 테이블 폭 때문에 재빌드되는지 확인
+    snapshot({"AAPL": ("2024-01-02 10:00:00", 3e12)})
+    assert peer_index.build(k=2)["mode"] == "full"
+
+    index = PeerIndex()
+    assert index.similar("AAPL") == []
+    with open(f"{index.path}/peers.json", encoding="utf-8") as f:
+        assert json.load(f) == {"AAPL": []}
+
+    # 종목이 늘면 좁게 만든 이웃 테이블을 전체 재빌드
+    snapshot({"AAPL": ("2024-01-02 10:00:00", 3e12), "MSFT": ("2024-01-03 10:00:00", 2.9e12), "TINY": ("2024-01-03 10:00:00", 1e8)})
+    assert peer_index.build(k=2)["mode"] == "full"
+    assert PeerIndex().neighbors.shape == (3, 2)
+    assert [p["ticker"] for p in PeerIndex().similar("AAPL")] == ["MSFT", "TINY"]
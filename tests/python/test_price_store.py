@@ -0,0 +1,124 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from price_store import PriceStore, from_day, import_from_database, to_day
+
+
+def bar(day, close, volume=100):
+    return {"date": day, "open": close, "high": close + 1, "low": close - 1, "close": close, "volume": volume}
+
+
+def test_day_conversion_round_trip():
+    assert to_day("1970-01-02") == 1
+    assert from_day(to_day("2024-02-29")) == "2024-02-29"
+    assert to_day("2024-02-29 00:00:00") == to_day("2024-02-29")
+
+
+def test_append_and_read(tmp_path):
+    store = PriceStore("1d", root=str(tmp_path))
+    result = store.append("aapl", [bar("2024-01-03", 12), bar("2024-01-02", 11), {"date": None, "close": 1}])
+
+    assert result == {"appended": 2, "updated": 0}
+    assert store.length("AAPL") == 2
+    assert store.tickers() == ["AAPL"]
+
+    data = store.read("AAPL")
+    assert [from_day(d) for d in data["date"]] == ["2024-01-02", "2024-01-03"]
+    np.testing.assert_allclose(data["close"], [11, 12])
+
+
+def test_append_updates_last_bar_and_skips_older(tmp_path):
+    store = PriceStore("1d", root=str(tmp_path))
+    store.append("MSFT", [bar("2024-01-02", 10), bar("2024-01-03", 11)])
+
+    result = store.append("MSFT", [bar("2024-01-01", 1), bar("2024-01-03", 15, volume=None), bar("2024-01-04", 16)])
+
+    assert result == {"appended": 1, "updated": 1}
+    data = store.read("MSFT")
+    np.testing.assert_allclose(data["close"], [10, 15, 16])
+    assert np.isnan(data["volume"][1])
+
+
+def test_read_date_range_and_panel(tmp_path):
+    store = PriceStore("1d", root=str(tmp_path))
+    store.append("A", [bar(f"2024-01-0{d}", d) for d in range(1, 6)])
+    store.append("B", [bar("2024-01-02", 20), bar("2024-01-04", 40)])
+
+    window = store.read("A", start="2024-01-02", end="2024-01-04")
+    np.testing.assert_allclose(window["close"], [2, 3, 4])
+    assert len(store.read("A", start="2025-01-01")["date"]) == 0
+
+    days, matrix = store.panel(["A", "B"])
+    assert len(days) == 5
+    np.testing.assert_allclose(matrix[:, 0], [1, 2, 3, 4, 5])
+    np.testing.assert_allclose(matrix[:, 1], [np.nan, 20, np.nan, 40, np.nan], equal_nan=True)
+
+
+def test_uncommitted_tail_is_ignored(tmp_path):
+    store = PriceStore("1d", root=str(tmp_path))
+    store.append("X", [bar("2024-01-02", 10)])
+
+    # 값 컬럼만 기록되고 dates가 기록되기 전 중단된 상황
+    with open(store._file("X", "close"), "ab") as f:
+        f.write(np.array([99.0]).tobytes())
+
+    assert store.length("X") == 1
+    store.append("X", [bar("2024-01-03", 11)])
+    np.testing.assert_allclose(store.read("X")["close"], [10, 11])
+
+
+def stock_prices_db(tmp_path, monkeypatch, dates):
+    path = str(tmp_path / "db.sqlite")
+    monkeypatch.setenv("DB_CONNECTION", "sqlite")
+    monkeypatch.setenv("DB_DATABASE", path)
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE stocks (id INTEGER PRIMARY KEY, ticker TEXT)")
+    conn.execute("CREATE TABLE stock_prices (stock_id INTEGER, date TEXT, open REAL, high REAL, low REAL, close REAL, volume REAL)")
+    conn.execute("INSERT INTO stocks VALUES (1, 'AAPL')")
+    conn.executemany("INSERT INTO stock_prices VALUES (1, ?, 1, 1, 1, ?, 1)", [(d, i) for i, d in enumerate(dates)])
+    conn.commit()
+    conn.close()
+
+
+def test_import_defaults_to_history_interval(tmp_path, storage_root, monkeypatch):
+    stock_prices_db(tmp_path, monkeypatch, ["2024-01-01", "2024-02-01", "2024-03-01"])
+
+    result = import_from_database()
+
+    assert result["interval"] == "1mo"
+    assert PriceStore("1mo").length("AAPL") == 3
+    assert PriceStore("1d").tickers() == []
+
+
+def test_import_refuses_interval_mismatch(tmp_path, storage_root, monkeypatch):
+    stock_prices_db(tmp_path, monkeypatch, ["2024-01-01", "2024-02-01", "2024-03-01"])
+
+    with pytest.raises(ValueError, match="does not match interval 1d"):
+        import_from_database("1d")
+    assert PriceStore("1d").tickers() == []
+
+
+def test_merge_prepends_older_history(tmp_path):
+    store = PriceStore("1d", root=str(tmp_path))
+    store.append("AAPL", [bar("2024-01-04", 4), bar("2024-01-05", 5)])
+
+    result = store.merge("AAPL", [bar(f"2024-01-0{d}", d * 10) for d in range(1, 5)])
+
+    assert result == {"appended": 3, "updated": 0}
+    assert store.tickers() == ["AAPL"]
+    data = store.read("AAPL")
+    assert [from_day(d) for d in data["date"]] == ["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05"]
+    np.testing.assert_allclose(data["close"], [10, 20, 30, 40, 5])
+
+
+def test_lock_file_survives_directory_swap(tmp_path):
+    store = PriceStore("1d", root=str(tmp_path))
+    store.append("AAPL", [bar("2024-01-04", 4)])
+    store.merge("AAPL", [bar("2024-01-02", 2)])
+
+    assert (tmp_path / "AAPL.lock").exists()
+    assert not (tmp_path / "AAPL" / ".lock").exists()
+    store.append("AAPL", [bar("2024-01-05", 5)])
+    np.testing.assert_allclose(store.read("AAPL")["close"], [2, 4, 5])
@@ -0,0 +1,47 @@
+import os
+
+import numpy as np
+
+import revision_momentum
+from revision_momentum import RevisionState, compute, earnings_arrays
+
+
+def earnings(current, month_ago, up=None, down=None):
+    data = {
+        "eps_trend": [{"period": "0q", "current": current, "7days_ago": current, "30days_ago": month_ago, "90days_ago": month_ago}],
+        "earnings_estimate": [{"period": "0q", "number_of_analysts": 20}],
+    }
+    if up is not None:
+        data["eps_revisions"] = [{"period": "0q", "up_7d": 0, "up_30d": up, "down_7d": 0, "down_30d": down}]
+    return data
+
+
+def state_of(rows):
+    return {name: np.stack([r[name] for r in rows]) for name in revision_momentum.ARRAYS}
+
+
+def test_trend_fallback_is_on_breadth_scale():
+    rows = [
+        earnings(1.01, 1.00, up=2, down=0),
+        earnings(1.00, 1.00, up=0, down=1),
+        earnings(1.02, 1.00),
+        earnings(0.99, 1.00),
+    ]
+    columns = compute(state_of([earnings_arrays(r) for r in rows]), ["TECH"] * 4)
+
+    np.testing.assert_allclose(columns["breadth"], [0.1, -0.05, 0.02, -0.01])
+    # 출처별 z-score: 각 출처의 상향 종목이 두 출처의 하향 종목보다 모두 앞섬
+    pct = columns["sector_breadth_pct"]
+    assert min(pct[0], pct[2]) > max(pct[1], pct[3])
+
+
+def test_empty_earnings_do_not_overwrite_row(storage_root, monkeypatch):
+    monkeypatch.setattr(revision_momentum, "load_sectors", lambda tickers=None: {"AAPL": "TECH"})
+    revision_momentum.update("AAPL", earnings(1.1, 1.0, up=3, down=1))
+
+    result = revision_momentum.update("AAPL", {"eps_trend": [], "eps_revisions": [], "earnings_estimate": [], "recommendations": []})
+
+    assert result["skipped"] is True
+    state = RevisionState()
+    assert state.arrays["trend"][state.position["AAPL"], 0, 0] == 1.1
+    assert os.path.exists(os.path.join(revision_momentum.state_dir(), "rankings.json"))
@@ -0,0 +1,163 @@
+import sqlite3
+
+import pytest
+
+import db
+import sync_worker
+from sync_worker import claim, complete, fail
+
+# database/migrations/2026_01_30_200000_create_sync_tasks_table.php와 같은 구조
+SCHEMA = """
+CREATE TABLE sync_tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind VARCHAR(32) NOT NULL,
+    ticker VARCHAR(20),
+    payload TEXT,
+    batch VARCHAR(64),
+    status VARCHAR(16) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    available_at INTEGER NOT NULL,
+    leased_until INTEGER,
+    leased_by VARCHAR(255),
+    lease_token VARCHAR(36),
+    result TEXT,
+    last_error TEXT,
+    finished_at INTEGER,
+    created_at DATETIME,
+    updated_at DATETIME
+)
+"""
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = {"t": 1_000_000}
+    monkeypatch.setattr(sync_worker, "now_ts", lambda: now["t"])
+    return now
+
+
+@pytest.fixture
+def database(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "queue.sqlite"))
+    conn.execute(SCHEMA)
+    database = db.Database("sqlite", conn)
+    yield database
+    database.close()
+
+
+def add_task(database, ticker, kind="yahoo", available_at=0, max_attempts=3):
+    database.execute(
+        "INSERT INTO sync_tasks (kind, ticker, payload, available_at, max_attempts) VALUES (?, ?, '{}', ?, ?)",
+        (kind, ticker, available_at, max_attempts),
+    )
+    database.commit()
+
+
+def row(database, task_id):
+    return database.fetch_all("SELECT * FROM sync_tasks WHERE id = ?", (task_id,))[0]
+
+
+def test_claim_leases_oldest_available_task(database, clock):
+    add_task(database, "LATE", available_at=clock["t"] + 60)
+    add_task(database, "AAPL")
+    add_task(database, "MSFT")
+    add_task(database, "NEWS", kind="stockstory")
+
+    task = claim(database, "w1", ["yahoo"], visibility=100)
+    assert task["ticker"] == "AAPL"
+    assert task["status"] == "leased"
+    assert task["attempts"] == 1
+    assert task["leased_by"] == "w1"
+    assert task["leased_until"] == clock["t"] + 100
+
+    assert claim(database, "w2", ["yahoo"])["ticker"] == "MSFT"
+    assert claim(database, "w3", ["yahoo"]) is None
+
+
+def test_expired_lease_is_reclaimed_and_fenced(database, clock):
+    add_task(database, "AAPL")
+    first = claim(database, "w1", ["yahoo"], visibility=10)
+
+    clock["t"] += 11
+    second = claim(database, "w2", ["yahoo"], visibility=10)
+    assert second["id"] == first["id"]
+    assert second["attempts"] == 2
+
+    # 임대를 잃은 워커의 기록은 무시됨
+    assert complete(database, first, {"ok": True}) is False
+    assert fail(database, first, "boom") == "lost"
+    assert complete(database, second, {"ok": True}) is True
+    assert row(database, first["id"])["status"] == "done"
+
+
+def test_fail_backs_off_then_gives_up(database, clock):
+    add_task(database, "AAPL", max_attempts=2)
+
+    task = claim(database, "w1", ["yahoo"])
+    assert fail(database, task, "first") == "pending"
+    stored = row(database, task["id"])
+    assert stored["available_at"] == clock["t"] + sync_worker.RETRY_BASE_DELAY
+    assert stored["leased_until"] is None
+    assert claim(database, "w1", ["yahoo"]) is None
+
+    clock["t"] += sync_worker.RETRY_BASE_DELAY
+    task = claim(database, "w1", ["yahoo"])
+    assert task["attempts"] == 2
+    assert fail(database, task, "second") == "failed"
+
+    stored = row(database, task["id"])
+    assert stored["status"] == "failed"
+    assert stored["last_error"] == "second"
+    assert stored["finished_at"] == clock["t"]
+
+
+def test_expired_lease_without_attempts_left_is_failed(database, clock):
+    add_task(database, "AAPL", max_attempts=1)
+    task = claim(database, "w1", ["yahoo"], visibility=10)
+
+    clock["t"] += 11
+    assert claim(database, "w2", ["yahoo"]) is None
+    stored = row(database, task["id"])
+    assert stored["status"] == "failed"
+    assert stored["last_error"] == "lease expired"
+
+
+@pytest.fixture
+def queue_db(tmp_path, database, monkeypatch):
+    """enqueue/work가 db.connect()로 여는 DB를 fixture database와 같은 파일로 지정"""
+    monkeypatch.setenv("DB_CONNECTION", "sqlite")
+    monkeypatch.setenv("DB_DATABASE", str(tmp_path / "queue.sqlite"))
+    database.execute("CREATE TABLE stocks (id INTEGER PRIMARY KEY, ticker TEXT, exchange TEXT, is_active INTEGER)")
+    database.executemany(
+        "INSERT INTO stocks (id, ticker, exchange, is_active) VALUES (?, ?, ?, 1)",
+        [(1, "AAPL", "NASDAQ"), (2, "NOEX", None), (3, "BLANK", "")],
+    )
+    database.commit()
+    return database
+
+
+def test_stockstory_enqueue_skips_stocks_without_exchange(queue_db, clock):
+    result = sync_worker.enqueue("stockstory")
+
+    assert result["enqueued"] == 1
+    assert sorted(result["no_exchange"]) == ["BLANK", "NOEX"]
+    assert [r["ticker"] for r in queue_db.fetch_all("SELECT ticker FROM sync_tasks")] == ["AAPL"]
+
+    # 다른 종류의 작업은 거래소와 무관하게 전부 등록
+    assert sync_worker.enqueue("yahoo")["enqueued"] == 3
+
+
+def test_stockstory_task_without_exchange_fails_permanently(queue_db, clock, monkeypatch):
+    queue_db.execute(
+        "INSERT INTO sync_tasks (kind, ticker, payload, available_at, max_attempts) VALUES ('stockstory', 'NOEX', ?, 0, 3)",
+        ('{"stock_id": 2, "exchange": null}',),
+    )
+    queue_db.commit()
+    monkeypatch.setattr(sync_worker, "run_script", lambda args, timeout: pytest.fail("script should not run"))
+
+    assert sync_worker.work(["stockstory"], delay=False)["failed"] == 1
+    stored = row(queue_db, 1)
+    assert stored["status"] == "failed"
+    assert stored["attempts"] == 1
+    assert "NOEX has no exchange" in stored["last_error"]
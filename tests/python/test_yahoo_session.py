@@ -0,0 +1,52 @@
+import json
+import os
+
+import pytest
+
+import yahoo_session
+
+
+class FakeResponse:
+    def __init__(self, status_code, text=""):
+        self.status_code = status_code
+        self.text = text
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+
+    def request(self, method, url, **kwargs):
+        return self.responses.pop(0)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+
+@pytest.fixture
+def saved(storage_root):
+    os.makedirs(os.path.dirname(yahoo_session.session_path()), exist_ok=True)
+    with open(yahoo_session.session_path(), "w", encoding="utf-8") as f:
+        json.dump({"crumb": "abc", "cookies": [], "expires_at": 2e9}, f)
+    return yahoo_session.session_path()
+
+
+@pytest.mark.parametrize("response", [FakeResponse(401), FakeResponse(400, '{"finance":{"error":{"description":"Invalid Crumb"}}}')])
+def test_rejected_crumb_discards_saved_session(saved, response):
+    session = FakeSession([FakeResponse(200, "ok"), response])
+    yahoo_session.watch(session)
+
+    session.get("https://query2.finance.yahoo.com/v10/finance/quoteSummary/AAPL")
+    assert os.path.exists(saved)
+
+    assert session.get("https://query2.finance.yahoo.com/v10/finance/quoteSummary/AAPL") is response
+    assert not os.path.exists(saved)
+
+
+def test_other_errors_keep_saved_session(saved):
+    session = FakeSession([FakeResponse(404, "Not Found"), FakeResponse(429, "Too Many Requests")])
+    yahoo_session.watch(session)
+
+    session.get("a")
+    session.get("b")
+    assert os.path.exists(saved)